@@ -0,0 +1,340 @@
+"""Cálculos do dashboard, independentes do Streamlit.
+
+`Filtros` descreve a seleção da barra lateral e `Fontes` reúne os dados e as
+estruturas pré-computadas (índice de filtros, cubo, sketch de quantis,
+agregado do mapa, série anual e, opcionalmente, um backend de consulta). As funções recebem os dois e
+devolvem valores e DataFrames prontos para os gráficos, de modo que o app só
+cuida do layout, e os mesmos cálculos podem ser cacheados, medidos ou
+executados num job em lote.
+
+As funções aceitam as células do cubo já fatiadas (`celulas`) para que várias
+consultas da mesma seleção reaproveitem uma única fatia. O que é por cargo ou
+por país sai do agregado do mapa, já que essas dimensões ficam fora do cubo.
+"""
+from dataclasses import dataclass, fields
+
+import numpy as np
+import pandas as pd
+
+from cache import chave_selecao
+from categorias import DIMENSOES_DISTRIBUICAO, distribuicao
+from cubo import CuboSalarios, agregar_celulas, rollup, totais
+from indice import DIMENSOES_BUSCA, IndiceFiltros
+from insights import avaliar, variacao_anual
+from mapa import MapaCargos
+from quantis import SketchQuantis
+from serie import SerieAnual
+
+QUANTIS_DESCRIBE = [0.25, 0.5, 0.75]
+CARGO_MAPA_PADRAO = 'Data Scientist'
+
+
+@dataclass(frozen=True)
+class Filtros:
+    """Valores selecionados por dimensão da barra lateral (vazio: nenhum; em cargo e país, todos)."""
+    ano: tuple = ()
+    senioridade: tuple = ()
+    contrato: tuple = ()
+    tamanho_empresa: tuple = ()
+    cargo: tuple = ()
+    residencia_iso3: tuple = ()
+
+    @classmethod
+    def de_selecoes(cls, selecoes):
+        return cls(**{campo.name: tuple(selecoes.get(campo.name, ())) for campo in fields(cls)})
+
+    @classmethod
+    def todos(cls, df):
+        """Todos os valores presentes no DataFrame (a seleção inicial do app)."""
+        return cls(**{
+            campo.name: tuple(sorted(df[campo.name].unique()))
+            for campo in fields(cls) if campo.name not in DIMENSOES_BUSCA
+        })
+
+    @property
+    def selecoes(self):
+        """Dicionário dimensão -> valores, como esperado por índice, cubo e backends."""
+        return {
+            campo.name: list(getattr(self, campo.name))
+            for campo in fields(self) if campo.name not in DIMENSOES_BUSCA or getattr(self, campo.name)
+        }
+
+    @property
+    def por_linhas(self):
+        """Cargo ou país restringem a seleção: sketch, série e histograma por célula não se aplicam.
+
+        Mediana, quantis e séries saem então das linhas filtradas, que as listas
+        de linhas do índice entregam sem varrer o dataset.
+        """
+        return any(getattr(self, dimensao) for dimensao in DIMENSOES_BUSCA)
+
+    def chave(self, *extras):
+        return chave_selecao(self.selecoes, *extras)
+
+
+@dataclass
+class Fontes:
+    df: pd.DataFrame
+    indice: IndiceFiltros
+    cubo: CuboSalarios
+    sketch: SketchQuantis
+    backend: object = None
+    mapa: MapaCargos = None
+    serie: SerieAnual = None
+
+    @classmethod
+    def de_dataframe(cls, df, backend=None):
+        """Constrói as estruturas pré-computadas a partir das linhas."""
+        cubo = CuboSalarios(df)
+        sketch = SketchQuantis(df)
+        indice = IndiceFiltros(df, rotulos={'residencia_iso3': cubo.nomes_paises})
+        return cls(df, indice, cubo, sketch, backend, MapaCargos.de_linhas(df), SerieAnual(sketch, df))
+
+    def fatia(self, filtros):
+        """Células do cubo da seleção; com cargo ou país selecionados, agregadas das linhas filtradas."""
+        if filtros.por_linhas:
+            return agregar_celulas(self.filtrar(filtros), self.cubo.dimensoes)
+        return self.cubo.fatia(filtros.selecoes)
+
+    def filtrar(self, filtros):
+        return self.indice.filtrar(self.df, filtros.selecoes)
+
+
+def _celulas(fontes, filtros, celulas):
+    return fontes.fatia(filtros) if celulas is None else celulas
+
+
+def _cargos_paises(fontes, filtros):
+    """Rótulos dos eixos e matrizes cargos x países (contagem, soma, soma dos quadrados) da seleção.
+
+    Sem o agregado do mapa, das linhas filtradas.
+    """
+    if fontes.mapa is not None:
+        return fontes.mapa.cargos, fontes.mapa.paises, *fontes.mapa.agregar(filtros.selecoes)
+    mapa = MapaCargos.de_linhas(fontes.filtrar(filtros))
+    return mapa.cargos, mapa.paises, *mapa.agregar({})
+
+
+def por_dimensao_mapa(fontes, filtros, dimensao):
+    """count, sum, sumsq e media do salário por cargo ou por país ('residencia_iso3') presente na seleção.
+
+    Indexado pelo valor da dimensão, em ordem alfabética.
+    """
+    cargos, paises, *medidas = _cargos_paises(fontes, filtros)
+    eixo = 1 if dimensao == 'cargo' else 0
+    contagem, soma, soma_quadrados = (medida.sum(axis=eixo) for medida in medidas)
+    presentes = contagem > 0
+    rotulos = np.asarray(cargos if dimensao == 'cargo' else paises, dtype=object)[presentes]
+    tabela = pd.DataFrame(
+        {'count': contagem[presentes], 'sum': soma[presentes], 'sumsq': soma_quadrados[presentes]},
+        index=pd.Index(rotulos, name=dimensao),
+    )
+    tabela['media'] = tabela['sum'] / tabela['count']
+    return tabela
+
+
+def crescimento_anual(celulas, anos):
+    """Variação (%) da média do último ano selecionado sobre o ano selecionado anterior."""
+    if len(anos) <= 1:
+        return 0
+    return variacao_anual(rollup(celulas, 'ano')['media'], anos)
+
+
+def cagr(anual):
+    """Crescimento anual composto (%) do salário médio entre o primeiro e o último ano da série."""
+    if len(anual) < 2:
+        return np.nan
+    primeiro, ultimo = anual.iloc[0], anual.iloc[-1]
+    anos = ultimo['ano'] - primeiro['ano']
+    return ((ultimo['salario_medio'] / primeiro['salario_medio']) ** (1 / anos) - 1) * 100
+
+
+def calcular_kpis(fontes, filtros, celulas=None, exato=False):
+    """Indicadores principais; mediana pelo sketch de quantis, ou exata com `exato`.
+
+    Com um backend, todos saem de uma única consulta a ele (mediana sempre exata).
+    """
+    if fontes.backend is not None:
+        consulta = fontes.backend.kpis(filtros.selecoes)
+        return {
+            'total_registros': consulta['total'],
+            'salario_medio': consulta['media'],
+            'salario_mediano': consulta['mediana'],
+            'salario_maximo': consulta['maximo'],
+            'salario_minimo': consulta['minimo'],
+            'desvio': consulta['desvio'],
+            'cv': consulta['desvio'] / consulta['media'] * 100,
+            'cargo_mais_frequente': consulta['cargo_mais_frequente'],
+            'crescimento': variacao_anual(consulta['media_por_ano'], filtros.ano),
+        }
+    celulas = _celulas(fontes, filtros, celulas)
+    resumo = totais(celulas)
+    por_cargo = por_dimensao_mapa(fontes, filtros, 'cargo')['count']
+    return {
+        'total_registros': int(resumo['count']),
+        'salario_medio': resumo['media'],
+        'salario_mediano': (
+            fontes.filtrar(filtros)['usd'].median() if exato or filtros.por_linhas
+            else fontes.sketch.mediana(filtros.selecoes)
+        ),
+        'salario_maximo': resumo['max'],
+        'salario_minimo': resumo['min'],
+        'desvio': resumo['desvio'],
+        'cv': resumo['cv'],
+        'cargo_mais_frequente': por_cargo.idxmax() if not por_cargo.empty else "N/A",
+        'crescimento': (
+            variacao_anual(fontes.serie.media_por_ano(filtros.selecoes), filtros.ano)
+            if fontes.serie is not None and not filtros.por_linhas else crescimento_anual(celulas, filtros.ano)
+        ),
+    }
+
+
+def top_cargos(fontes, filtros, celulas=None, minimo_registros=5, limite=10):
+    """Cargos de maior salário médio (colunas cargo, mean, count), em ordem crescente."""
+    if fontes.backend is not None:
+        return fontes.backend.top_cargos(filtros.selecoes, minimo_registros, limite)
+    top = por_dimensao_mapa(fontes, filtros, 'cargo')[['media', 'count']].rename(columns={'media': 'mean'}).reset_index()
+    top = top[top['count'] >= minimo_registros]
+    return top.nlargest(limite, 'mean').sort_values('mean', ascending=True)
+
+
+def modalidades_trabalho(fontes, filtros, celulas=None):
+    """Registros por modalidade (colunas tipo_trabalho, quantidade), da maior para a menor."""
+    celulas = _celulas(fontes, filtros, celulas)
+    contagem = rollup(celulas, 'remoto')['count'].sort_values(ascending=False).reset_index()
+    contagem.columns = ['tipo_trabalho', 'quantidade']
+    return contagem
+
+
+def salario_tempo(fontes, filtros, celulas=None):
+    """Salário médio (coluna usd) por ano e senioridade; só por senioridade se há um único ano."""
+    celulas = _celulas(fontes, filtros, celulas)
+    if len(filtros.ano) <= 1:
+        return rollup(celulas, 'senioridade')['media'].rename('usd').reset_index()
+    if fontes.backend is not None:
+        return fontes.backend.salario_tempo(filtros.selecoes)
+    return rollup(celulas, ['ano', 'senioridade'])['media'].rename('usd').reset_index()
+
+
+def tendencia_anual(fontes, filtros, exato=False):
+    """Série anual da seleção: por ano, por ano e senioridade, e o CAGR do salário médio.
+
+    Sem a série pré-agregada, ou com `exato`, as medianas vêm das linhas filtradas;
+    com cargo ou país selecionados, a série inteira.
+    """
+    if fontes.serie is None or filtros.por_linhas:
+        linhas = fontes.filtrar(filtros)
+        anual = linhas.groupby('ano')['usd'].agg(registros='size', salario_medio='mean', salario_mediano='median').reset_index()
+        por_senioridade = linhas.groupby(['ano', 'senioridade'], observed=True)['usd'].agg(
+            registros='size', salario_medio='mean', salario_mediano='median'
+        ).reset_index()
+        anual['crescimento'] = anual['salario_medio'].pct_change(fill_method=None) * 100
+        por_senioridade['crescimento'] = por_senioridade.groupby('senioridade', observed=True)['salario_medio'].pct_change(fill_method=None) * 100
+    else:
+        anual = fontes.serie.anual(filtros.selecoes)
+        por_senioridade = fontes.serie.por_dimensao(filtros.selecoes, 'senioridade')
+        if exato:
+            linhas = fontes.filtrar(filtros)
+            anual['salario_mediano'] = anual['ano'].map(linhas.groupby('ano')['usd'].median())
+            medianas = linhas.groupby(['ano', 'senioridade'], observed=True)['usd'].median()
+            por_senioridade['salario_mediano'] = medianas.reindex(
+                pd.MultiIndex.from_frame(por_senioridade[['ano', 'senioridade']])
+            ).to_numpy()
+    return {'anual': anual, 'por_senioridade': por_senioridade, 'cagr': cagr(anual)}
+
+
+def cargo_mapa(fontes, filtros, celulas=None, kpis=None):
+    """Cargo exibido no mapa: Data Scientist se presente, senão o mais frequente."""
+    if CARGO_MAPA_PADRAO in por_dimensao_mapa(fontes, filtros, 'cargo').index:
+        return CARGO_MAPA_PADRAO
+    if kpis is None:
+        kpis = calcular_kpis(fontes, filtros, celulas)
+    return kpis['cargo_mais_frequente']
+
+
+def salario_pais_cargos(fontes, filtros, celulas=None):
+    """Salário médio por país de todos os cargos da seleção.
+
+    Indexado por cargo (ordem alfabética), com as colunas iso3, pais,
+    salario_medio e quantidade; o mapa de um cargo é `.loc[[cargo]]`.
+    """
+    rotulos_cargos, rotulos_paises, contagem, soma, _ = _cargos_paises(fontes, filtros)
+    i_cargo, i_pais = np.nonzero(contagem)
+    cargos = np.asarray(rotulos_cargos, dtype=object)[i_cargo]
+    iso3 = np.asarray(rotulos_paises, dtype=object)[i_pais]
+    quantidade = contagem[i_cargo, i_pais]
+    media = soma[i_cargo, i_pais] / quantidade
+    tabela = pd.DataFrame(
+        {'iso3': iso3, 'salario_medio': media, 'quantidade': quantidade},
+        index=pd.Index(cargos, name='cargo'),
+    )
+    tabela.insert(1, 'pais', tabela['iso3'].map(fontes.cubo.nomes_paises))
+    return tabela
+
+
+def cargos_mapa(paises_cargos):
+    """Registros por cargo presente na seleção, em ordem alfabética (opções do mapa)."""
+    return paises_cargos.groupby(level='cargo', sort=True)['quantidade'].sum()
+
+
+def salario_pais(fontes, filtros, cargo, celulas=None, paises_cargos=None):
+    """Salário médio do cargo por país (colunas iso3, pais, salario_medio, quantidade); None se vazio."""
+    if paises_cargos is None:
+        paises_cargos = salario_pais_cargos(fontes, filtros, celulas)
+    if cargo not in paises_cargos.index:
+        return None
+    if fontes.backend is not None:
+        return fontes.backend.media_pais(filtros.selecoes, cargo)
+    return paises_cargos.loc[[cargo]].reset_index(drop=True)
+
+
+def descrever_salario(fontes, filtros, celulas=None, kpis=None, exato=False):
+    """Equivalente a Series.describe() do salário; quartis pelo sketch, ou exatos com `exato`."""
+    if fontes.backend is not None:
+        return fontes.backend.describe(filtros.selecoes)
+    celulas = _celulas(fontes, filtros, celulas)
+    if kpis is None:
+        kpis = calcular_kpis(fontes, filtros, celulas, exato)
+    if exato or filtros.por_linhas:
+        quartis = fontes.filtrar(filtros)['usd'].quantile(QUANTIS_DESCRIBE).to_numpy()
+    else:
+        quartis = fontes.sketch.quantis(filtros.selecoes, QUANTIS_DESCRIBE)
+    return {
+        'count': kpis['total_registros'],
+        'mean': kpis['salario_medio'],
+        'std': kpis['desvio'],
+        'min': kpis['salario_minimo'],
+        '25%': quartis[0],
+        '50%': quartis[1],
+        '75%': quartis[2],
+        'max': kpis['salario_maximo'],
+    }
+
+
+def distribuicao_categorias(fontes, filtros, celulas=None, dimensoes=DIMENSOES_DISTRIBUICAO):
+    """Quantidade e percentual por categoria de cada dimensão, com nomes de país."""
+    celulas = _celulas(fontes, filtros, celulas)
+    tabelas = [distribuicao(celulas, [d for d in dimensoes if d != 'residencia_iso3'], pesos='count')]
+    if 'residencia_iso3' in dimensoes:
+        # País fica fora do cubo: contagens do agregado do mapa
+        paises = por_dimensao_mapa(fontes, filtros, 'residencia_iso3')['count'].reset_index()
+        tabela_paises = distribuicao(paises, ['residencia_iso3'], pesos='count')
+        tabela_paises['categoria'] = tabela_paises['categoria'].map(fontes.cubo.nomes_paises)
+        tabelas.append(tabela_paises)
+    ordem = {dimensao: i for i, dimensao in enumerate(dimensoes)}
+    return (
+        pd.concat(tabelas, ignore_index=True)
+        .sort_values('dimensao', key=lambda coluna: coluna.map(ordem), kind='stable')
+        .reset_index(drop=True)
+    )
+
+
+def gerar_insights(fontes, filtros, celulas=None):
+    """Frases de destaque sobre a seleção atual, das regras registradas em insights.py."""
+    celulas = _celulas(fontes, filtros, celulas)
+    paises = por_dimensao_mapa(fontes, filtros, 'residencia_iso3').reset_index()
+    _, mensagens = avaliar(
+        celulas, {'anos': filtros.ano, 'nomes_paises': fontes.cubo.nomes_paises},
+        celulas_extras={'residencia_iso3': paises},
+    )
+    return mensagens
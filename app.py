@@ -1,9 +1,45 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
+import json
+import os
+
+from dados import assinatura_fonte, carregar_dados, fixar_snapshot, versao_dados
+from ingestao import carregar_cubo, carregar_mapa, carregar_particoes, partes_particoes, versao_particoes
+from atualizacao import AtualizadorDados
+from backends import criar_backend
+from indice import IndiceFiltros
+from cubo import CuboSalarios
+from categorias import DIMENSOES_DISTRIBUICAO
+from quantis import SketchQuantis
+from serie import SerieAnual
+from histograma import FAIXAS_DISPONIVEIS, HistogramaSalarios
+from mapa import MapaCargos
+from cache import CacheResultados, chave_selecao
+from analise import (
+    Filtros,
+    Fontes,
+    calcular_kpis,
+    cargo_mapa,
+    cargos_mapa,
+    descrever_salario,
+    distribuicao_categorias,
+    gerar_insights,
+    modalidades_trabalho,
+    salario_pais,
+    salario_pais_cargos,
+    salario_tempo,
+    tendencia_anual,
+    top_cargos,
+)
+from secoes import Secoes
+from paralelo import ExecutorAgregacoes
+from perfil import PerfilRerun
+from exportacao import FORMATOS, exportar, nome_arquivo
+from graficos import FabricaGraficos
+from paginacao import COLUNAS_ORDENACAO, TAMANHOS_PAGINA, IndiceOrdenacao, formatar_moeda
 
 # --- Configuração da Página ---
 st.set_page_config(
@@ -193,11 +229,109 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- Carregamento dos dados ---
-@st.cache_data
-def load_data():
-    return pd.read_csv("https://raw.githubusercontent.com/vqrca/dashboard_salarios_dados/refs/heads/main/dados-imersao-final.csv")
+# Partições por ano mantidas por `python -m ingestao` substituem o CSV quando configuradas
+USAR_PARTICOES = "DASHBOARD_PARTICOES" in os.environ
+
+# Backend de consulta ('pandas' ou 'duckdb') para KPIs, top cargos, linha, mapa e describe;
+# sem ele, cubo e sketches pré-computados. O DataFrame e as estruturas são montados nos dois
+# casos: o backend é um caminho opcional de paridade, não de desempenho
+BACKEND = os.environ.get("DASHBOARD_BACKEND")
+
+# Perfil deste rerun: etapas cronometradas e emitidas como uma linha JSON no fim do script
+perfil = PerfilRerun()
+# Painel de perfil aberto por padrão com DASHBOARD_DEBUG=1
+DEBUG = os.environ.get("DASHBOARD_DEBUG") == "1"
+
+def carregar_dataset():
+    # Um único DataFrame somente leitura por processo, mapeado do arquivo Arrow publicado:
+    # sessões não recebem cópias (como no cache_data) e processos dividem as mesmas páginas
+    if USAR_PARTICOES:
+        return carregar_particoes(mapeado=True), versao_particoes()
+    # Snapshot Parquet local, revalidado contra a fonte (URL ou caminho em DASHBOARD_DADOS)
+    df = carregar_dados(mapeado=True)
+    return df, versao_dados()
+
+def construir_estruturas(df):
+    # Todas as estruturas derivadas de um mesmo DataFrame, montadas juntas a cada versão dos dados
+    # Cubo count/sum/sumsq/min/max pelas dimensões dos filtros e pela modalidade
+    cubo = carregar_cubo(df=df) if USAR_PARTICOES else CuboSalarios(df)
+    # Bitmaps por valor dos filtros da barra lateral; listas de linhas e busca por prefixo para cargo e país
+    indice = IndiceFiltros(df, rotulos={'residencia_iso3': cubo.nomes_paises})
+    # Histogramas logarítmicos por célula dos filtros para mediana e percentis
+    sketch = SketchQuantis(df)
+    backend = None
+    if BACKEND is not None:
+        # O DuckDB consulta os arquivos Parquet diretamente; as demais estruturas seguem vindo do df.
+        # Arquivos fixos desta versão: partes do manifesto ou cópia do snapshot com o checksum no nome
+        parquet = partes_particoes() if USAR_PARTICOES else fixar_snapshot()
+        backend = criar_backend(BACKEND, df=df, parquet=parquet, indice=indice)
+    return {
+        'df': df,
+        'indice': indice,
+        'cubo': cubo,
+        'sketch': sketch,
+        # Contagens por faixa salarial fina em cada célula dos filtros
+        'histograma': HistogramaSalarios(df),
+        # Contagem e somas por (cargo, país) em cada célula dos filtros: mapa, top cargos e países
+        'mapa_cargos': carregar_mapa() if USAR_PARTICOES else MapaCargos.de_linhas(df),
+        # Contagem e soma por ano e célula dos filtros, sobre a grade do sketch (medianas por ano)
+        'serie': SerieAnual(sketch, df),
+        # Permutações de ordenação por coluna da tabela
+        'ordenacao': IndiceOrdenacao(df, indice),
+        'backend': backend,
+    }
 
-df = load_data()
+@st.cache_resource
+def load_data():
+    # O corpo só executa na falta do cache
+    perfil.registrar_falta('load_data')
+    # A primeira versão é montada aqui; as seguintes, na thread do atualizador
+    # (a cada DASHBOARD_ATUALIZACAO segundos), e trocadas de uma vez quando prontas
+    assinatura = versao_particoes if USAR_PARTICOES else assinatura_fonte
+    return AtualizadorDados(carregar_dataset, construir_estruturas, assinatura).iniciar()
+
+@st.cache_resource
+def load_fabrica_graficos():
+    # Figuras serializadas por gráfico e hash dos dados agregados
+    return FabricaGraficos()
+
+@st.cache_resource
+def load_cache_resultados():
+    # Artefatos derivados por estado dos filtros, compartilhados entre sessões
+    return CacheResultados()
+
+@st.cache_resource
+def load_executor():
+    # Pool de threads das agregações independentes (DASHBOARD_WORKERS), compartilhado entre sessões
+    return ExecutorAgregacoes()
+
+@st.cache_resource
+def load_cache_exportacao():
+    # Arquivos exportados por estado dos filtros e formato
+    return CacheResultados(max_itens=16, max_bytes=256 * 1024 ** 2)
+
+atualizador = perfil.chamar_cacheado('load_data', load_data)
+with perfil.etapa('estruturas'):
+    # Uma referência por rerun: uma troca no meio do script não mistura versões
+    dados_atuais = atualizador.atual()
+    versao = dados_atuais.versao
+    df = dados_atuais['df']
+    indice = dados_atuais['indice']
+    cubo = dados_atuais['cubo']
+    sketch = dados_atuais['sketch']
+    histograma = dados_atuais['histograma']
+    mapa_cargos = dados_atuais['mapa_cargos']
+    serie = dados_atuais['serie']
+    ordenacao = dados_atuais['ordenacao']
+    backend = dados_atuais['backend']
+    cache_resultados = load_cache_resultados()
+    cache_exportacao = load_cache_exportacao()
+    fabrica = load_fabrica_graficos()
+    executor = load_executor()
+
+def construir_grafico(id_grafico, *dados, **parametros):
+    with perfil.etapa(f'grafico_{id_grafico}'):
+        return fabrica.construir(id_grafico, *dados, **parametros)
 
 # --- Header Principal ---
 st.markdown("""
@@ -207,6 +341,27 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+def filtro_busca(dimensao, chave, rotulo, formatar=str):
+    """Multiselect de uma dimensão de alta cardinalidade: opções são a seleção atual e as sugestões da busca."""
+    busca = indice.busca[dimensao]
+    prefixo = st.text_input(
+        f"Buscar {rotulo}:",
+        key=f"busca_{chave}",
+        placeholder="Digite o início de um nome",
+    )
+    # Só a seleção e as sugestões mais frequentes vão ao navegador, não os centenas de valores;
+    # valores ausentes numa nova versão dos dados saem da seleção
+    selecionados = [valor for valor in st.session_state.get(chave, []) if valor in busca]
+    opcoes = list(dict.fromkeys(selecionados + busca.buscar(prefixo)))
+    # O seletor é recriado quando as opções mudam: a seleção é regravada antes dele a cada rerun
+    st.session_state[chave] = selecionados
+    return st.multiselect(
+        f"Selecione {rotulo} (vazio: todos):",
+        opcoes,
+        format_func=lambda valor: f"{formatar(valor)} ({busca.contagem(valor):,})",
+        key=chave,
+    )
+
 # --- Barra Lateral Melhorada ---
 with st.sidebar:
     st.markdown("""
@@ -252,6 +407,28 @@ with st.sidebar:
             key="tamanhos"
         )
     
+    with st.expander("💼 Cargo e País", expanded=False):
+        cargos_selecionados = filtro_busca('cargo', "cargos", "cargos")
+        nomes_paises = cubo.nomes_paises
+        paises_selecionados = filtro_busca(
+            'residencia_iso3', "paises", "países",
+            formatar=lambda iso3: f"{nomes_paises.get(iso3, iso3)} · {iso3}",
+        )
+    
+    with st.expander("🧩 Seções Visíveis", expanded=False):
+        # Seções ocultas não são calculadas
+        mostrar_linha1 = st.toggle("Cargos e distribuição salarial", value=True, key="mostrar_linha1")
+        mostrar_linha2 = st.toggle("Modalidades e evolução", value=True, key="mostrar_linha2")
+        mostrar_mapa = st.toggle("Mapa mundial", value=True, key="mostrar_mapa")
+        mostrar_tendencia = st.toggle("Tendência anual", value=True, key="mostrar_tendencia")
+    
+    quantis_exatos = st.checkbox(
+        "Quantis exatos (mais lento)",
+        value=False,
+        help=f"Por padrão mediana e percentis são aproximados com erro relativo de até {sketch.erro_relativo:.0%}.",
+        key="quantis_exatos"
+    )
+    
     # Botão para limpar filtros
     if st.button("🔄 Limpar Todos os Filtros"):
         st.rerun()
@@ -263,44 +440,142 @@ with st.sidebar:
     st.info(f"**Período:** {df['ano'].min()} - {df['ano'].max()}")
     st.info(f"**Países:** {df['residencia'].nunique()}")
 
+    # Versão em uso e situação da atualização em segundo plano
+    estado = atualizador.estado()
+    def idade(segundos):
+        return f"{segundos / 60:.0f} min" if segundos >= 60 else f"{segundos:.0f} s"
+    st.caption(
+        f"Versão `{(versao or 'desconhecida')[:12]}` · carregada há {idade(estado['idade_s'])} · "
+        f"verificada há {idade(estado['desde_verificacao_s'])}"
+    )
+    if estado['erro']:
+        st.warning(f"⚠️ Última verificação falhou ({estado['erro']}); exibindo a versão carregada.")
+    elif estado['intervalo_s'] > 0 and estado['desde_verificacao_s'] > 2 * estado['intervalo_s']:
+        st.warning("⚠️ Os dados não são verificados há mais tempo que o previsto.")
+    if st.button("🔁 Verificar atualizações agora"):
+        atualizador.solicitar()
+        st.toast("Verificação solicitada; a nova versão entra quando estiver pronta.")
+
 # --- Filtragem do DataFrame ---
-df_filtrado = df[
-    (df['ano'].isin(anos_selecionados)) &
-    (df['senioridade'].isin(senioridades_selecionadas)) &
-    (df['contrato'].isin(contratos_selecionados)) &
-    (df['tamanho_empresa'].isin(tamanhos_selecionados))
-]
+filtros = Filtros.de_selecoes({
+    'ano': anos_selecionados,
+    'senioridade': senioridades_selecionadas,
+    'contrato': contratos_selecionados,
+    'tamanho_empresa': tamanhos_selecionados,
+    'cargo': cargos_selecionados,
+    'residencia_iso3': paises_selecionados,
+})
+# Cargo e país entram só quando restringem a seleção
+selecoes = filtros.selecoes
 
 # --- Verificação de dados ---
-if df_filtrado.empty:
+with perfil.etapa('filtro'):
+    sem_dados = indice.contar(selecoes) == 0
+if sem_dados:
     st.error("⚠️ Nenhum dado encontrado com os filtros selecionados. Ajuste os filtros para visualizar os dados.")
+    perfil.emitir()
     st.stop()
 
-# --- Métricas Principais com Design Moderno ---
-st.markdown("## 📈 Indicadores Principais")
+# --- Seções calculadas sob demanda para o estado atual dos filtros ---
+# Os cálculos ficam em analise.py; cada seção só junta resultados e monta as figuras
+fontes = Fontes(df, indice, cubo, sketch, backend, mapa_cargos, serie)
+secoes = Secoes(cache_resultados, quantis_exatos, versao, perfil=perfil)
+
+@secoes.secao('base')
+def calcular_base(filtros, dependencias):
+    # Células do cubo correspondentes aos filtros
+    with perfil.etapa('fatia'):
+        celulas = fontes.fatia(filtros)
+    with perfil.etapa('kpis'):
+        kpis = calcular_kpis(fontes, filtros, celulas, exato=quantis_exatos)
+    return {'celulas': celulas, 'kpis': kpis}
+
+@secoes.secao('graficos_linha1', depende_de=['base'])
+def calcular_graficos_linha1(filtros, dependencias):
+    cargos = top_cargos(fontes, filtros, dependencias['base']['celulas'])
+    return {
+        'top_cargos': cargos,
+        'fig_cargos': construir_grafico('cargos', cargos) if not cargos.empty else None,
+    }
 
-# Cálculo das métricas
-salario_medio = df_filtrado['usd'].mean()
-salario_mediano = df_filtrado['usd'].median()
-salario_maximo = df_filtrado['usd'].max()
-salario_minimo = df_filtrado['usd'].min()
-total_registros = df_filtrado.shape[0]
-cargo_mais_frequente = df_filtrado["cargo"].mode()[0] if not df_filtrado.empty else "N/A"
+@secoes.secao('graficos_linha2', depende_de=['base'])
+def calcular_graficos_linha2(filtros, dependencias):
+    celulas = dependencias['base']['celulas']
 
-# Cálculo de crescimento (comparação com ano anterior se disponível)
-if len(anos_selecionados) > 1:
-    ano_atual = max(anos_selecionados)
-    ano_anterior = max([a for a in anos_selecionados if a < ano_atual]) if len([a for a in anos_selecionados if a < ano_atual]) > 0 else ano_atual
-    
-    salario_atual = df_filtrado[df_filtrado['ano'] == ano_atual]['usd'].mean()
-    salario_anterior = df_filtrado[df_filtrado['ano'] == ano_anterior]['usd'].mean()
-    
-    if not pd.isna(salario_anterior) and salario_anterior > 0:
-        crescimento = ((salario_atual - salario_anterior) / salario_anterior) * 100
-    else:
-        crescimento = 0
-else:
-    crescimento = 0
+    # Modalidades de trabalho, com nomes mais descritivos
+    remoto_contagem = modalidades_trabalho(fontes, filtros, celulas)
+    tipo_map = {
+        'remoto': '🏠 Remoto',
+        'presencial': '🏢 Presencial',
+        'hibrido': '🔄 Híbrido'
+    }
+    remoto_contagem['tipo_trabalho'] = remoto_contagem['tipo_trabalho'].map(tipo_map)
+
+    # Salários por senioridade e ano (gráfico alternativo quando há apenas um ano)
+    tempo = salario_tempo(fontes, filtros, celulas)
+    return {
+        'salario_tempo': tempo,
+        'fig_remoto': construir_grafico('remoto', remoto_contagem),
+        'fig_tempo': construir_grafico('tempo' if len(filtros.ano) > 1 else 'senioridade', tempo),
+    }
+
+@secoes.secao('mapa', depende_de=['base'])
+def calcular_mapa(filtros, dependencias):
+    base = dependencias['base']
+    # Todos os cargos de uma vez: trocar o cargo do mapa é só uma consulta a esta tabela
+    paises_cargos = salario_pais_cargos(fontes, filtros, base['celulas'])
+    return {
+        'paises_cargos': paises_cargos,
+        'cargos': cargos_mapa(paises_cargos),
+        'cargo_padrao': cargo_mapa(fontes, filtros, base['celulas'], base['kpis']),
+    }
+
+@secoes.secao('tendencia')
+def calcular_tendencia(filtros, dependencias):
+    # Série anual pré-agregada: crescimento entre anos consecutivos, CAGR e por senioridade
+    tendencia = tendencia_anual(fontes, filtros, exato=quantis_exatos)
+    tendencia['fig_tendencia'] = construir_grafico('tendencia', tendencia['anual']) if not tendencia['anual'].empty else None
+    return tendencia
+
+@secoes.secao('estatisticas', depende_de=['base'])
+def calcular_estatisticas(filtros, dependencias):
+    base = dependencias['base']
+    return {
+        'stats_salario': descrever_salario(fontes, filtros, base['celulas'], base['kpis'], exato=quantis_exatos),
+        # Todas as dimensões de uma vez, num único bincount sobre as células do cubo
+        'distribuicao_categorias': distribuicao_categorias(fontes, filtros, base['celulas']),
+    }
+
+@secoes.secao('insights', depende_de=['base'])
+def calcular_insights(filtros, dependencias):
+    base = dependencias['base']
+    return gerar_insights(fontes, filtros, base['celulas'])
+
+kpis = secoes.calcular('base', filtros)['kpis']
+salario_medio = kpis['salario_medio']
+salario_mediano = kpis['salario_mediano']
+salario_maximo = kpis['salario_maximo']
+total_registros = kpis['total_registros']
+crescimento = kpis['crescimento']
+
+# Seções visíveis, independentes entre si, calculadas em paralelo antes do layout
+VISUALIZACOES_DETALHE = ["📋 Dados Completos", "📊 Estatísticas", "💡 Insights"]
+detalhe_atual = st.session_state.get("detalhe", VISUALIZACOES_DETALHE[0])
+secoes.calcular_varias(
+    [nome for nome, visivel in [
+        ('graficos_linha1', mostrar_linha1),
+        ('graficos_linha2', mostrar_linha2),
+        ('mapa', mostrar_mapa),
+        ('tendencia', mostrar_tendencia),
+        ('estatisticas', detalhe_atual == VISUALIZACOES_DETALHE[1]),
+        ('insights', detalhe_atual == VISUALIZACOES_DETALHE[2]),
+    ] if visivel],
+    filtros,
+    executor,
+)
+
+# --- Métricas Principais com Design Moderno ---
+st.markdown("## 📈 Indicadores Principais")
 
 # Layout das métricas em 5 colunas
 col1, col2, col3, col4, col5 = st.columns(5)
@@ -353,174 +628,108 @@ st.markdown('<hr class="section-divider">', unsafe_allow_html=True)
 st.markdown("## 📊 Análises Visuais Avançadas")
 
 # Primeira linha de gráficos
-col_graf1, col_graf2 = st.columns(2)
-
-with col_graf1:
-    st.markdown("### 🏆 Top 10 Cargos por Salário")
-    top_cargos = df_filtrado.groupby('cargo')['usd'].agg(['mean', 'count']).reset_index()
-    top_cargos = top_cargos[top_cargos['count'] >= 5]  # Filtrar cargos com pelo menos 5 registros
-    top_cargos = top_cargos.nlargest(10, 'mean').sort_values('mean', ascending=True)
-    
-    if not top_cargos.empty:
-        fig_cargos = px.bar(
-            top_cargos,
-            x='mean',
-            y='cargo',
-            orientation='h',
-            color='mean',
-            color_continuous_scale='viridis',
-            title="",
-            labels={'mean': 'Salário Médio (USD)', 'cargo': 'Cargo'}
-        )
-        fig_cargos.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font_color='white',
-            showlegend=False,
-            height=400
-        )
-        st.plotly_chart(fig_cargos, use_container_width=True)
-    else:
-        st.warning("Dados insuficientes para exibir o gráfico de cargos.")
-
-with col_graf2:
-    st.markdown("### 📈 Distribuição Salarial")
-    fig_hist = px.histogram(
-        df_filtrado,
-        x='usd',
-        nbins=25,
-        color_discrete_sequence=['#6366f1'],
-        title="",
-        labels={'usd': 'Salário (USD)', 'count': 'Frequência'}
-    )
-    
-    # Adicionar linha da média
-    fig_hist.add_vline(
-        x=salario_medio,
-        line_dash="dash",
-        line_color="#10b981",
-        annotation_text=f"Média: ${salario_medio:,.0f}"
-    )
-    
-    fig_hist.update_layout(
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font_color='white',
-        showlegend=False,
-        height=400
-    )
-    st.plotly_chart(fig_hist, use_container_width=True)
+if mostrar_linha1:
+    graficos_linha1 = secoes.calcular('graficos_linha1', filtros)
+    col_graf1, col_graf2 = st.columns(2)
+    
+    with col_graf1:
+        st.markdown("### 🏆 Top 10 Cargos por Salário")
+        if graficos_linha1['fig_cargos'] is not None:
+            st.plotly_chart(json.loads(graficos_linha1['fig_cargos']), use_container_width=True)
+        else:
+            st.warning("Dados insuficientes para exibir o gráfico de cargos.")
+    
+    with col_graf2:
+        st.markdown("### 📈 Distribuição Salarial")
+        n_faixas = st.select_slider("Faixas salariais:", options=FAIXAS_DISPONIVEIS, value=25, key="faixas_histograma")
+        with secoes.medir('histograma'):
+            if filtros.por_linhas:
+                # Com cargo ou país, as poucas linhas filtradas vão às mesmas bordas globais
+                bordas, contagens = histograma.contar_valores(fontes.filtrar(filtros)['usd'], n_faixas)
+            else:
+                bordas, contagens = histograma.contar(selecoes, n_faixas)
+            fig_hist = construir_grafico('hist', bordas, contagens, salario_medio)
+        st.plotly_chart(json.loads(fig_hist), use_container_width=True)
 
 # Segunda linha de gráficos
-col_graf3, col_graf4 = st.columns(2)
-
-with col_graf3:
-    st.markdown("### 🏠 Modalidades de Trabalho")
-    remoto_contagem = df_filtrado['remoto'].value_counts().reset_index()
-    remoto_contagem.columns = ['tipo_trabalho', 'quantidade']
+if mostrar_linha2:
+    graficos_linha2 = secoes.calcular('graficos_linha2', filtros)
+    col_graf3, col_graf4 = st.columns(2)
     
-    # Mapear nomes mais descritivos
-    tipo_map = {
-        'remoto': '🏠 Remoto',
-        'presencial': '🏢 Presencial',
-        'hibrido': '🔄 Híbrido'
-    }
-    remoto_contagem['tipo_trabalho'] = remoto_contagem['tipo_trabalho'].map(tipo_map)
+    with col_graf3:
+        st.markdown("### 🏠 Modalidades de Trabalho")
+        st.plotly_chart(json.loads(graficos_linha2['fig_remoto']), use_container_width=True)
     
-    fig_remoto = px.pie(
-        remoto_contagem,
-        names='tipo_trabalho',
-        values='quantidade',
-        color_discrete_sequence=['#6366f1', '#8b5cf6', '#06b6d4'],
-        title="",
-        hole=0.4
-    )
-    fig_remoto.update_traces(
-        textinfo='percent+label',
-        textfont_size=12
-    )
-    fig_remoto.update_layout(
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font_color='white',
-        showlegend=True,
-        height=400
-    )
-    st.plotly_chart(fig_remoto, use_container_width=True)
-
-with col_graf4:
-    st.markdown("### 🌍 Salários por Senioridade e Ano")
-    if len(anos_selecionados) > 1:
-        salario_tempo = df_filtrado.groupby(['ano', 'senioridade'])['usd'].mean().reset_index()
-        
-        fig_tempo = px.line(
-            salario_tempo,
-            x='ano',
-            y='usd',
-            color='senioridade',
-            markers=True,
-            color_discrete_sequence=['#6366f1', '#8b5cf6', '#06b6d4', '#10b981'],
-            title="",
-            labels={'usd': 'Salário Médio (USD)', 'ano': 'Ano', 'senioridade': 'Senioridade'}
-        )
-        fig_tempo.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font_color='white',
-            height=400
-        )
-        st.plotly_chart(fig_tempo, use_container_width=True)
-    else:
-        # Gráfico alternativo quando há apenas um ano
-        salario_senioridade = df_filtrado.groupby('senioridade')['usd'].mean().reset_index()
-        fig_senior = px.bar(
-            salario_senioridade,
-            x='senioridade',
-            y='usd',
-            color='usd',
-            color_continuous_scale='viridis',
-            title="",
-            labels={'usd': 'Salário Médio (USD)', 'senioridade': 'Senioridade'}
-        )
-        fig_senior.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font_color='white',
-            showlegend=False,
-            height=400
-        )
-        st.plotly_chart(fig_senior, use_container_width=True)
+    with col_graf4:
+        st.markdown("### 🌍 Salários por Senioridade e Ano")
+        st.plotly_chart(json.loads(graficos_linha2['fig_tempo']), use_container_width=True)
 
 # --- Terceira linha: Mapa Mundial ---
-st.markdown("### 🗺️ Distribuição Global de Salários")
-
-# Filtrar apenas Data Scientists para o mapa (ou cargo mais comum se não houver)
-cargo_para_mapa = 'Data Scientist' if 'Data Scientist' in df_filtrado['cargo'].values else cargo_mais_frequente
-df_mapa = df_filtrado[df_filtrado['cargo'] == cargo_para_mapa]
-
-if not df_mapa.empty:
-    media_pais = df_mapa.groupby(['residencia_iso3', 'residencia'])['usd'].agg(['mean', 'count']).reset_index()
-    media_pais.columns = ['iso3', 'pais', 'salario_medio', 'quantidade']
-    
-    fig_mapa = px.choropleth(
-        media_pais,
-        locations='iso3',
-        color='salario_medio',
-        hover_name='pais',
-        hover_data={'quantidade': True, 'salario_medio': ':,.0f'},
-        color_continuous_scale='viridis',
-        title=f"Salário médio para {cargo_para_mapa}",
-        labels={'salario_medio': 'Salário Médio (USD)'}
-    )
-    fig_mapa.update_layout(
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font_color='white',
-        height=500
-    )
-    st.plotly_chart(fig_mapa, use_container_width=True)
-else:
-    st.warning("Dados insuficientes para exibir o mapa mundial.")
+if mostrar_mapa:
+    st.markdown("### 🗺️ Distribuição Global de Salários")
+    mapa = secoes.calcular('mapa', filtros)
+    cargos = mapa['cargos']
+
+    # Segue o cargo padrão (Data Scientist ou o mais frequente) até o usuário escolher outro;
+    # o valor é regravado a cada rerun porque o seletor é recriado quando as opções mudam
+    escolhido = st.session_state.get("cargo_mapa")
+    if escolhido not in cargos.index or escolhido == st.session_state.get("cargo_mapa_padrao"):
+        escolhido = mapa['cargo_padrao']
+    st.session_state["cargo_mapa"] = escolhido
+    st.session_state["cargo_mapa_padrao"] = mapa['cargo_padrao']
+    cargo_para_mapa = st.selectbox(
+        "Cargo exibido no mapa",
+        options=list(cargos.index),
+        format_func=lambda cargo: f"{cargo} ({cargos[cargo]:,} registros)",
+        key="cargo_mapa",
+    ) if not cargos.empty else None
+
+    media_pais = salario_pais(fontes, filtros, cargo_para_mapa, paises_cargos=mapa['paises_cargos'])
+    if media_pais is not None:
+        st.plotly_chart(json.loads(construir_grafico('mapa', media_pais, cargo_para_mapa)), use_container_width=True)
+    else:
+        st.warning("Dados insuficientes para exibir o mapa mundial.")
+
+# --- Quarta linha: Tendência Anual ---
+if mostrar_tendencia:
+    st.markdown("### 📆 Tendência Anual")
+    tendencia = secoes.calcular('tendencia', filtros)
+    anual = tendencia['anual']
+
+    if tendencia['fig_tendencia'] is not None:
+        col_tend1, col_tend2 = st.columns([3, 2])
+
+        with col_tend1:
+            st.plotly_chart(json.loads(tendencia['fig_tendencia']), use_container_width=True)
+
+        with col_tend2:
+            if len(anual) > 1:
+                col_cagr, col_ultimo = st.columns(2)
+                col_cagr.metric(
+                    f"CAGR {anual['ano'].iloc[0]}-{anual['ano'].iloc[-1]}",
+                    f"{tendencia['cagr']:+.1f}%",
+                )
+                col_ultimo.metric(
+                    f"Crescimento {anual['ano'].iloc[-1]}",
+                    f"{anual['crescimento'].iloc[-1]:+.1f}%",
+                )
+                # Crescimento do salário médio sobre o ano anterior, por senioridade
+                crescimento_senioridade = tendencia['por_senioridade'].pivot(
+                    index='senioridade', columns='ano', values='crescimento'
+                ).iloc[:, 1:]
+                crescimento_senioridade.columns = crescimento_senioridade.columns.astype(str)
+                st.dataframe(
+                    crescimento_senioridade,
+                    column_config={
+                        coluna: st.column_config.NumberColumn(coluna, format="%+.1f%%")
+                        for coluna in crescimento_senioridade.columns
+                    },
+                    use_container_width=True
+                )
+            else:
+                st.info("Selecione ao menos dois anos com dados para ver o crescimento.")
+    else:
+        st.warning("Dados insuficientes para exibir a tendência anual.")
 
 # --- Divider ---
 st.markdown('<hr class="section-divider">', unsafe_allow_html=True)
@@ -528,56 +737,103 @@ st.markdown('<hr class="section-divider">', unsafe_allow_html=True)
 # --- Análise Detalhada ---
 st.markdown("## 🔍 Análise Detalhada")
 
-# Tabs para organizar melhor o conteúdo
-tab1, tab2, tab3 = st.tabs(["📋 Dados Completos", "📊 Estatísticas", "💡 Insights"])
+# Apenas a visualização escolhida é calculada (abas do Streamlit executariam as três)
+detalhe = st.radio(
+    "Visualização:",
+    VISUALIZACOES_DETALHE,
+    horizontal=True,
+    label_visibility="collapsed",
+    key="detalhe"
+)
 
-with tab1:
+# Fragmento: trocar página, ordenação ou formato reexecuta só a tabela
+@st.fragment
+def dados_completos():
     st.markdown("### Tabela de Dados Filtrados")
     
     # Adicionar opções de visualização
-    col_opcoes1, col_opcoes2, col_opcoes3 = st.columns(3)
+    col_opcoes1, col_opcoes2, col_opcoes3, col_opcoes4 = st.columns(4)
     
     with col_opcoes1:
-        mostrar_linhas = st.selectbox("Linhas por página:", [10, 25, 50, 100], index=1)
+        mostrar_linhas = st.selectbox("Linhas por página:", TAMANHOS_PAGINA, index=1)
     
     with col_opcoes2:
-        ordenar_por = st.selectbox("Ordenar por:", ['usd', 'ano', 'cargo', 'senioridade'], index=0)
+        ordenar_por = st.selectbox("Ordenar por:", COLUNAS_ORDENACAO, index=0)
     
     with col_opcoes3:
         ordem_desc = st.checkbox("Ordem decrescente", value=True)
     
-    # Aplicar ordenação
-    df_exibir = df_filtrado.sort_values(ordenar_por, ascending=not ordem_desc).head(mostrar_linhas)
+    total_paginas = max(1, -(-total_registros // mostrar_linhas))
+    # Valor inicial pelo Session State (não por value=) para que o ajuste abaixo
+    # não dispare o aviso de widget com valor padrão e valor definido pela API
+    st.session_state.setdefault("pagina", 1)
+    # Mantém a página atual válida quando os filtros reduzem o total de linhas
+    if st.session_state["pagina"] > total_paginas:
+        st.session_state["pagina"] = total_paginas
     
-    # Formatação da tabela
-    df_formatado = df_exibir.copy()
-    df_formatado['usd'] = df_formatado['usd'].apply(lambda x: f"${x:,.0f}")
+    with col_opcoes4:
+        pagina = st.number_input("Página:", min_value=1, max_value=total_paginas, step=1, key="pagina")
+    
+    # Página pela permutação pré-ordenada, sem ordenar o DataFrame filtrado
+    with perfil.etapa('pagina_tabela'):
+        linhas_pagina = ordenacao.pagina(selecoes, ordenar_por, int(pagina), mostrar_linhas, ordem_desc)
+        
+        # Formatação da tabela
+        df_formatado = df.iloc[linhas_pagina].copy()
+        df_formatado['usd'] = formatar_moeda(df_formatado['usd'])
     
     st.dataframe(
         df_formatado,
         use_container_width=True,
         height=400
     )
+    st.caption(f"Página {int(pagina)} de {total_paginas} · {total_registros:,} registros")
     
-    # Botão para download
-    csv = df_filtrado.to_csv(index=False)
-    st.download_button(
-        label="📥 Baixar dados filtrados (CSV)",
-        data=csv,
-        file_name="dados_salarios_filtrados.csv",
-        mime="text/csv"
-    )
+    # Download gerado apenas quando solicitado, e reaproveitado por filtro e formato
+    col_download1, col_download2 = st.columns(2)
+    
+    with col_download1:
+        formato_download = st.selectbox(
+            "Formato do arquivo:",
+            list(FORMATOS),
+            format_func=lambda formato: FORMATOS[formato].rotulo,
+            key="formato_download"
+        )
+    
+    chave_download = chave_selecao(selecoes, formato_download, versao)
+    with col_download2:
+        preparar = st.button("📦 Preparar download", key="preparar_download")
+    
+    def gerar_arquivo():
+        with perfil.etapa(f'exportacao_{formato_download}'):
+            return exportar(fontes.filtrar(filtros), formato_download)
+    
+    if preparar or chave_download in cache_exportacao:
+        arquivo = cache_exportacao.obter_ou_calcular(chave_download, gerar_arquivo)
+        st.download_button(
+            label=f"📥 Baixar dados filtrados ({FORMATOS[formato_download].rotulo})",
+            data=arquivo,
+            file_name=nome_arquivo(formato_download),
+            mime=FORMATOS[formato_download].mime
+        )
+    
+    # Reexecução só do fragmento: registra as etapas da tabela como um perfil à parte
+    if perfil.emitido:
+        perfil.emitir()
+
+if detalhe == VISUALIZACOES_DETALHE[0]:
+    with secoes.medir('dados_completos'):
+        dados_completos()
 
-with tab2:
+elif detalhe == VISUALIZACOES_DETALHE[1]:
     st.markdown("### Estatísticas Descritivas")
+    estatisticas = secoes.calcular('estatisticas', filtros)
     
     col_stat1, col_stat2 = st.columns(2)
     
     with col_stat1:
         st.markdown("#### 💰 Estatísticas Salariais")
-        stats_salario = df_filtrado['usd'].describe()
-        
-        for stat, value in stats_salario.items():
+        for stat, value in estatisticas['stats_salario'].items():
             if stat in ['mean', 'std', 'min', '25%', '50%', '75%', 'max']:
                 st.metric(
                     label=stat.title(),
@@ -587,56 +843,103 @@ with tab2:
     with col_stat2:
         st.markdown("#### 📊 Distribuição por Categorias")
         
-        st.markdown("**Por Senioridade:**")
-        for senioridade in df_filtrado['senioridade'].value_counts().index:
-            count = df_filtrado['senioridade'].value_counts()[senioridade]
-            percentage = (count / len(df_filtrado)) * 100
-            st.write(f"• {senioridade}: {count} ({percentage:.1f}%)")
+        nomes_dimensoes = {
+            'senioridade': 'Senioridade',
+            'contrato': 'Tipo de Contrato',
+            'remoto': 'Modalidade',
+            'tamanho_empresa': 'Tamanho da Empresa',
+            'residencia_iso3': 'Residência',
+        }
+        dimensoes_exibidas = st.multiselect(
+            "Dimensões:",
+            DIMENSOES_DISTRIBUICAO,
+            default=['senioridade', 'contrato'],
+            format_func=nomes_dimensoes.get,
+            key="dimensoes_distribuicao"
+        )
         
-        st.markdown("**Por Tipo de Contrato:**")
-        for contrato in df_filtrado['contrato'].value_counts().index:
-            count = df_filtrado['contrato'].value_counts()[contrato]
-            percentage = (count / len(df_filtrado)) * 100
-            st.write(f"• {contrato}: {count} ({percentage:.1f}%)")
+        tabela_categorias = estatisticas['distribuicao_categorias']
+        tabela_categorias = tabela_categorias[tabela_categorias['dimensao'].isin(dimensoes_exibidas)]
+        st.dataframe(
+            tabela_categorias.assign(dimensao=tabela_categorias['dimensao'].map(nomes_dimensoes)),
+            column_config={
+                'dimensao': 'Dimensão',
+                'categoria': 'Categoria',
+                'quantidade': st.column_config.NumberColumn('Quantidade', format="%d"),
+                'percentual': st.column_config.NumberColumn('%', format="%.1f%%"),
+            },
+            hide_index=True,
+            use_container_width=True
+        )
 
-with tab3:
+elif detalhe == VISUALIZACOES_DETALHE[2]:
     st.markdown("### 💡 Insights Automáticos")
     
-    # Gerar insights baseados nos dados
-    insights = []
-    
-    # Insight sobre salário médio
-    if salario_medio > 100000:
-        insights.append(f"💰 O salário médio de ${salario_medio:,.0f} está acima de $100k, indicando um mercado bem remunerado.")
-    
-    # Insight sobre crescimento
-    if crescimento > 5:
-        insights.append(f"📈 Houve um crescimento salarial de {crescimento:.1f}% em relação ao período anterior.")
-    elif crescimento < -5:
-        insights.append(f"📉 Houve uma redução salarial de {abs(crescimento):.1f}% em relação ao período anterior.")
-    
-    # Insight sobre modalidade de trabalho
-    remoto_pct = (df_filtrado['remoto'] == 'remoto').sum() / len(df_filtrado) * 100
-    if remoto_pct > 50:
-        insights.append(f"🏠 {remoto_pct:.1f}% dos profissionais trabalham remotamente, mostrando a tendência do trabalho à distância.")
-    
-    # Insight sobre senioridade
-    senior_pct = (df_filtrado['senioridade'] == 'senior').sum() / len(df_filtrado) * 100
-    if senior_pct > 40:
-        insights.append(f"👔 {senior_pct:.1f}% dos profissionais são seniores, indicando um mercado maduro.")
-    
-    # Insight sobre variação salarial
-    coef_variacao = (df_filtrado['usd'].std() / df_filtrado['usd'].mean()) * 100
-    if coef_variacao > 50:
-        insights.append(f"📊 Alta variabilidade salarial (CV: {coef_variacao:.1f}%), indicando grande dispersão nos salários.")
-    
     # Exibir insights
+    insights = secoes.calcular('insights', filtros)
     if insights:
         for i, insight in enumerate(insights, 1):
             st.info(f"**Insight {i}:** {insight}")
     else:
         st.info("Nenhum insight específico identificado com os filtros atuais.")
 
+# --- Tempo de cálculo por seção neste rerun ---
+with st.sidebar:
+    with st.expander("⏱️ Tempo por Seção", expanded=False):
+        st.dataframe(
+            pd.DataFrame(secoes.tempos, columns=['Seção', 'Tempo (ms)', 'Do cache']),
+            column_config={'Tempo (ms)': st.column_config.NumberColumn(format="%.2f")},
+            hide_index=True,
+            use_container_width=True
+        )
+
+# --- Perfil do rerun (depuração) ---
+perfil.registrar_cache('resultados', cache_resultados.estatisticas())
+perfil.registrar_cache('graficos', fabrica.cache.estatisticas())
+perfil.registrar_cache('exportacao', cache_exportacao.estatisticas())
+with st.sidebar:
+    if st.toggle("🐞 Perfil do rerun", value=DEBUG, key="painel_perfil"):
+        relatorio_perfil = perfil.relatorio()
+        st.caption(
+            f"Total: {relatorio_perfil['total_ms']:,.1f} ms · "
+            f"RSS: {relatorio_perfil['rss_bytes'] / 1024 ** 2:,.0f} MB "
+            f"({relatorio_perfil['delta_rss_bytes'] / 1024 ** 2:+,.1f} MB)"
+        )
+        st.dataframe(
+            pd.DataFrame(relatorio_perfil['etapas']).assign(
+                delta_rss_mb=lambda etapas: etapas.pop('delta_rss_bytes') / 1024 ** 2
+            ),
+            column_config={
+                'etapa': 'Etapa',
+                'ms': st.column_config.NumberColumn('Tempo (ms)', format="%.2f"),
+                'delta_rss_mb': st.column_config.NumberColumn('Δ RSS (MB)', format="%+.2f"),
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+        st.dataframe(
+            pd.DataFrame(relatorio_perfil['caches']).T.assign(
+                taxa_acerto=lambda caches: caches['taxa_acerto'] * 100
+            ),
+            column_config={
+                'hits': st.column_config.NumberColumn('Acertos', format="%d"),
+                'misses': st.column_config.NumberColumn('Faltas', format="%d"),
+                'taxa_acerto': st.column_config.NumberColumn('Taxa de acerto', format="%.0f%%"),
+            },
+            use_container_width=True
+        )
+        # Montagens reais de figuras (as servidas do cache de JSON não entram)
+        st.dataframe(
+            fabrica.tempos_construcao(),
+            column_config={
+                'grafico': 'Gráfico',
+                'tempo_medio_ms': st.column_config.NumberColumn('Montagem média (ms)', format="%.2f"),
+                'montagens': st.column_config.NumberColumn('Montagens', format="%d"),
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+
 # --- Footer ---
 st.markdown('<hr class="section-divider">', unsafe_allow_html=True)
 st.markdown("""
@@ -647,3 +950,5 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# Uma linha JSON por rerun no logger dashboard.perfil (e em DASHBOARD_PERFIL_LOG)
+perfil.emitir()
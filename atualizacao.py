@@ -0,0 +1,138 @@
+"""Atualização do dataset em segundo plano, com troca atômica da versão servida.
+
+Uma `VersaoDados` reúne o DataFrame e todas as estruturas derivadas de um
+mesmo conteúdo da fonte (índice, cubo, sketch, ...). O `AtualizadorDados`
+monta a primeira versão na criação e, numa thread daemon, verifica a fonte a
+cada DASHBOARD_ATUALIZACAO segundos (padrão 600; 0 desliga): uma assinatura
+barata (ETag, SHA-256 do arquivo, hash do manifesto) diz se vale recarregar;
+se o conteúdo mudou, a versão nova é montada inteira fora do caminho das
+requisições e só então substitui a atual, numa única atribuição. Cada rerun
+pega a versão uma vez no início e a usa até o fim, então sessões em curso
+nunca misturam estruturas de versões diferentes.
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+logger = logging.getLogger("dashboard.atualizacao")
+
+INTERVALO_PADRAO = 600
+INTERVALO = float(os.environ.get("DASHBOARD_ATUALIZACAO", INTERVALO_PADRAO))
+
+
+@dataclass(frozen=True)
+class VersaoDados:
+    versao: str
+    estruturas: dict
+    carregada_em: float = field(default_factory=time.time)
+    tempo_montagem: float = 0.0
+
+    def __getitem__(self, nome):
+        return self.estruturas[nome]
+
+
+class AtualizadorDados:
+    def __init__(self, carregar, construir, assinatura=None, intervalo=INTERVALO):
+        """`carregar()` -> (df, versão); `construir(df)` -> dict de estruturas; `assinatura()` -> str, "" ou None."""
+        self._carregar = carregar
+        self._construir = construir
+        self._assinatura_fonte = assinatura
+        self.intervalo = intervalo
+        # Uma verificação por vez (thread e pedidos manuais)
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._acordar = threading.Event()
+        self._thread = None
+        self.trocas = 0
+        self.erro = None
+        self.atualizando = False
+        self._assinatura = self._consultar_assinatura()
+        self.verificada_em = time.time()
+        self._atual = self._montar(*self._carregar())
+
+    def atual(self):
+        """Versão servida agora; guarde a referência durante todo o rerun."""
+        return self._atual
+
+    def _consultar_assinatura(self):
+        return self._assinatura_fonte() if self._assinatura_fonte is not None else ""
+
+    def _montar(self, df, versao):
+        inicio = time.perf_counter()
+        estruturas = self._construir(df)
+        return VersaoDados(str(versao), estruturas, tempo_montagem=time.perf_counter() - inicio)
+
+    def verificar(self):
+        """Confere a fonte e troca a versão se o conteúdo mudou; True se houve troca."""
+        with self._lock:
+            self.atualizando = True
+            try:
+                assinatura = self._consultar_assinatura()
+                if assinatura is None:
+                    self.erro = "fonte inacessível"
+                    return False
+                # Assinatura vazia (servidor sem ETag): só a recarga diz se mudou
+                if assinatura and assinatura == self._assinatura:
+                    self.erro = None
+                    return False
+                df, versao = self._carregar()
+                self._assinatura = assinatura
+                self.erro = None
+                if str(versao) == self._atual.versao:
+                    return False
+                nova = self._montar(df, versao)
+                # Troca atômica: reruns em andamento seguem com a referência antiga
+                self._atual = nova
+                self.trocas += 1
+                logger.info("versão %s em uso (montada em %.0f ms)", nova.versao[:12], nova.tempo_montagem * 1000)
+                return True
+            except Exception as erro:
+                self.erro = f"{type(erro).__name__}: {erro}"
+                logger.exception("falha ao atualizar os dados")
+                return False
+            finally:
+                self.verificada_em = time.time()
+                self.atualizando = False
+
+    def solicitar(self):
+        """Pede uma verificação à thread de fundo, sem bloquear quem chamou."""
+        self._acordar.set()
+
+    def iniciar(self):
+        if self.intervalo <= 0 or self._thread is not None:
+            return self
+        self._thread = threading.Thread(target=self._laco, name="atualizador-dados", daemon=True)
+        self._thread.start()
+        return self
+
+    def _laco(self):
+        while not self._parar.is_set():
+            self._acordar.wait(self.intervalo)
+            self._acordar.clear()
+            if not self._parar.is_set():
+                self.verificar()
+
+    def encerrar(self):
+        self._parar.set()
+        self._acordar.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def estado(self):
+        """Versão, idades (s) e situação da última verificação, para o painel lateral."""
+        agora = time.time()
+        versao = self._atual
+        return {
+            'versao': versao.versao,
+            'carregada_em': versao.carregada_em,
+            'idade_s': agora - versao.carregada_em,
+            'verificada_em': self.verificada_em,
+            'desde_verificacao_s': agora - self.verificada_em,
+            'intervalo_s': self.intervalo,
+            'atualizando': self.atualizando,
+            'erro': self.erro,
+            'trocas': self.trocas,
+        }
@@ -0,0 +1,179 @@
+"""Backends de consulta para os filtros e agregações do dashboard.
+
+`BackendPandas` opera sobre o DataFrame em memória; `BackendDuckDB` consulta
+direto os arquivos Parquet (snapshot ou partições) com DuckDB embarcado, sem
+precisar do DataFrame. Os dois devolvem as mesmas estruturas, de modo que o
+dashboard não depende de qual está em uso.
+
+O backend responde só a essas consultas. O dashboard ainda carrega o
+DataFrame inteiro e monta dele o índice, o cubo, os sketches, a tabela e os
+downloads, então o DuckDB não tira a exigência de o dataset caber na RAM:
+ele troca o motor das consultas, não o modo de carga. É um caminho opcional
+de paridade (conferir as agregações pré-computadas contra um motor SQL), não
+de desempenho: com ele ligado o app só faz mais trabalho.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from indice import IndiceFiltros
+
+QUANTIS_DESCRIBE = [0.25, 0.5, 0.75]
+
+
+def _python(valor):
+    return valor.item() if isinstance(valor, np.generic) else valor
+
+
+def _numero(valor):
+    # DuckDB devolve pd.NA em agregações vazias de colunas inteiras
+    return np.nan if pd.isna(valor) else float(valor)
+
+
+class BackendPandas:
+    nome = 'pandas'
+
+    def __init__(self, df, indice=None):
+        """`indice`: o IndiceFiltros já montado sobre `df`, se houver."""
+        self.df = df
+        self.indice = IndiceFiltros(df) if indice is None else indice
+
+    def _filtrar(self, selecoes):
+        return self.indice.filtrar(self.df, selecoes)
+
+    def kpis(self, selecoes):
+        filtrado = self._filtrar(selecoes)
+        usd = filtrado['usd']
+        # Empate no cargo mais frequente: o primeiro em ordem alfabética, como em Series.mode()
+        por_cargo = filtrado.groupby('cargo', observed=True).size()
+        return {
+            'total': len(usd),
+            'media': usd.mean(),
+            'mediana': usd.median(),
+            'maximo': usd.max(),
+            'minimo': usd.min(),
+            'desvio': usd.std(),
+            'cargo_mais_frequente': str(por_cargo.idxmax()) if len(por_cargo) else "N/A",
+            'media_por_ano': {int(ano): media for ano, media in usd.groupby(filtrado['ano']).mean().items()},
+        }
+
+    def top_cargos(self, selecoes, minimo_registros=5, limite=10):
+        top = self._filtrar(selecoes).groupby('cargo', observed=True)['usd'].agg(['mean', 'count']).reset_index()
+        top = top[top['count'] >= minimo_registros]
+        top = top.nlargest(limite, 'mean').sort_values('mean', ascending=True)
+        return top.assign(cargo=top['cargo'].astype(str)).reset_index(drop=True)
+
+    def salario_tempo(self, selecoes):
+        tempo = self._filtrar(selecoes).groupby(['ano', 'senioridade'], observed=True)['usd'].mean().reset_index()
+        return tempo.assign(senioridade=tempo['senioridade'].astype(str))
+
+    def media_pais(self, selecoes, cargo):
+        df_filtrado = self._filtrar(selecoes)
+        df_mapa = df_filtrado[df_filtrado['cargo'] == cargo]
+        media = df_mapa.groupby(['residencia_iso3', 'residencia'], observed=True)['usd'].agg(['mean', 'count']).reset_index()
+        media.columns = ['iso3', 'pais', 'salario_medio', 'quantidade']
+        return media.astype({'iso3': str, 'pais': str})
+
+    def describe(self, selecoes):
+        return self._filtrar(selecoes)['usd'].describe().to_dict()
+
+
+class BackendDuckDB:
+    nome = 'duckdb'
+
+    def __init__(self, parquet):
+        """`parquet`: arquivo ou lista de arquivos fixos da versão servida.
+
+        A view relê os arquivos a cada consulta; um glob ou um caminho regravado
+        no lugar mostraria dados de versões posteriores à que o backend serve.
+        """
+        import duckdb
+
+        self.conexao = duckdb.connect()
+        caminhos = [parquet] if isinstance(parquet, (str, Path)) else list(parquet)
+        lista = ", ".join("'{}'".format(str(caminho).replace("'", "''")) for caminho in caminhos)
+        self.conexao.execute(f"CREATE VIEW salarios AS SELECT * FROM read_parquet([{lista}])")
+
+    def _where(self, selecoes):
+        condicoes, parametros = [], []
+        for dimensao, selecionados in selecoes.items():
+            valores = [_python(v) for v in selecionados]
+            if not valores:
+                condicoes.append("FALSE")
+                continue
+            condicoes.append(f"{dimensao} IN ({', '.join('?' * len(valores))})")
+            parametros.extend(valores)
+        return (" WHERE " + " AND ".join(condicoes)) if condicoes else "", parametros
+
+    def _consultar(self, sql, selecoes, extras=()):
+        where, parametros = self._where(selecoes)
+        return self.conexao.execute(sql.format(where=where), parametros + list(extras)).df()
+
+    def kpis(self, selecoes):
+        linha = self._consultar(
+            "SELECT count(*) AS total, avg(usd) AS media, quantile_cont(usd, 0.5) AS mediana, "
+            "max(usd) AS maximo, min(usd) AS minimo, stddev_samp(usd) AS desvio FROM salarios{where}",
+            selecoes,
+        ).iloc[0]
+        kpis = {chave: (int(valor) if chave == 'total' else _numero(valor)) for chave, valor in linha.items()}
+        cargo = self._consultar(
+            "SELECT CAST(cargo AS VARCHAR) AS cargo FROM salarios{where} "
+            "GROUP BY cargo ORDER BY count(*) DESC, cargo LIMIT 1",
+            selecoes,
+        )
+        por_ano = self._consultar("SELECT ano, avg(usd) AS media FROM salarios{where} GROUP BY ano", selecoes)
+        kpis['cargo_mais_frequente'] = cargo['cargo'].iloc[0] if len(cargo) else "N/A"
+        kpis['media_por_ano'] = {int(ano): float(media) for ano, media in zip(por_ano['ano'], por_ano['media'])}
+        return kpis
+
+    def top_cargos(self, selecoes, minimo_registros=5, limite=10):
+        top = self._consultar(
+            "SELECT CAST(cargo AS VARCHAR) AS cargo, avg(usd) AS mean, count(*) AS count FROM salarios{where} "
+            "GROUP BY cargo HAVING count(*) >= ? ORDER BY mean DESC LIMIT ?",
+            selecoes, [minimo_registros, limite],
+        )
+        return top.sort_values('mean', ascending=True).reset_index(drop=True)
+
+    def salario_tempo(self, selecoes):
+        return self._consultar(
+            "SELECT ano, CAST(senioridade AS VARCHAR) AS senioridade, avg(usd) AS usd FROM salarios{where} "
+            "GROUP BY ano, senioridade ORDER BY ano, senioridade",
+            selecoes,
+        )
+
+    def media_pais(self, selecoes, cargo):
+        where, parametros = self._where(selecoes)
+        where = f"{where} AND cargo = ?" if where else " WHERE cargo = ?"
+        return self.conexao.execute(
+            "SELECT CAST(residencia_iso3 AS VARCHAR) AS iso3, CAST(residencia AS VARCHAR) AS pais, "
+            f"avg(usd) AS salario_medio, count(*) AS quantidade FROM salarios{where} "
+            "GROUP BY residencia_iso3, residencia ORDER BY iso3, pais",
+            parametros + [cargo],
+        ).df()
+
+    def describe(self, selecoes):
+        linha = self._consultar(
+            "SELECT count(usd) AS count, avg(usd) AS mean, stddev_samp(usd) AS std, min(usd) AS min, "
+            "quantile_cont(usd, [0.25, 0.5, 0.75]) AS quartis, max(usd) AS max FROM salarios{where}",
+            selecoes,
+        ).iloc[0]
+        quartis = linha['quartis'] if linha['count'] else [np.nan] * len(QUANTIS_DESCRIBE)
+        return {
+            'count': float(linha['count']),
+            'mean': _numero(linha['mean']),
+            'std': _numero(linha['std']),
+            'min': _numero(linha['min']),
+            '25%': _numero(quartis[0]),
+            '50%': _numero(quartis[1]),
+            '75%': _numero(quartis[2]),
+            'max': _numero(linha['max']),
+        }
+
+
+def criar_backend(nome, df=None, parquet=None, indice=None):
+    if nome == 'pandas':
+        return BackendPandas(df, indice)
+    if nome == 'duckdb':
+        return BackendDuckDB(parquet)
+    raise ValueError(f"Backend desconhecido: {nome}")
@@ -0,0 +1,237 @@
+"""Paridade numérica de analise.py com os cálculos originais do app, linha a linha.
+
+Uso: python -m benchmarks.bench_analise [n_linhas]
+
+A referência é o código que ficava inline em app.py: máscara com isin,
+mean/median/describe e groupbys sobre o DataFrame filtrado. Cada função de
+analise.py é conferida contra ela com quantis exatos, com o sketch (dentro do
+erro relativo garantido sobre os valores em volta da posição do quantil) e
+com o BackendPandas.
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from analise import (
+    Filtros,
+    Fontes,
+    calcular_kpis,
+    cargo_mapa,
+    descrever_salario,
+    distribuicao_categorias,
+    gerar_insights,
+    modalidades_trabalho,
+    salario_pais,
+    salario_tempo,
+    tendencia_anual,
+    top_cargos,
+)
+from backends import BackendPandas
+from benchmarks.bench_pipeline import SELECOES
+from benchmarks.sintetico import gerar_dados
+from dados import tipar_colunas
+from quantis import ERRO_RELATIVO_PADRAO
+
+SELECOES_PARIDADE = {**SELECOES, 'um_ano': {**SELECOES['todos'], 'ano': [2023]}}
+QUARTIS = {'25%': 0.25, '50%': 0.5, '75%': 0.75}
+
+
+def _vizinhos(valores, q):
+    """Valores observados em volta da posição do quantil q (os que o pandas interpola)."""
+    return np.stack([
+        np.asarray(valores.quantile(q, interpolation='lower'), dtype=float),
+        np.asarray(valores.quantile(q, interpolation='higher'), dtype=float),
+    ])
+
+
+def referencia(df, selecoes):
+    """Cálculos do app original sobre as linhas filtradas."""
+    anos_selecionados = selecoes['ano']
+    df_filtrado = df[
+        (df['ano'].isin(anos_selecionados)) &
+        (df['senioridade'].isin(selecoes['senioridade'])) &
+        (df['contrato'].isin(selecoes['contrato'])) &
+        (df['tamanho_empresa'].isin(selecoes['tamanho_empresa']))
+    ]
+    salario_medio = df_filtrado['usd'].mean()
+
+    if len(anos_selecionados) > 1:
+        ano_atual = max(anos_selecionados)
+        ano_anterior = max([a for a in anos_selecionados if a < ano_atual]) if len([a for a in anos_selecionados if a < ano_atual]) > 0 else ano_atual
+        salario_atual = df_filtrado[df_filtrado['ano'] == ano_atual]['usd'].mean()
+        salario_anterior = df_filtrado[df_filtrado['ano'] == ano_anterior]['usd'].mean()
+        if not pd.isna(salario_anterior) and salario_anterior > 0:
+            crescimento = ((salario_atual - salario_anterior) / salario_anterior) * 100
+        else:
+            crescimento = 0
+    else:
+        crescimento = 0
+
+    cargos = df_filtrado.groupby('cargo', observed=True)['usd'].agg(['mean', 'count']).reset_index()
+    cargos = cargos[cargos['count'] >= 5]
+    cargos = cargos.nlargest(10, 'mean').sort_values('mean', ascending=True)
+
+    remoto_contagem = df_filtrado['remoto'].value_counts()
+    remoto_contagem = remoto_contagem[remoto_contagem > 0].reset_index()
+    remoto_contagem.columns = ['tipo_trabalho', 'quantidade']
+
+    if len(anos_selecionados) > 1:
+        tempo = df_filtrado.groupby(['ano', 'senioridade'], observed=True)['usd'].mean().reset_index()
+    else:
+        tempo = df_filtrado.groupby('senioridade', observed=True)['usd'].mean().reset_index()
+
+    cargo_mais_frequente = df_filtrado["cargo"].mode()[0]
+    cargo_para_mapa = 'Data Scientist' if 'Data Scientist' in df_filtrado['cargo'].values else cargo_mais_frequente
+    df_mapa = df_filtrado[df_filtrado['cargo'] == cargo_para_mapa]
+    media_pais = df_mapa.groupby(['residencia_iso3', 'residencia'], observed=True)['usd'].agg(['mean', 'count']).reset_index()
+    media_pais.columns = ['iso3', 'pais', 'salario_medio', 'quantidade']
+
+    senioridade = df_filtrado['senioridade'].value_counts()
+    senioridade = senioridade[senioridade > 0]
+
+    por_ano = df_filtrado.groupby('ano')['usd']
+    anual = por_ano.agg(['size', 'mean', 'median'])
+    por_ano_senioridade = df_filtrado.groupby(['ano', 'senioridade'], observed=True)['usd']
+    por_senioridade = por_ano_senioridade.agg(['size', 'mean', 'median'])
+
+    return {
+        'kpis': {
+            'total_registros': df_filtrado.shape[0],
+            'salario_medio': salario_medio,
+            'salario_mediano': df_filtrado['usd'].median(),
+            'salario_maximo': df_filtrado['usd'].max(),
+            'salario_minimo': df_filtrado['usd'].min(),
+            'crescimento': crescimento,
+        },
+        'cv': (df_filtrado['usd'].std() / df_filtrado['usd'].mean()) * 100,
+        'top_cargos': cargos,
+        'remoto': remoto_contagem,
+        'tempo': tempo,
+        'cargo_mapa': cargo_para_mapa,
+        'media_pais': media_pais,
+        'describe': df_filtrado['usd'].describe().to_dict(),
+        'senioridade_pct': senioridade / len(df_filtrado) * 100,
+        'anual': anual,
+        'crescimento_anual': anual['mean'].pct_change() * 100,
+        'por_senioridade': por_senioridade,
+        'vizinhos': {
+            'salario_mediano': _vizinhos(df_filtrado['usd'], 0.5),
+            **{chave: _vizinhos(df_filtrado['usd'], q) for chave, q in QUARTIS.items()},
+            'anual': _vizinhos(por_ano, 0.5),
+            'por_senioridade': _vizinhos(por_ano_senioridade, 0.5),
+        },
+    }
+
+
+def _conferir_quantil(atual, esperado, vizinhos, exato, nome):
+    """Exato: igual ao pandas. Sketch: dentro do erro relativo dos valores em volta da posição.
+
+    Com poucas linhas a interpolação do pandas cai longe dos dois valores
+    vizinhos, e a garantia do sketch vale para o valor observado na posição.
+    """
+    if exato:
+        np.testing.assert_allclose(atual, esperado, rtol=1e-9, err_msg=nome)
+        return
+    folga = ERRO_RELATIVO_PADRAO + 1e-9
+    atual = np.asarray(atual, dtype=float)
+    baixo, alto = vizinhos
+    assert np.all((atual >= baixo * (1 - folga)) & (atual <= alto * (1 + folga))), (nome, atual, baixo, alto)
+
+
+def _conferir(fontes, filtros, esperado, exato):
+    """Compara as funções de analise.py com a referência; quantis com tolerância do sketch."""
+    vizinhos = esperado['vizinhos']
+    celulas = fontes.fatia(filtros)
+    kpis = calcular_kpis(fontes, filtros, celulas, exato=exato)
+    for chave, valor in esperado['kpis'].items():
+        if chave == 'salario_mediano':
+            _conferir_quantil(kpis[chave], valor, vizinhos[chave], exato, chave)
+        else:
+            np.testing.assert_allclose(kpis[chave], valor, rtol=1e-9, atol=1e-9, err_msg=chave)
+    np.testing.assert_allclose(kpis['cv'], esperado['cv'], rtol=1e-9)
+
+    cargos = top_cargos(fontes, filtros, celulas)
+    assert list(cargos['cargo'].astype(str)) == list(esperado['top_cargos']['cargo'].astype(str))
+    np.testing.assert_allclose(cargos[['mean', 'count']].to_numpy(float), esperado['top_cargos'][['mean', 'count']].to_numpy(float), rtol=1e-9)
+
+    remoto = modalidades_trabalho(fontes, filtros, celulas)
+    pd.testing.assert_series_equal(
+        remoto.set_index(remoto['tipo_trabalho'].astype(str))['quantidade'].sort_index().astype('int64'),
+        esperado['remoto'].set_index(esperado['remoto']['tipo_trabalho'].astype(str))['quantidade'].sort_index().astype('int64'),
+        check_names=False, check_index_type=False,
+    )
+
+    tempo = salario_tempo(fontes, filtros, celulas)
+    np.testing.assert_allclose(tempo['usd'].to_numpy(float), esperado['tempo']['usd'].to_numpy(float), rtol=1e-9)
+
+    cargo = cargo_mapa(fontes, filtros, celulas, kpis)
+    assert cargo == esperado['cargo_mapa'], (cargo, esperado['cargo_mapa'])
+    pais = salario_pais(fontes, filtros, cargo, celulas)
+    assert list(pais['iso3'].astype(str)) == list(esperado['media_pais']['iso3'].astype(str))
+    assert list(pais['pais'].astype(str)) == list(esperado['media_pais']['pais'].astype(str))
+    np.testing.assert_allclose(pais[['salario_medio', 'quantidade']].to_numpy(float), esperado['media_pais'][['salario_medio', 'quantidade']].to_numpy(float), rtol=1e-9)
+
+    descricao = descrever_salario(fontes, filtros, celulas, kpis, exato=exato)
+    for chave, valor in esperado['describe'].items():
+        if chave in QUARTIS:
+            _conferir_quantil(descricao[chave], valor, vizinhos[chave], exato, chave)
+        else:
+            np.testing.assert_allclose(descricao[chave], valor, rtol=1e-9, err_msg=chave)
+
+    tabela = distribuicao_categorias(fontes, filtros, celulas)
+    senioridade = tabela[tabela['dimensao'] == 'senioridade'].set_index('categoria')['percentual']
+    np.testing.assert_allclose(
+        senioridade.sort_index().to_numpy(), esperado['senioridade_pct'].sort_index().to_numpy(), rtol=1e-9
+    )
+
+    gerar_insights(fontes, filtros, celulas)
+
+    tendencia = tendencia_anual(fontes, filtros, exato=exato)
+    anual, esperado_anual = tendencia['anual'], esperado['anual']
+    assert list(anual['ano']) == list(esperado_anual.index)
+    np.testing.assert_array_equal(anual['registros'], esperado_anual['size'])
+    np.testing.assert_allclose(anual['salario_medio'], esperado_anual['mean'], rtol=1e-9)
+    _conferir_quantil(anual['salario_mediano'], esperado_anual['median'], vizinhos['anual'], exato, 'mediana anual')
+    np.testing.assert_allclose(anual['crescimento'], esperado['crescimento_anual'], rtol=1e-9)
+    por_senioridade = tendencia['por_senioridade'].set_index(['ano', 'senioridade'])
+    por_senioridade = por_senioridade.loc[[(ano, str(s)) for ano, s in esperado['por_senioridade'].index]]
+    np.testing.assert_allclose(por_senioridade['salario_medio'], esperado['por_senioridade']['mean'], rtol=1e-9)
+    _conferir_quantil(
+        por_senioridade['salario_mediano'], esperado['por_senioridade']['median'],
+        vizinhos['por_senioridade'], exato, 'mediana por senioridade',
+    )
+
+
+def main(n_linhas=200_000):
+    df = tipar_colunas(gerar_dados(n_linhas))
+    inicio = time.perf_counter()
+    fontes = Fontes.de_dataframe(df)
+    print(f"Linhas: {n_linhas:,} | estruturas: {(time.perf_counter() - inicio) * 1000:.0f} ms")
+    com_backend = Fontes(df, fontes.indice, fontes.cubo, fontes.sketch, BackendPandas(df, fontes.indice))
+
+    for nome, selecoes in SELECOES_PARIDADE.items():
+        filtros = Filtros.de_selecoes(selecoes)
+        if fontes.indice.contar(selecoes) == 0:
+            # O app para antes dos cálculos quando a seleção está vazia
+            print(f"{nome:>18}: seleção vazia")
+            continue
+        inicio = time.perf_counter()
+        esperado = referencia(df, selecoes)
+        t_referencia = time.perf_counter() - inicio
+        _conferir(fontes, filtros, esperado, exato=True)
+        _conferir(fontes, filtros, esperado, exato=False)
+        _conferir(com_backend, filtros, esperado, exato=True)
+        inicio = time.perf_counter()
+        celulas = fontes.fatia(filtros)
+        calcular_kpis(fontes, filtros, celulas)
+        top_cargos(fontes, filtros, celulas)
+        salario_tempo(fontes, filtros, celulas)
+        t_analise = time.perf_counter() - inicio
+        print(f"{nome:>18}: paridade ok (exato, sketch, backend pandas) | "
+              f"referência {t_referencia * 1000:.1f} ms | analise {t_analise * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,174 @@
+"""Atualização em segundo plano: troca atômica da versão e leituras durante a remontagem.
+
+Uso: python -m benchmarks.bench_atualizacao [n_linhas] [--leitores N]
+
+O CSV sintético é servido por um http.server local com ETag (como no
+bench_snapshot), então roda offline. Confere que: uma fonte inalterada custa
+só o HEAD, sem remontagem; uma fonte alterada gera uma versão nova, trocada
+de uma vez, enquanto a versão antiga continua íntegra para quem já a tinha;
+leitores seguem respondendo durante a remontagem; uma fonte inacessível
+mantém a versão em uso e registra o erro; a thread de fundo atende a
+`solicitar()`. O backend DuckDB de cada versão fica preso aos arquivos dela
+(cópia fixada do snapshot, partes do manifesto): nem a regravação do
+snapshot nem a ingestão de outro arquivo mudam o que a versão antiga responde.
+"""
+import argparse
+import functools
+import http.server
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from analise import Filtros, Fontes, calcular_kpis
+from atualizacao import AtualizadorDados
+from backends import BackendDuckDB
+from benchmarks.bench_snapshot import _HandlerComETag
+from benchmarks.sintetico import gerar_dados
+from dados import assinatura_fonte, carregar_dados, fixar_snapshot, versao_dados
+from ingestao import ingerir, partes_particoes
+
+SELECOES = {'ano': [2024, 2025], 'senioridade': ['senior'], 'contrato': ['integral'], 'tamanho_empresa': ['media', 'grande']}
+
+
+def _construir(df, parquet=None):
+    fontes = Fontes.de_dataframe(df)
+    return {'df': df, 'fontes': fontes, 'duckdb': BackendDuckDB(parquet()) if parquet else None}
+
+
+def _consultar(versao):
+    fontes = versao['fontes']
+    return calcular_kpis(fontes, Filtros.de_selecoes(SELECOES))
+
+
+class _Leitores:
+    """Threads que repetem a consulta sobre a versão atual, como reruns concorrentes."""
+
+    def __init__(self, atualizador, n):
+        self.atualizador = atualizador
+        self.parar = threading.Event()
+        self.tempos = []
+        self.versoes = set()
+        self.threads = [threading.Thread(target=self._ler, daemon=True) for _ in range(n)]
+
+    def _ler(self):
+        while not self.parar.is_set():
+            versao = self.atualizador.atual()
+            inicio = time.perf_counter()
+            _consultar(versao)
+            self.tempos.append(time.perf_counter() - inicio)
+            self.versoes.add(versao.versao)
+
+    def __enter__(self):
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.parar.set()
+        for thread in self.threads:
+            thread.join()
+
+
+def main(n_linhas=500_000, leitores=2):
+    with tempfile.TemporaryDirectory() as pasta:
+        pasta = Path(pasta)
+        csv = pasta / "dados.csv"
+        gerar_dados(n_linhas).to_csv(csv, index=False)
+
+        handler = functools.partial(_HandlerComETag, directory=str(pasta))
+        servidor = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{servidor.server_address[1]}/dados.csv"
+        snapshot = pasta / "snap"
+
+        def carregar():
+            return carregar_dados(url, snapshot, mapeado=True), versao_dados(url, snapshot)
+
+        try:
+            inicio = time.perf_counter()
+            construir = functools.partial(_construir, parquet=lambda: fixar_snapshot(url, snapshot))
+            atualizador = AtualizadorDados(carregar, construir, lambda: assinatura_fonte(url), intervalo=0)
+            t_inicial = time.perf_counter() - inicio
+            antiga = atualizador.atual()
+            kpis_antigos = _consultar(antiga)
+
+            # Fonte inalterada: só a assinatura, sem recarga nem remontagem
+            inicio = time.perf_counter()
+            assert not atualizador.verificar()
+            t_inalterada = time.perf_counter() - inicio
+            assert atualizador.atual() is antiga and atualizador.trocas == 0
+
+            # Fonte alterada: versão nova montada com leitores ativos
+            gerar_dados(n_linhas + n_linhas // 10, seed=7).to_csv(csv, index=False)
+            with _Leitores(atualizador, leitores) as ativos:
+                time.sleep(0.2)
+                lidas_antes = len(ativos.tempos)
+                inicio = time.perf_counter()
+                assert atualizador.verificar()
+                t_troca = time.perf_counter() - inicio
+                lidas_durante = len(ativos.tempos) - lidas_antes
+                time.sleep(0.2)
+            nova = atualizador.atual()
+            assert nova is not antiga and nova.versao != antiga.versao and atualizador.trocas == 1
+            assert len(nova['df']) == n_linhas + n_linhas // 10
+            # A versão antiga segue íntegra para os reruns que ainda a usam
+            assert len(antiga['df']) == n_linhas
+            assert _consultar(antiga) == kpis_antigos
+            # O DuckDB da versão antiga consulta a cópia fixada, não o snapshot regravado
+            assert antiga['duckdb'].kpis({})['total'] == n_linhas
+            assert nova['duckdb'].kpis({})['total'] == n_linhas + n_linhas // 10
+            assert ativos.versoes == {antiga.versao, nova.versao}, ativos.versoes
+            assert lidas_durante > 0
+
+            # Fonte inacessível: a versão em uso continua, com o erro registrado
+            csv.rename(pasta / "fora.csv")
+            assert not atualizador.verificar()
+            assert atualizador.atual() is nova and atualizador.estado()['erro']
+            (pasta / "fora.csv").rename(csv)
+            assert not atualizador.verificar() and atualizador.estado()['erro'] is None
+
+            # Thread de fundo: solicitar() antecipa a verificação do intervalo
+            atualizador.intervalo = 3600
+            atualizador.iniciar()
+            gerar_dados(n_linhas, seed=11).to_csv(csv, index=False)
+            inicio = time.perf_counter()
+            atualizador.solicitar()
+            while atualizador.trocas < 2:
+                assert time.perf_counter() - inicio < 120, "a thread de fundo não trocou a versão"
+                time.sleep(0.05)
+            t_fundo = time.perf_counter() - inicio
+            atualizador.encerrar()
+        finally:
+            servidor.shutdown()
+
+        # Partições: o backend montado antes de uma ingestão segue com as partes da sua versão
+        particoes = pasta / "particoes"
+        for seed, nome in [(3, "lote-1.csv"), (5, "lote-2.csv")]:
+            gerar_dados(n_linhas // 10, seed=seed).to_csv(pasta / nome, index=False)
+        ingerir(pasta / "lote-1.csv", particoes)
+        backend_particoes = BackendDuckDB(partes_particoes(particoes))
+        ingerir(pasta / "lote-2.csv", particoes)
+        assert backend_particoes.kpis({})['total'] == n_linhas // 10
+        assert BackendDuckDB(partes_particoes(particoes)).kpis({})['total'] == 2 * (n_linhas // 10)
+
+    tempos = np.array(ativos.tempos) * 1000
+    print(f"Linhas: {n_linhas:,} | leitores: {leitores}")
+    print(f"Carga e montagem iniciais          : {t_inicial * 1000:9.1f} ms")
+    print(f"Verificação sem mudança (HEAD)     : {t_inalterada * 1000:9.1f} ms")
+    print(f"Verificação com troca              : {t_troca * 1000:9.1f} ms (montagem {nova.tempo_montagem * 1000:.1f} ms)")
+    print(f"Leituras durante a troca           : {lidas_durante:9d}")
+    print(f"Leitura p50 / máx                  : {np.percentile(tempos, 50):9.1f} / {tempos.max():.1f} ms")
+    print(f"Troca pela thread de fundo         : {t_fundo * 1000:9.1f} ms")
+    print("Ok: sem remontagem com a fonte inalterada, troca atômica, versão antiga íntegra (inclusive no DuckDB), "
+          "erro sem troca")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("n_linhas", nargs="?", type=int, default=500_000)
+    parser.add_argument("--leitores", type=int, default=2)
+    args = parser.parse_args()
+    main(args.n_linhas, args.leitores)
@@ -0,0 +1,78 @@
+"""Paridade e latência dos backends pandas e DuckDB.
+
+Uso: python -m benchmarks.bench_backends [n_linhas]
+
+Cada consulta do dashboard é executada nos dois backends para várias
+seleções; o script falha se os resultados divergirem.
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from backends import BackendDuckDB, BackendPandas
+from benchmarks.cronometro import mediana
+from benchmarks.sintetico import ANOS, CONTRATOS, SENIORIDADES, TAMANHOS, gerar_dados
+from dados import tipar_colunas
+
+SELECOES = [
+    {'ano': ANOS, 'senioridade': SENIORIDADES, 'contrato': CONTRATOS, 'tamanho_empresa': TAMANHOS},
+    {'ano': [2024], 'senioridade': ['senior'], 'contrato': ['integral'], 'tamanho_empresa': ['media']},
+    {'ano': [2021, 2025], 'senioridade': ['junior', 'executivo'], 'contrato': CONTRATOS, 'tamanho_empresa': ['grande']},
+    {'ano': [], 'senioridade': SENIORIDADES, 'contrato': CONTRATOS, 'tamanho_empresa': TAMANHOS},
+]
+CONSULTAS = {
+    'kpis': lambda backend, selecoes: backend.kpis(selecoes),
+    'top_cargos': lambda backend, selecoes: backend.top_cargos(selecoes),
+    'salario_tempo': lambda backend, selecoes: backend.salario_tempo(selecoes),
+    'media_pais': lambda backend, selecoes: backend.media_pais(selecoes, 'Data Scientist'),
+    'describe': lambda backend, selecoes: backend.describe(selecoes),
+}
+
+
+def _conferir(nome, esperado, obtido):
+    if isinstance(esperado, dict):
+        textos = sorted(c for c, v in esperado.items() if isinstance(v, str))
+        assert [obtido[c] for c in textos] == [esperado[c] for c in textos], nome
+        for chave in sorted(c for c, v in esperado.items() if isinstance(v, dict)):
+            assert sorted(obtido[chave]) == sorted(esperado[chave]), (nome, chave)
+            _conferir(f"{nome}.{chave}", esperado[chave], obtido[chave])
+        chaves = sorted(c for c, v in esperado.items() if not isinstance(v, (str, dict)))
+        np.testing.assert_allclose(
+            np.array([obtido[c] for c in chaves], dtype=float),
+            np.array([esperado[c] for c in chaves], dtype=float),
+            rtol=1e-6, equal_nan=True, err_msg=nome,
+        )
+        return
+    chaves = [c for c in esperado.columns if esperado[c].dtype == object]
+    esperado = esperado.sort_values(chaves).reset_index(drop=True)
+    obtido = obtido.sort_values(chaves).reset_index(drop=True)
+    pd.testing.assert_frame_equal(esperado, obtido, check_dtype=False, rtol=1e-6, obj=nome)
+
+
+def main(n_linhas=1_000_000):
+    df = tipar_colunas(gerar_dados(n_linhas))
+    with tempfile.TemporaryDirectory() as pasta:
+        parquet = Path(pasta) / "dados.parquet"
+        df.to_parquet(parquet, index=False)
+        pandas_ = BackendPandas(df)
+        duckdb_ = BackendDuckDB(parquet)
+
+        for selecoes in SELECOES:
+            for nome, consulta in CONSULTAS.items():
+                _conferir(nome, consulta(pandas_, selecoes), consulta(duckdb_, selecoes))
+        print(f"Paridade OK em {len(SELECOES)} seleções x {len(CONSULTAS)} consultas")
+
+        print(f"Linhas: {n_linhas:,}")
+        print(f"{'consulta':>14} {'pandas (ms)':>12} {'duckdb (ms)':>12}")
+        selecoes = SELECOES[0]
+        for nome, consulta in CONSULTAS.items():
+            t_pandas = mediana(lambda: consulta(pandas_, selecoes))
+            t_duckdb = mediana(lambda: consulta(duckdb_, selecoes))
+            print(f"{nome:>14} {t_pandas * 1000:>12.1f} {t_duckdb * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
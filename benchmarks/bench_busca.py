@@ -0,0 +1,111 @@
+"""Filtros de cargo e país: `isin` na coluna inteira contra as listas de linhas do índice.
+
+Uso: python -m benchmarks.bench_busca [--tamanhos 250000 1000000 4000000] [--repeticoes N]
+
+Para cada tamanho, seleções de cargos raros, medianos e do mais frequente
+(com e sem país) são respondidas pela cadeia de `isin` do app e pelas listas
+de linhas, conferindo que as linhas coincidem. O tempo das listas acompanha
+o número de linhas encontradas, não o tamanho do dataset. Mede também a
+busca por prefixo usada pelas sugestões da barra lateral e confere KPIs,
+describe, tendência, mapa e paginação com cargo e país contra as linhas.
+"""
+import argparse
+
+import numpy as np
+
+from analise import Filtros, Fontes, calcular_kpis, descrever_salario, salario_pais_cargos, tendencia_anual
+from benchmarks.cronometro import mediana
+from benchmarks.sintetico import gerar_dados
+from indice import IndiceFiltros
+from paginacao import IndiceOrdenacao
+
+BASE = {'ano': [2023, 2024, 2025], 'senioridade': ['pleno', 'senior'], 'contrato': ['integral'], 'tamanho_empresa': ['media', 'grande']}
+PREFIXOS = ['d', 'data sci', 'eng', 'zz']
+
+
+def _selecoes(indice):
+    """Cargos por faixa de frequência, do raro ao mais comum, e um filtro de país."""
+    cargos = indice.busca['cargo'].buscar('', len(indice.busca['cargo']))
+    pais = indice.busca['residencia_iso3'].buscar('', 1)
+    return {
+        '1 raro': {**BASE, 'cargo': cargos[-1:]},
+        '3 medianos': {**BASE, 'cargo': cargos[len(cargos) // 2:len(cargos) // 2 + 3]},
+        'mais comum': {**BASE, 'cargo': cargos[:1]},
+        'comum + país': {**BASE, 'cargo': cargos[:1], 'residencia_iso3': pais},
+    }
+
+
+def _linhas_isin(df, selecoes):
+    mascara = np.ones(len(df), dtype=bool)
+    for dimensao, selecionados in selecoes.items():
+        mascara &= df[dimensao].isin(selecionados).to_numpy()
+    return np.flatnonzero(mascara)
+
+
+def _paridade_analise(df, selecoes):
+    """Cálculos do dashboard com cargo e país selecionados, contra pandas sobre as linhas filtradas."""
+    fontes = Fontes.de_dataframe(df)
+    filtros = Filtros.de_selecoes(selecoes)
+    assert filtros.por_linhas
+    linhas = df.iloc[_linhas_isin(df, selecoes)]
+    usd = linhas['usd'].astype('float64')
+
+    kpis = calcular_kpis(fontes, filtros)
+    assert kpis['total_registros'] == len(linhas)
+    np.testing.assert_allclose([kpis['salario_medio'], kpis['salario_mediano']], [usd.mean(), usd.median()], rtol=1e-9)
+    np.testing.assert_allclose(
+        [descrever_salario(fontes, filtros)[q] for q in ('25%', '50%', '75%')], usd.quantile([0.25, 0.5, 0.75]), rtol=1e-9
+    )
+    anual = tendencia_anual(fontes, filtros)['anual'].set_index('ano')
+    por_ano = usd.groupby(linhas['ano']).agg(['size', 'mean'])
+    np.testing.assert_allclose(anual['registros'], por_ano['size'])
+    np.testing.assert_allclose(anual['salario_medio'], por_ano['mean'], rtol=1e-9)
+
+    mapa = salario_pais_cargos(fontes, filtros)
+    por_par = linhas.groupby(['cargo', 'residencia_iso3'], observed=True)['usd'].agg(['size', 'mean'])
+    assert set(mapa.index.astype(str)) == set(por_par.index.get_level_values('cargo').astype(str))
+    assert mapa['quantidade'].sum() == len(linhas)
+
+    ordenacao = IndiceOrdenacao(df, fontes.indice)
+    pagina = ordenacao.pagina(filtros.selecoes, 'usd', 1, 25, decrescente=True)
+    esperada = usd.sort_values(ascending=False, kind='stable').to_numpy()[:25]
+    np.testing.assert_allclose(np.sort(df['usd'].to_numpy()[pagina])[::-1], esperada)
+
+
+def main(tamanhos=(250_000, 1_000_000, 4_000_000), repeticoes=10):
+    print(f"{'linhas':>10} {'seleção':>13} {'achadas':>8} {'isin':>9} {'listas':>9} {'filtrar+mediana isin':>21} {'listas':>9}")
+    for n_linhas in tamanhos:
+        df = gerar_dados(n_linhas, tipado=True)
+        indice = IndiceFiltros(df)
+        if n_linhas == tamanhos[0]:
+            _paridade_analise(df, _selecoes(indice)['comum + país'])
+        for nome, selecoes in _selecoes(indice).items():
+            esperado = _linhas_isin(df, selecoes)
+            assert np.array_equal(indice.linhas(selecoes), esperado), nome
+            assert indice.contar(selecoes) == len(esperado)
+
+            t_isin = mediana(lambda: _linhas_isin(df, selecoes), repeticoes, aquecer=True)
+            t_listas = mediana(lambda: indice.linhas(selecoes), repeticoes, aquecer=True)
+            t_mediana_isin = mediana(
+                lambda: df.iloc[_linhas_isin(df, selecoes)]['usd'].median(), repeticoes, aquecer=True
+            )
+            t_mediana_listas = mediana(lambda: indice.filtrar(df, selecoes)['usd'].median(), repeticoes, aquecer=True)
+            print(
+                f"{n_linhas:>10,} {nome:>13} {len(esperado):>8,} {t_isin * 1000:>6.2f} ms {t_listas * 1000:>6.2f} ms "
+                f"{t_mediana_isin * 1000:>18.2f} ms {t_mediana_listas * 1000:>6.2f} ms"
+            )
+
+    busca = indice.busca['cargo']
+    print(f"\nBusca por prefixo ({len(busca)} cargos, {len(busca._termos)} termos):")
+    for prefixo in PREFIXOS:
+        t_busca = mediana(lambda: busca.buscar(prefixo), repeticoes, aquecer=True)
+        print(f"  {prefixo!r:>12}: {t_busca * 1e6:7.1f} µs -> {[str(v) for v in busca.buscar(prefixo)[:3]]}")
+    print("Paridade ok: listas de linhas == isin em todas as seleções; análises com cargo e país == linhas")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanhos", nargs="+", type=int, default=[250_000, 1_000_000, 4_000_000])
+    parser.add_argument("--repeticoes", type=int, default=10)
+    args = parser.parse_args()
+    main(args.tamanhos, args.repeticoes)
@@ -0,0 +1,328 @@
+"""Teste de carga: N sessões simultâneas do app com interações aleatórias.
+
+Uso: python -m benchmarks.bench_carga [n_linhas] [--sessoes N] [--acoes N] [--pausa S]
+     [--dados dados.csv] [--semente N] [--saida relatorio.json] [--limite-p95 MS]
+
+Cada sessão é um AppTest próprio (estado de sessão separado) numa thread,
+como as sessões de um servidor Streamlit: todas dividem o processo e os
+recursos de @st.cache_resource. Depois de uma carga a frio fora da medição,
+as sessões começam juntas e repetem ações sorteadas: filtros da barra
+lateral, cargos, troca de visualização, página da tabela, faixas do
+histograma e preparo de download. Cada ação é um rerun cronometrado de ponta
+a ponta, incluindo a espera pelas outras sessões.
+
+O relatório traz vazão (reruns/s), p50/p95/p99 por ação e no total, pico de
+RSS durante a carga, erros, acertos dos caches e as etapas mais lentas do
+perfil de rerun. Roda offline sobre um CSV sintético ou sobre uma cópia local
+do dataset (--dados). Com --limite-p95, sai com código 1 se o p95 total
+passar do limite ou se algum rerun falhar, para barrar regressões.
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_rerun import APP, _ColetorPerfil, _widget, resumir
+from benchmarks.sintetico import gerar_dados
+from exportacao import FORMATOS
+from histograma import FAIXAS_DISPONIVEIS
+from perfil import contadores_cache, rss_bytes
+
+# Ações sorteadas por passo de cada sessão, com o peso de cada uma
+ACOES = {
+    'filtro': 0.35,
+    'cargo': 0.1,
+    'visualizacao': 0.2,
+    'pagina': 0.15,
+    'faixas': 0.1,
+    'download': 0.1,
+}
+FILTROS = {'anos': 'ano', 'senioridades': 'senioridade', 'contratos': 'contrato', 'tamanhos': 'tamanho_empresa'}
+# Cargos sorteados entre os mais frequentes: estão entre as sugestões iniciais do filtro
+CARGOS_SORTEIO = 10
+INTERVALO_RSS = 0.05
+
+
+@contextlib.contextmanager
+def _runtime_compartilhado():
+    """Um Runtime simulado e um cache de bytecode únicos enquanto as sessões rodam, como num servidor.
+
+    O AppTest cria um Runtime simulado global e liga a opção global.appTest
+    no início de cada run, desfazendo os dois no fim; com sessões em
+    threads, o fim do run de uma derrubaria o das outras (sem a opção, os
+    widgets não registram o format_func e o run seguinte falha). Ele também
+    recompila o script a cada run, e compilações simultâneas quebram o
+    ast.parse do Python 3.11; aqui o script é compilado uma vez, antes das
+    sessões.
+    """
+    from unittest.mock import MagicMock, patch
+
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1.util import patch_config_options
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    script_cache = ScriptCache()
+    # Compilado antes das threads: nenhuma sessão compila durante a carga
+    script_cache.get_bytecode(str(APP))
+    with patch.object(Runtime, 'instance', classmethod(lambda cls: runtime)), \
+            patch.object(Runtime, 'exists', classmethod(lambda cls: True)), \
+            patch('streamlit.testing.v1.app_test.ScriptCache', lambda: script_cache), \
+            patch('streamlit.testing.v1.local_script_runner.ScriptCache', lambda: script_cache), \
+            patch_config_options({"global.appTest": True}), \
+            patch('streamlit.testing.v1.app_test.patch_config_options', lambda opcoes: contextlib.nullcontext()):
+        yield
+
+
+class _AmostradorRSS:
+    """Thread que acompanha o pico de RSS do processo durante a carga."""
+
+    def __init__(self, intervalo=INTERVALO_RSS):
+        self.intervalo = intervalo
+        self.pico = rss_bytes()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._amostrar, daemon=True)
+
+    def _amostrar(self):
+        while not self._parar.wait(self.intervalo):
+            self.pico = max(self.pico, rss_bytes())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._parar.set()
+        self._thread.join()
+        self.pico = max(self.pico, rss_bytes())
+
+
+class Sessao:
+    """Uma sessão simulada: abre o app e executa `acoes` interações sorteadas."""
+
+    def __init__(self, numero, dominios, acoes, pausa, semente):
+        self.numero = numero
+        self.dominios = dominios
+        self.acoes = acoes
+        self.pausa = pausa
+        self.rng = np.random.default_rng(semente + numero)
+        # (ação, segundos, erro ou None) por rerun
+        self.reruns = []
+
+    def _sortear_subconjunto(self, valores, minimo=1, maximo=None):
+        maximo = len(valores) if maximo is None else min(maximo, len(valores))
+        quantidade = int(self.rng.integers(minimo, maximo + 1))
+        escolhidos = self.rng.choice(len(valores), quantidade, replace=False)
+        return [valores[i] for i in sorted(escolhidos)]
+
+    def _na_tabela(self, at):
+        """Garante a visualização Dados Completos (página e download ficam nela)."""
+        visualizacao = _widget(at, 'detalhe')
+        if visualizacao.value != visualizacao.options[0]:
+            visualizacao.set_value(visualizacao.options[0])
+            return False
+        return True
+
+    def _preparar(self, at, acao):
+        """Aplica a ação nos widgets; devolve o nome da ação efetivamente feita."""
+        if acao == 'filtro':
+            chave = list(FILTROS)[int(self.rng.integers(len(FILTROS)))]
+            _widget(at, chave).set_value(self._sortear_subconjunto(self.dominios[chave]))
+        elif acao == 'cargo':
+            cargos = self._sortear_subconjunto(self.dominios['cargos'], 0, 3)
+            _widget(at, 'cargos').set_value(cargos)
+        elif acao == 'visualizacao':
+            visualizacao = _widget(at, 'detalhe')
+            visualizacao.set_value(visualizacao.options[int(self.rng.integers(len(visualizacao.options)))])
+        elif acao == 'pagina':
+            if not self._na_tabela(at):
+                return 'visualizacao'
+            pagina = _widget(at, 'pagina')
+            pagina.set_value(int(self.rng.integers(1, min(int(pagina.max), 50) + 1)))
+        elif acao == 'faixas':
+            _widget(at, 'faixas_histograma').set_value(int(self.rng.choice(FAIXAS_DISPONIVEIS)))
+        elif acao == 'download':
+            if not self._na_tabela(at):
+                return 'visualizacao'
+            _widget(at, 'formato_download').set_value(str(self.rng.choice(list(FORMATOS))))
+            at.button(key='preparar_download').click()
+        return acao
+
+    def _rerun(self, at, acao):
+        inicio = time.perf_counter()
+        erro = None
+        try:
+            at.run()
+            if at.exception:
+                erro = at.exception[0].message
+        except Exception as excecao:
+            erro = f"{type(excecao).__name__}: {excecao}"
+        self.reruns.append((acao, time.perf_counter() - inicio, erro))
+        return erro is None
+
+    def executar(self, largada):
+        from streamlit.testing.v1 import AppTest
+
+        at = AppTest.from_file(str(APP), default_timeout=600)
+        largada.wait()
+        if not self._rerun(at, 'abertura'):
+            return
+        nomes, pesos = list(ACOES), np.array(list(ACOES.values()))
+        for _ in range(self.acoes):
+            if self.pausa:
+                time.sleep(self.rng.exponential(self.pausa))
+            acao = str(self.rng.choice(nomes, p=pesos / pesos.sum()))
+            try:
+                acao = self._preparar(at, acao)
+            except Exception as excecao:
+                self.reruns.append((acao, 0.0, f"{type(excecao).__name__}: {excecao}"))
+                continue
+            self._rerun(at, acao)
+
+
+def _dominios(csv):
+    """Valores sorteáveis de cada filtro, lidos da mesma fonte que o app usa."""
+    df = pd.read_csv(csv, usecols=[*FILTROS.values(), 'cargo'])
+    dominios = {chave: sorted(df[coluna].dropna().unique().tolist()) for chave, coluna in FILTROS.items()}
+    dominios['cargos'] = df['cargo'].value_counts().index[:CARGOS_SORTEIO].tolist()
+    return dominios
+
+
+def _percentis(tempos):
+    tempos = np.asarray(tempos) * 1000
+    return {
+        'n': len(tempos),
+        'p50_ms': np.percentile(tempos, 50),
+        'p95_ms': np.percentile(tempos, 95),
+        'p99_ms': np.percentile(tempos, 99),
+        'max_ms': tempos.max(),
+    }
+
+
+def carga(csv, n_sessoes=8, acoes=20, pausa=0.0, semente=0):
+    """Executa a carga sobre `csv` e devolve o relatório (dicionário)."""
+    from streamlit.testing.v1 import AppTest
+
+    os.environ["DASHBOARD_DADOS"] = str(csv)
+    # Sem atualização em segundo plano: a versão dos dados não muda durante a medição
+    os.environ.setdefault("DASHBOARD_ATUALIZACAO", "0")
+    dominios = _dominios(csv)
+
+    coletor = _ColetorPerfil()
+    logger = logging.getLogger("dashboard.perfil")
+    logger.addHandler(coletor)
+    logger.setLevel(logging.INFO)
+    try:
+        # Carga a frio (dataset e estruturas em @st.cache_resource) fora da medição
+        inicio = time.perf_counter()
+        aquecimento = AppTest.from_file(str(APP), default_timeout=600).run()
+        if aquecimento.exception:
+            raise RuntimeError(f"carga a frio: {aquecimento.exception[0].message}")
+        t_frio = time.perf_counter() - inicio
+        coletor.registros.clear()
+        rss_aquecido = rss_bytes()
+
+        sessoes = [Sessao(i, dominios, acoes, pausa, semente) for i in range(n_sessoes)]
+        largada = threading.Barrier(n_sessoes + 1)
+        threads = [threading.Thread(target=sessao.executar, args=(largada,)) for sessao in sessoes]
+        with _runtime_compartilhado(), _AmostradorRSS() as rss:
+            for thread in threads:
+                thread.start()
+            largada.wait()
+            inicio = time.perf_counter()
+            for thread in threads:
+                thread.join()
+            duracao = time.perf_counter() - inicio
+    finally:
+        logger.removeHandler(coletor)
+
+    reruns = [rerun for sessao in sessoes for rerun in sessao.reruns]
+    validos = [(acao, tempo) for acao, tempo, erro in reruns if erro is None]
+    erros = [f"{acao}: {erro}" for acao, tempo, erro in reruns if erro is not None]
+    por_acao = {}
+    for acao, tempo in validos:
+        por_acao.setdefault(acao, []).append(tempo)
+    return {
+        'sessoes': n_sessoes,
+        'acoes_por_sessao': acoes,
+        'pausa_s': pausa,
+        'carga_fria_ms': t_frio * 1000,
+        'duracao_s': duracao,
+        'reruns': len(validos),
+        'vazao_reruns_s': len(validos) / duracao if duracao else 0.0,
+        'total': _percentis([tempo for _, tempo in validos]) if validos else None,
+        'por_acao': {acao: _percentis(tempos) for acao, tempos in sorted(por_acao.items())},
+        'rss_aquecido_mb': rss_aquecido / 1024 ** 2,
+        'rss_pico_mb': rss.pico / 1024 ** 2,
+        'erros': erros,
+        'caches': contadores_cache(),
+        'etapas': resumir(coletor.registros).head(8).to_dict(orient='records'),
+    }
+
+
+def imprimir(relatorio):
+    print(
+        f"Sessões: {relatorio['sessoes']} x {relatorio['acoes_por_sessao']} ações | "
+        f"carga a frio: {relatorio['carga_fria_ms']:.0f} ms | duração: {relatorio['duracao_s']:.1f} s"
+    )
+    print(f"Vazão: {relatorio['vazao_reruns_s']:.2f} reruns/s ({relatorio['reruns']} reruns)")
+    tabela = pd.DataFrame({**relatorio['por_acao'], 'TOTAL': relatorio['total']}).T
+    print(tabela.to_string(float_format=lambda valor: f"{valor:.1f}"))
+    print(f"RSS: {relatorio['rss_aquecido_mb']:.0f} MB após a carga a frio | pico {relatorio['rss_pico_mb']:.0f} MB")
+    for nome, contador in relatorio['caches'].items():
+        print(f"Cache {nome}: {contador['hits']} acertos, {contador['misses']} faltas")
+    print("Etapas mais lentas (p95):")
+    print(pd.DataFrame(relatorio['etapas']).to_string(index=False, float_format=lambda valor: f"{valor:.1f}"))
+    print(f"Erros: {len(relatorio['erros'])}")
+    for erro in relatorio['erros'][:5]:
+        print(f"  {erro}")
+
+
+def main(n_linhas=100_000, sessoes=8, acoes=20, pausa=0.0, dados=None, semente=0, saida=None, limite_p95=None):
+    with tempfile.TemporaryDirectory() as diretorio:
+        os.environ["DASHBOARD_SNAPSHOT"] = str(Path(diretorio) / "snapshot")
+        if dados is None:
+            dados = Path(diretorio) / "dados.csv"
+            gerar_dados(n_linhas).to_csv(dados, index=False)
+        relatorio = carga(dados, sessoes, acoes, pausa, semente)
+
+    imprimir(relatorio)
+    if saida:
+        Path(saida).write_text(json.dumps(relatorio, indent=2, default=float, ensure_ascii=False))
+    if limite_p95 is not None:
+        p95 = relatorio['total']['p95_ms'] if relatorio['total'] else float('inf')
+        if relatorio['erros'] or p95 > limite_p95:
+            print(f"REPROVADO: p95 {p95:.1f} ms (limite {limite_p95:.1f} ms), {len(relatorio['erros'])} erros")
+            return 1
+        print(f"Aprovado: p95 {p95:.1f} ms dentro do limite de {limite_p95:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("n_linhas", nargs="?", type=int, default=100_000, help="linhas do CSV sintético")
+    parser.add_argument("--sessoes", type=int, default=8)
+    parser.add_argument("--acoes", type=int, default=20, help="ações por sessão")
+    parser.add_argument("--pausa", type=float, default=0.0, help="pausa média (s) entre ações de uma sessão")
+    parser.add_argument("--dados", type=Path, help="CSV local do dataset no lugar do sintético")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--saida", type=Path, help="grava o relatório em JSON")
+    parser.add_argument("--limite-p95", type=float, help="falha (código 1) se o p95 total passar deste valor em ms")
+    args = parser.parse_args()
+    sys.exit(main(
+        args.n_linhas, args.sessoes, args.acoes, args.pausa, args.dados, args.semente, args.saida, args.limite_p95,
+    ))
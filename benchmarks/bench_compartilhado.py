@@ -0,0 +1,151 @@
+"""Memória residente com 1 e 20 sessões/processos: cópia privada x Arrow mapeado.
+
+Uso: python -m benchmarks.bench_compartilhado [n_linhas] [--concorrencia 1 20] [--modo sessoes processos]
+
+Sessões: threads de um mesmo processo, como as sessões de um servidor
+Streamlit. A cópia privada reproduz o `st.cache_data` (cada acesso devolve
+o DataFrame desserializado); o mapeado é o objeto único do `st.cache_resource`
+sobre o arquivo Arrow. Cada configuração roda num processo novo, que mede
+o RSS com todas as sessões ativas.
+
+Processos: réplicas independentes (workers, várias instâncias do app). A
+cópia privada lê o Parquet; o mapeado abre o mesmo arquivo Arrow. Cada
+processo toca todas as colunas e informa Rss e Pss de /proc/self/smaps_rollup;
+a soma dos Pss é a memória física de fato ocupada pelas réplicas.
+"""
+import argparse
+import multiprocessing as mp
+import pickle
+import tempfile
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.sintetico import gerar_dados
+from compartilhado import mapear, publicar
+from perfil import rss_bytes
+
+MB = 1024 * 1024
+
+
+def _tocar(df):
+    """Lê todas as colunas (e os códigos dos categóricos), trazendo as páginas para a memória."""
+    total = 0
+    for coluna in df.columns:
+        valores = df[coluna]
+        total += int(valores.cat.codes.sum() if isinstance(valores.dtype, pd.CategoricalDtype) else valores.sum())
+    return total
+
+
+def _smaps():
+    """Rss e Pss do processo em bytes (Linux)."""
+    campos = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for linha in f:
+            partes = linha.split()
+            if len(partes) == 3 and partes[2] == "kB":
+                campos[partes[0].rstrip(":")] = int(partes[1]) * 1024
+    return campos.get("Rss", 0), campos.get("Pss", 0)
+
+
+def _sessoes(caminho_parquet, caminho_arrow, n_sessoes, mapeado):
+    """RSS do processo com `n_sessoes` threads segurando o dataset ao mesmo tempo."""
+    if mapeado:
+        compartilhado = mapear(caminho_arrow)
+        obter = lambda: compartilhado
+    else:
+        serializado = pickle.dumps(pd.read_parquet(caminho_parquet), protocol=pickle.HIGHEST_PROTOCOL)
+        obter = lambda: pickle.loads(serializado)
+    rss_base = rss_bytes()
+    prontas = threading.Barrier(n_sessoes + 1)
+    liberar = threading.Event()
+
+    def sessao():
+        df = obter()
+        _tocar(df)
+        prontas.wait()
+        liberar.wait()
+
+    threads = [threading.Thread(target=sessao) for _ in range(n_sessoes)]
+    for thread in threads:
+        thread.start()
+    prontas.wait()
+    rss = rss_bytes()
+    liberar.set()
+    for thread in threads:
+        thread.join()
+    return rss, rss - rss_base
+
+
+def _em_processo(funcao, *args):
+    """Executa `funcao` num processo novo, sem herdar o heap das medições anteriores."""
+    with mp.get_context("spawn").Pool(1) as pool:
+        return pool.apply(funcao, args)
+
+
+def _replica(caminho, mapeado, prontas, liberar, fila):
+    df = mapear(caminho) if mapeado else pd.read_parquet(caminho)
+    _tocar(df)
+    fila.put(_smaps())
+    prontas.wait()
+    liberar.wait()
+
+
+def _processos(caminho_parquet, caminho_arrow, n_processos, mapeado):
+    """Soma de Rss e Pss de `n_processos` réplicas vivas ao mesmo tempo."""
+    contexto = mp.get_context("spawn")
+    prontas = contexto.Barrier(n_processos + 1)
+    liberar = contexto.Event()
+    fila = contexto.Queue()
+    caminho = str(caminho_arrow if mapeado else caminho_parquet)
+    processos = [
+        contexto.Process(target=_replica, args=(caminho, mapeado, prontas, liberar, fila))
+        for _ in range(n_processos)
+    ]
+    for processo in processos:
+        processo.start()
+    prontas.wait()
+    medidas = [fila.get() for _ in processos]
+    liberar.set()
+    for processo in processos:
+        processo.join()
+    return sum(rss for rss, _ in medidas), sum(pss for _, pss in medidas)
+
+
+def main(n_linhas=2_000_000, concorrencia=(1, 20), modos=("sessoes", "processos")):
+    with tempfile.TemporaryDirectory() as diretorio:
+        df = gerar_dados(n_linhas, tipado=True)
+        tamanho = df.memory_usage(deep=True).sum()
+        caminho_parquet = Path(diretorio) / "dados.parquet"
+        caminho_arrow = Path(diretorio) / "dados.arrow"
+        df.to_parquet(caminho_parquet)
+        publicar(df, caminho_arrow)
+        del df
+        print(f"Linhas: {n_linhas:,} | DataFrame: {tamanho / MB:.0f} MB | "
+              f"arquivo Arrow: {caminho_arrow.stat().st_size / MB:.0f} MB")
+
+        if "sessoes" in modos:
+            print(f"\n{'sessões':>8} {'modo':>8} {'RSS':>10} {'acréscimo':>10}")
+            for n in concorrencia:
+                for mapeado in (False, True):
+                    rss, acrescimo = _em_processo(_sessoes, caminho_parquet, caminho_arrow, n, mapeado)
+                    print(f"{n:>8} {'mapeado' if mapeado else 'cópia':>8} "
+                          f"{rss / MB:>7.0f} MB {acrescimo / MB:>7.0f} MB")
+
+        if "processos" in modos:
+            print(f"\n{'processos':>9} {'modo':>8} {'Σ RSS':>10} {'Σ PSS':>10}")
+            for n in concorrencia:
+                for mapeado in (False, True):
+                    rss, pss = _processos(caminho_parquet, caminho_arrow, n, mapeado)
+                    print(f"{n:>9} {'mapeado' if mapeado else 'cópia':>8} "
+                          f"{rss / MB:>7.0f} MB {pss / MB:>7.0f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("n_linhas", nargs="?", type=int, default=2_000_000)
+    parser.add_argument("--concorrencia", type=int, nargs="+", default=[1, 20])
+    parser.add_argument("--modo", nargs="+", choices=["sessoes", "processos"], default=["sessoes", "processos"])
+    args = parser.parse_args()
+    main(args.n_linhas, args.concorrencia, args.modo)
@@ -0,0 +1,83 @@
+"""Latência do rollup do cubo vs. varreduras das linhas, com paridade numérica.
+
+Uso: python -m benchmarks.bench_cubo [n_linhas]
+
+O lado pré-agregado é o do dashboard: KPIs, linha ano x senioridade e
+modalidades pelo cubo; médias por cargo e o mapa por país pelo MapaCargos.
+"""
+import sys
+
+import numpy as np
+
+from benchmarks.cronometro import mediana
+from benchmarks.sintetico import gerar_dados
+from cubo import CuboSalarios, rollup, totais
+from dados import tipar_colunas
+from indice import IndiceFiltros
+from mapa import MapaCargos
+
+SELECOES = {
+    'ano': [2023, 2024, 2025],
+    'senioridade': ['pleno', 'senior', 'executivo'],
+    'contrato': ['integral', 'contrato'],
+    'tamanho_empresa': ['pequena', 'media', 'grande'],
+}
+
+
+def _linhas(df_filtrado):
+    usd = df_filtrado['usd']
+    return {
+        'kpis': (usd.mean(), usd.std(), usd.min(), usd.max(), len(usd)),
+        'cargo': df_filtrado.groupby('cargo', observed=True)['usd'].agg(['mean', 'count']),
+        'ano_senioridade': df_filtrado.groupby(['ano', 'senioridade'], observed=True)['usd'].mean(),
+        'remoto': df_filtrado['remoto'].value_counts(),
+        'pais': df_filtrado[df_filtrado['cargo'] == 'Data Scientist']
+        .groupby('residencia_iso3', observed=True)['usd'].agg(['mean', 'count']),
+    }
+
+
+def _cubo(cubo, mapa, selecoes):
+    celulas = cubo.fatia(selecoes)
+    resumo = totais(celulas)
+    contagem, soma, _ = mapa.agregar(selecoes)
+    por_cargo = contagem.sum(axis=1)
+    cargos = por_cargo > 0
+    pais = contagem[mapa.cargos.index('Data Scientist')]
+    paises = pais > 0
+    return {
+        'kpis': (resumo['media'], resumo['desvio'], resumo['min'], resumo['max'], resumo['count']),
+        'cargo': np.column_stack([soma.sum(axis=1)[cargos] / por_cargo[cargos], por_cargo[cargos]]),
+        'ano_senioridade': rollup(celulas, ['ano', 'senioridade'])['media'],
+        'remoto': rollup(celulas, 'remoto')['count'],
+        'pais': np.column_stack([soma[mapa.cargos.index('Data Scientist')][paises] / pais[paises], pais[paises]]),
+    }
+
+
+def main(n_linhas=1_000_000):
+    df = tipar_colunas(gerar_dados(n_linhas))
+    indice = IndiceFiltros(df)
+    cubo = CuboSalarios(df)
+    mapa = MapaCargos.de_linhas(df)
+    relatorio, relatorio_mapa = cubo.relatorio(), mapa.relatorio()
+    print(f"Linhas: {n_linhas:,} | células: {relatorio['celulas']:,} | "
+          f"memória do cubo: {relatorio['memoria_mb']:.1f} MB | construção: {relatorio['construcao_ms']:.0f} ms")
+    print(f"MapaCargos: {relatorio_mapa['entradas']:,} entradas | {relatorio_mapa['memoria_mb']:.1f} MB | "
+          f"construção: {relatorio_mapa['construcao_ms']:.0f} ms")
+
+    df_filtrado = indice.filtrar(df, SELECOES)
+    esperado, obtido = _linhas(df_filtrado), _cubo(cubo, mapa, SELECOES)
+    np.testing.assert_allclose(np.array(obtido['kpis'], dtype=float), np.array(esperado['kpis'], dtype=float), rtol=1e-9)
+    np.testing.assert_allclose(obtido['cargo'], esperado['cargo'].to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(obtido['ano_senioridade'].to_numpy(), esperado['ano_senioridade'].to_numpy(), rtol=1e-9)
+    np.testing.assert_array_equal(obtido['remoto'].sort_index().to_numpy(), esperado['remoto'].sort_index().to_numpy())
+    np.testing.assert_allclose(obtido['pais'], esperado['pais'].to_numpy(), rtol=1e-9)
+
+    t_linhas = mediana(lambda: _linhas(indice.filtrar(df, SELECOES)))
+    t_cubo = mediana(lambda: _cubo(cubo, mapa, SELECOES))
+    print(f"Varredura das linhas (filtro + agregações): {t_linhas * 1000:8.1f} ms")
+    print(f"Cubo + MapaCargos (fatia + agregações)    : {t_cubo * 1000:8.1f} ms")
+    print(f"Ganho                                     : {t_linhas / t_cubo:8.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
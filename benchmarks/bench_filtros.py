@@ -0,0 +1,55 @@
+"""Compara a cadeia de `isin` do app.py com o índice de bitmaps.
+
+Uso: python -m benchmarks.bench_filtros [n_linhas]
+"""
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.cronometro import mediana
+from benchmarks.sintetico import gerar_dados
+from dados import tipar_colunas
+from indice import IndiceFiltros
+
+SELECOES = [
+    {'ano': [2023, 2024, 2025], 'senioridade': ['junior', 'pleno', 'senior', 'executivo'],
+     'contrato': ['integral', 'parcial', 'contrato', 'freelancer'], 'tamanho_empresa': ['pequena', 'media', 'grande']},
+    {'ano': [2024], 'senioridade': ['senior'], 'contrato': ['integral'], 'tamanho_empresa': ['media']},
+    {'ano': [2022, 2025], 'senioridade': ['junior', 'executivo'], 'contrato': ['integral', 'freelancer'],
+     'tamanho_empresa': ['grande']},
+]
+
+
+def _mascara_isin(df, selecoes):
+    return (
+        (df['ano'].isin(selecoes['ano'])) &
+        (df['senioridade'].isin(selecoes['senioridade'])) &
+        (df['contrato'].isin(selecoes['contrato'])) &
+        (df['tamanho_empresa'].isin(selecoes['tamanho_empresa']))
+    ).to_numpy()
+
+
+def main(n_linhas=1_000_000):
+    df = tipar_colunas(gerar_dados(n_linhas))
+
+    inicio = time.perf_counter()
+    indice = IndiceFiltros(df)
+    t_construcao = time.perf_counter() - inicio
+
+    print(f"Linhas: {n_linhas:,} | construção do índice: {t_construcao * 1000:.1f} ms")
+    print(f"{'seleção':>8} {'isin (ms)':>10} {'bitset (ms)':>12} {'máscara (ms)':>13} {'contagem (ms)':>14}")
+    for i, selecoes in enumerate(SELECOES, 1):
+        esperado = _mascara_isin(df, selecoes)
+        assert np.array_equal(indice.mascara(selecoes), esperado)
+        assert indice.contar(selecoes) == esperado.sum()
+
+        t_isin = mediana(lambda: _mascara_isin(df, selecoes), 20)
+        t_bitset = mediana(lambda: indice.bitset(selecoes), 20)
+        t_mascara = mediana(lambda: indice.mascara(selecoes), 20)
+        t_contagem = mediana(lambda: indice.contar(selecoes), 20)
+        print(f"{i:>8} {t_isin * 1000:>10.3f} {t_bitset * 1000:>12.3f} {t_mascara * 1000:>13.3f} {t_contagem * 1000:>14.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
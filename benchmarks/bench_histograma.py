@@ -0,0 +1,42 @@
+"""Confere o histograma pré-agregado contra np.histogram e mede a latência.
+
+Uso: python -m benchmarks.bench_histograma [n_linhas]
+"""
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.bench_quantis import SELECOES
+from benchmarks.cronometro import mediana
+from benchmarks.sintetico import gerar_dados
+from histograma import FAIXAS_DISPONIVEIS, HistogramaSalarios
+from indice import IndiceFiltros
+
+
+def main(n_linhas=1_000_000):
+    df = gerar_dados(n_linhas, tipado=True)
+    indice = IndiceFiltros(df)
+    inicio = time.perf_counter()
+    histograma = HistogramaSalarios(df)
+    t_construcao = time.perf_counter() - inicio
+    print(f"Linhas: {n_linhas:,} | construção: {t_construcao * 1000:.0f} ms | "
+          f"memória: {histograma.memoria_bytes / 1024:.0f} KB")
+
+    for selecoes in SELECOES:
+        usd = indice.filtrar(df, selecoes)['usd'].to_numpy()
+        for n_faixas in FAIXAS_DISPONIVEIS:
+            bordas, contagens = histograma.contar(selecoes, n_faixas)
+            esperado, _ = np.histogram(usd, bins=bordas)
+            assert np.array_equal(contagens, esperado), (selecoes, n_faixas)
+    print(f"Contagens idênticas a np.histogram em {len(SELECOES)} seleções x {len(FAIXAS_DISPONIVEIS)} faixas")
+
+    selecoes = SELECOES[0]
+    t_bruto = mediana(lambda: np.histogram(indice.filtrar(df, selecoes)['usd'].to_numpy(), bins=25))
+    t_pre = mediana(lambda: histograma.contar(selecoes, 25), aquecer=True)
+    print(f"Filtro + np.histogram: {t_bruto * 1000:.2f} ms | pré-agregado: {t_pre * 1000:.3f} ms "
+          f"| payload: {n_linhas:,} valores -> 25 barras")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
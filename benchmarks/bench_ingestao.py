@@ -0,0 +1,150 @@
+"""Ingestão incremental por ano: agregados iguais aos de uma reconstrução completa.
+
+Uso: python -m benchmarks.bench_ingestao [n_linhas]
+
+Um CSV sintético por ano é ingerido arquivo a arquivo; depois chega um
+arquivo atrasado, com linhas do ano mais recente e de anos já ingeridos.
+Confere que: só as partições dos anos tocados ganham partes novas, e as
+partes e agregados dos demais não são reescritos; reingerir um arquivo não
+faz nada; `verificar()` passa; as células de detalhe de `carregar_celulas()`
+e as de `carregar_cubo()` são as de `agregar_celulas` sobre todos os arquivos
+concatenados, delas saem as mesmas médias por ano do crescimento, e o
+`carregar_mapa()` dá as mesmas contagens por cargo das linhas. Uma ingestão
+do arquivo atrasado que cai depois de algumas gravações e é repetida deixa
+as mesmas células, sem mesclar duas vezes o que já tinha sido gravado. Mede a ingestão do arquivo atrasado
+contra reler todos os arquivos e reconstruir o cubo.
+"""
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.sintetico import ANOS, gerar_dados
+from cubo import DIMENSOES_CUBO, DIMENSOES_DETALHE, CuboSalarios, agregar_celulas, rollup
+from dados import tipar_colunas
+import ingestao
+from ingestao import carregar_celulas, carregar_cubo, carregar_mapa, ingerir, verificar
+
+MEDIDAS = ['count', 'sum', 'sumsq', 'min', 'max']
+ANOS_ATRASADOS = [2022, 2023]
+
+
+def _normalizar(celulas, dimensoes):
+    celulas = celulas.copy()
+    for dimensao in dimensoes:
+        celulas[dimensao] = celulas[dimensao].astype(str)
+    return celulas.sort_values(dimensoes).reset_index(drop=True)
+
+
+def _conferir_celulas(obtidas, esperadas, dimensoes):
+    obtidas, esperadas = _normalizar(obtidas, dimensoes), _normalizar(esperadas, dimensoes)
+    assert obtidas[dimensoes].equals(esperadas[dimensoes])
+    np.testing.assert_allclose(obtidas[MEDIDAS].to_numpy(float), esperadas[MEDIDAS].to_numpy(float), rtol=1e-9)
+
+
+def _estado(destino):
+    """mtime de cada parte e agregado gravados, para conferir que nada foi reescrito."""
+    return {caminho: caminho.stat().st_mtime_ns for caminho in destino.glob("**/*.parquet")}
+
+
+def _ingerir_com_queda(arquivo, destino, gravacoes):
+    """Ingere `arquivo` simulando uma queda depois de `gravacoes` gravações de partes e agregados."""
+    gravar, feitas = ingestao._gravar_atomico, []
+
+    def gravar_ate_cair(*args, **kwargs):
+        if len(feitas) == gravacoes:
+            raise OSError("queda simulada")
+        feitas.append(args[1])
+        return gravar(*args, **kwargs)
+
+    ingestao._gravar_atomico = gravar_ate_cair
+    try:
+        ingerir(arquivo, destino)
+    except OSError:
+        return feitas
+    finally:
+        ingestao._gravar_atomico = gravar
+    raise AssertionError("a ingestão terminou antes da queda simulada")
+
+
+def main(n_linhas=500_000):
+    with tempfile.TemporaryDirectory() as pasta:
+        pasta = Path(pasta)
+        destino = pasta / "particoes"
+        df = gerar_dados(n_linhas)
+        arquivos = []
+        for ano in ANOS[:-1]:
+            arquivos.append(pasta / f"dados-{ano}.csv")
+            df[df['ano'] == ano].to_csv(arquivos[-1], index=False)
+        # Arquivo atrasado: o ano novo mais respostas tardias de anos já ingeridos
+        atrasado = gerar_dados(n_linhas // 5, seed=7)
+        atrasado = atrasado[atrasado['ano'].isin([ANOS[-1], *ANOS_ATRASADOS])]
+        arquivos.append(pasta / "dados-atrasado.csv")
+        pd.concat([df[df['ano'] == ANOS[-1]], atrasado]).to_csv(arquivos[-1], index=False)
+
+        for arquivo, ano in zip(arquivos, ANOS[:-1]):
+            assert ingerir(arquivo, destino) == [ano]
+
+        queda = pasta / "queda"
+        shutil.copytree(destino, queda)
+        antes = _estado(destino)
+        inicio = time.perf_counter()
+        tocados = ingerir(arquivos[-1], destino)
+        t_incremental = time.perf_counter() - inicio
+        assert tocados == sorted([*ANOS_ATRASADOS, ANOS[-1]]), tocados
+        depois = _estado(destino)
+
+        # Append-only: nada do que existia foi reescrito, exceto os agregados dos anos tocados
+        reescritos = {caminho for caminho in antes if depois[caminho] != antes[caminho]}
+        assert reescritos == {destino / "agregados" / f"ano={ano}.parquet" for ano in ANOS_ATRASADOS}, reescritos
+        novos = {caminho.relative_to(destino).parts[0] for caminho in set(depois) - set(antes)}
+        assert novos == {f"ano={ano}" for ano in tocados} | {"agregados"}, novos
+        assert ingerir(arquivos[-1], destino) == []
+        assert _estado(destino) == depois
+
+        assert verificar(destino)
+
+        # Queda depois de 4 gravações (partes e agregados de dois anos) e repetição do mesmo arquivo
+        gravados = _ingerir_com_queda(arquivos[-1], queda, 4)
+        assert any(caminho.parent.name == "agregados" for caminho in gravados), gravados
+        assert ingerir(arquivos[-1], queda) == tocados
+        assert verificar(queda)
+        _conferir_celulas(carregar_celulas(queda), carregar_celulas(destino), DIMENSOES_DETALHE)
+
+        # Reconstrução completa: reler todos os arquivos e reagregar tudo
+        inicio = time.perf_counter()
+        completo = tipar_colunas(pd.concat([pd.read_csv(arquivo) for arquivo in arquivos], ignore_index=True))
+        reconstruido = CuboSalarios(completo)
+        t_completo = time.perf_counter() - inicio
+        incremental = carregar_cubo(destino, completo)
+        _conferir_celulas(incremental.celulas, agregar_celulas(completo), DIMENSOES_CUBO)
+        detalhe = carregar_celulas(destino)
+        _conferir_celulas(detalhe, agregar_celulas(completo, DIMENSOES_DETALHE), DIMENSOES_DETALHE)
+
+        # Contagem por cargo do MapaCargos carregado das partições, direto das linhas
+        mapa = carregar_mapa(destino)
+        contagem, _, _ = mapa.agregar({})
+        por_cargo = completo['cargo'].value_counts()
+        np.testing.assert_array_equal(contagem.sum(axis=1), por_cargo.reindex(mapa.cargos, fill_value=0))
+
+        # Médias por ano usadas no crescimento, direto das linhas
+        por_ano = completo.groupby('ano')['usd'].agg(['size', 'mean'])
+        anual = rollup(incremental.celulas, 'ano')
+        np.testing.assert_array_equal(anual['count'], por_ano['size'])
+        np.testing.assert_allclose(anual['media'], por_ano['mean'], rtol=1e-9)
+
+    print(f"Linhas: {len(completo):,} em {len(arquivos)} arquivos | células: {incremental.n_celulas:,} no cubo, "
+          f"{len(detalhe):,} de detalhe")
+    print(f"Ingestão do arquivo atrasado ({len(tocados)} anos)  : {t_incremental * 1000:9.1f} ms")
+    print(f"Releitura de tudo + cubo completo        : {t_completo * 1000:9.1f} ms "
+          f"({reconstruido.n_celulas:,} células)")
+    print("Ok: partes antigas intactas, reingestão sem efeito, verificar() e cubo, células e mapa incrementais == reconstrução, "
+          "repetição após queda sem dupla contagem")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
@@ -0,0 +1,119 @@
+"""Motor de insights: paridade com as regras originais e custo por regra acrescentada.
+
+Uso: python -m benchmarks.bench_insights [n_linhas] [--repeticoes N]
+
+A referência são os `if` originais do app sobre as linhas filtradas
+(participações por comparação de coluna inteira, std()/mean() separados).
+Cada métrica do motor é conferida contra o cálculo equivalente nas linhas e
+as mensagens contra as da referência. Depois mede o tempo da avaliação com as
+regras padrão e com regras extras sobre outras dimensões, que entram na
+mesma passada pelas células.
+"""
+import argparse
+
+import numpy as np
+
+import insights
+from analise import Filtros, Fontes, crescimento_anual, por_dimensao_mapa
+from benchmarks.bench_analise import SELECOES_PARIDADE
+from benchmarks.cronometro import mediana
+from benchmarks.sintetico import gerar_dados
+
+REGRAS_EXTRAS = [
+    insights.Regra('freelancer', 'freelancer_pct', '>', 10, "{valor:.1f}% freelancers."),
+    insights.Regra('grande', 'grande_pct', '>', 30, "{valor:.1f}% em empresas grandes."),
+    insights.Regra('cv_alto', 'cv', '>', 80, "CV de {valor:.1f}%."),
+]
+
+
+@insights.metrica('freelancer_pct', dimensoes=['contrato'])
+def _freelancer_pct(tabela, contexto):
+    return insights._participacao(tabela, 'contrato', 'freelancer')
+
+
+@insights.metrica('grande_pct', dimensoes=['tamanho_empresa'])
+def _grande_pct(tabela, contexto):
+    return insights._participacao(tabela, 'tamanho_empresa', 'grande')
+
+
+def referencia(df_filtrado, anos):
+    """Métricas e mensagens das regras originais, varrendo as linhas filtradas."""
+    salario_medio = df_filtrado['usd'].mean()
+    media_por_ano = df_filtrado.groupby('ano')['usd'].mean()
+    valores = {
+        'salario_medio': salario_medio,
+        'crescimento': insights.variacao_anual(media_por_ano, anos),
+        'remoto_pct': (df_filtrado['remoto'] == 'remoto').sum() / len(df_filtrado) * 100,
+        'senior_pct': (df_filtrado['senioridade'] == 'senior').sum() / len(df_filtrado) * 100,
+        'cv': (df_filtrado['usd'].std() / salario_medio) * 100,
+    }
+    mensagens = []
+    if valores['salario_medio'] > 100000:
+        mensagens.append(f"💰 O salário médio de ${salario_medio:,.0f} está acima de $100k, indicando um mercado bem remunerado.")
+    if valores['crescimento'] > 5:
+        mensagens.append(f"📈 Houve um crescimento salarial de {valores['crescimento']:.1f}% em relação ao período anterior.")
+    elif valores['crescimento'] < -5:
+        mensagens.append(f"📉 Houve uma redução salarial de {abs(valores['crescimento']):.1f}% em relação ao período anterior.")
+    if valores['remoto_pct'] > 50:
+        mensagens.append(f"🏠 {valores['remoto_pct']:.1f}% dos profissionais trabalham remotamente, mostrando a tendência do trabalho à distância.")
+    if valores['senior_pct'] > 40:
+        mensagens.append(f"👔 {valores['senior_pct']:.1f}% dos profissionais são seniores, indicando um mercado maduro.")
+    if valores['cv'] > 50:
+        mensagens.append(f"📊 Alta variabilidade salarial (CV: {valores['cv']:.1f}%), indicando grande dispersão nos salários.")
+
+    paises = df_filtrado.groupby('residencia_iso3', observed=True)['usd'].agg(['mean', 'count'])
+    paises = paises[paises['count'] >= insights.MIN_REGISTROS_PAIS]
+    diferenca = (paises['mean'] / salario_medio - 1) * 100
+    valores['n_paises_atipicos'] = int((diferenca.abs() >= insights.DESVIO_PAIS_PCT).sum())
+    return valores, mensagens
+
+
+def main(n_linhas=1_000_000, repeticoes=5):
+    df = gerar_dados(n_linhas, tipado=True)
+    fontes = Fontes.de_dataframe(df)
+    contexto_paises = {'nomes_paises': fontes.cubo.nomes_paises}
+    print(f"Linhas: {n_linhas:,} | regras padrão: {len(insights.REGRAS)} | extras: {len(REGRAS_EXTRAS)}")
+    print(f"{'seleção':>18} {'linhas':>10} {'motor':>10} {'+ extras':>10}")
+    for nome, selecoes in SELECOES_PARIDADE.items():
+        filtros = Filtros.de_selecoes(selecoes)
+        if fontes.indice.contar(selecoes) == 0:
+            print(f"{nome:>18}: seleção vazia")
+            continue
+        celulas = fontes.fatia(filtros)
+        contexto = {**contexto_paises, 'anos': filtros.ano}
+        df_filtrado = fontes.filtrar(filtros)
+        esperado, mensagens_esperadas = referencia(df_filtrado, filtros.ano)
+
+        # Países fora do cubo: células por país do MapaCargos, como em gerar_insights
+        extras = {'residencia_iso3': por_dimensao_mapa(fontes, filtros, 'residencia_iso3').reset_index()}
+        valores, mensagens = insights.avaliar(celulas, contexto, celulas_extras=extras)
+        for metrica, valor in esperado.items():
+            np.testing.assert_allclose(valores[metrica], valor, rtol=1e-9, err_msg=metrica)
+        np.testing.assert_allclose(valores['crescimento'], crescimento_anual(celulas, filtros.ano), rtol=1e-12)
+        # As regras originais, na mesma ordem; a de países é nova
+        assert [m for m in mensagens if not m.startswith("🌍")] == mensagens_esperadas, (mensagens, mensagens_esperadas)
+
+        tabela = insights.momentos(celulas, ['senioridade', 'contrato'])
+        for dimensao in ('senioridade', 'contrato'):
+            por_categoria = df_filtrado.groupby(dimensao, observed=True)['usd'].agg(['count', 'mean', 'var'])
+            grupo = tabela.xs(dimensao, level='dimensao').loc[por_categoria.index.astype(str)]
+            np.testing.assert_allclose(grupo['n'], por_categoria['count'], rtol=0)
+            np.testing.assert_allclose(grupo['media'], por_categoria['mean'], rtol=1e-9)
+            np.testing.assert_allclose(grupo['m2'] / (grupo['n'] - 1), por_categoria['var'], rtol=1e-7)
+
+        t_linhas = mediana(lambda: referencia(fontes.filtrar(filtros), filtros.ano), repeticoes, aquecer=True)
+        t_motor = mediana(lambda: insights.avaliar(celulas, contexto, celulas_extras=extras), repeticoes, aquecer=True)
+        t_extras = mediana(
+            lambda: insights.avaliar(celulas, contexto, insights.REGRAS + REGRAS_EXTRAS, extras),
+            repeticoes, aquecer=True,
+        )
+        print(f"{nome:>18} {t_linhas * 1000:>7.1f} ms {t_motor * 1000:>7.1f} ms {t_extras * 1000:>7.1f} ms")
+    print("Paridade ok: métricas, momentos por categoria e mensagens das regras originais")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("n_linhas", nargs="?", type=int, default=1_000_000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+    main(args.n_linhas, args.repeticoes)
@@ -0,0 +1,77 @@
+"""Latência do mapa por cargo em função do número de linhas.
+
+Uso: python -m benchmarks.bench_mapa [tamanhos ...] [--repeticoes N]
+
+Compara o caminho original (filtro das linhas, `cargo == X` e groupby por
+país a cada troca) com o MapaCargos: um rollup por estado dos filtros e, a
+cada troca de cargo, só uma consulta à tabela já agregada. Antes de medir,
+confere média e quantidade por (cargo, país) de todos os cargos contra o
+groupby das linhas filtradas.
+"""
+import argparse
+
+import numpy as np
+
+from analise import Filtros, Fontes, salario_pais, salario_pais_cargos
+from benchmarks.bench_pipeline import SELECOES, _linhas
+from benchmarks.cronometro import mediana
+from benchmarks.sintetico import gerar_dados
+from cubo import CuboSalarios
+from indice import IndiceFiltros
+from mapa import MapaCargos
+
+CARGOS_TROCADOS = 10
+
+
+def _conferir(fontes, filtros):
+    filtrado = fontes.filtrar(filtros)
+    esperado = filtrado.groupby(['cargo', 'residencia_iso3'], observed=True)['usd'].agg(['mean', 'count'])
+    tabela = salario_pais_cargos(fontes, filtros)
+    assert list(tabela.index) == list(esperado.index.get_level_values(0).astype(str))
+    assert list(tabela['iso3']) == list(esperado.index.get_level_values(1).astype(str))
+    np.testing.assert_allclose(tabela['salario_medio'], esperado['mean'], rtol=1e-9)
+    np.testing.assert_array_equal(tabela['quantidade'], esperado['count'])
+
+
+def main(tamanhos=('100k', '1m', '5m'), repeticoes=5):
+    selecoes = SELECOES['recentes_senior']
+    filtros = Filtros.de_selecoes(selecoes)
+    print(f"Seleção: recentes_senior | trocas de cargo por medida: {CARGOS_TROCADOS}")
+    print(f"{'linhas':>12} {'entradas':>9} {'construção':>11} {'linhas/troca':>13} "
+          f"{'rollup':>10} {'consulta/troca':>15}")
+    for tamanho in tamanhos:
+        n_linhas = _linhas(tamanho)
+        df = gerar_dados(n_linhas, tipado=True)
+        cubo = CuboSalarios(df)
+        mapa = MapaCargos.de_linhas(df)
+        fontes = Fontes(df, IndiceFiltros(df), cubo, None, mapa=mapa)
+        _conferir(fontes, filtros)
+
+        filtrado = fontes.filtrar(filtros)
+        cargos = filtrado['cargo'].value_counts().index[:CARGOS_TROCADOS]
+
+        def original():
+            # O app original refazia o filtro e o groupby a cada rerun
+            for cargo in cargos:
+                linhas = fontes.filtrar(filtros)
+                linhas[linhas['cargo'] == cargo].groupby('residencia_iso3', observed=True)['usd'].agg(['mean', 'count'])
+
+        paises_cargos = salario_pais_cargos(fontes, filtros)
+
+        def consultas():
+            for cargo in cargos:
+                salario_pais(fontes, filtros, cargo, paises_cargos=paises_cargos)
+
+        t_original = mediana(original, repeticoes, aquecer=True) / len(cargos)
+        t_rollup = mediana(lambda: salario_pais_cargos(fontes, filtros), repeticoes, aquecer=True)
+        t_consulta = mediana(consultas, repeticoes, aquecer=True) / len(cargos)
+        print(f"{n_linhas:>12,} {mapa.n_entradas:>9,} {mapa.tempo_construcao * 1000:>8.0f} ms "
+              f"{t_original * 1000:>10.1f} ms {t_rollup * 1000:>7.1f} ms {t_consulta * 1000:>12.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("tamanhos", nargs="*", default=['100k', '1m', '5m'])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+    main(args.tamanhos, args.repeticoes)
@@ -0,0 +1,38 @@
+"""Memória do DataFrame com e sem o schema compacto, e efeito nas operações.
+
+Uso: python -m benchmarks.bench_memoria [n_linhas]
+"""
+import sys
+
+from benchmarks.cronometro import mediana
+from benchmarks.sintetico import gerar_dados
+from dados import diagnostico_memoria, tipar_colunas
+
+
+def _operacoes(df):
+    mascara = df['senioridade'].isin(['senior', 'executivo']) & df['contrato'].isin(['integral'])
+    filtrado = df[mascara]
+    filtrado.groupby('cargo', observed=True)['usd'].mean()
+    filtrado['cargo'].mode()
+
+
+def main(n_linhas=1_000_000):
+    original = gerar_dados(n_linhas)
+    compacto = tipar_colunas(original)
+
+    relatorio = diagnostico_memoria(original, compacto)
+    print(f"Linhas: {n_linhas:,}")
+    print(relatorio.to_string(formatters={
+        'bytes_antes': lambda b: f"{b / 1024 ** 2:,.1f} MB",
+        'bytes_depois': lambda b: f"{b / 1024 ** 2:,.1f} MB",
+        'reducao': lambda r: f"{r:,.1f}x",
+    }))
+
+    t_original = mediana(lambda: _operacoes(original))
+    t_compacto = mediana(lambda: _operacoes(compacto))
+    print(f"\nFiltro + groupby + mode (object) : {t_original * 1000:8.1f} ms")
+    print(f"Filtro + groupby + mode (códigos): {t_compacto * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,102 @@
+"""Latência de um rerun com as agregações independentes em 1, 4 e 8 workers.
+
+Uso: python -m benchmarks.bench_paralelo [n_linhas] [--workers 1 4 8] [--repeticoes N]
+
+Cada rerun é o que o app faz depois do filtro: fatia do cubo e KPIs em
+sequência, depois top cargos, evolução, modalidades, mapa, describe,
+distribuição e insights pelo ExecutorAgregacoes. Mede os modos aproximado
+(sketch) e exato (mediana e quartis sobre as linhas filtradas) e confere que
+o resultado com N workers é idêntico ao sequencial.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from analise import (
+    Filtros,
+    Fontes,
+    calcular_kpis,
+    cargo_mapa,
+    descrever_salario,
+    distribuicao_categorias,
+    gerar_insights,
+    modalidades_trabalho,
+    salario_pais,
+    salario_tempo,
+    top_cargos,
+)
+from benchmarks.bench_pipeline import SELECOES
+from benchmarks.sintetico import gerar_dados
+from paralelo import ExecutorAgregacoes
+
+
+def rerun(fontes, filtros, executor, exato):
+    celulas = fontes.fatia(filtros)
+    kpis = calcular_kpis(fontes, filtros, celulas, exato=exato)
+    cargo = cargo_mapa(fontes, filtros, celulas, kpis)
+    return kpis, executor.executar({
+        'top_cargos': lambda: top_cargos(fontes, filtros, celulas),
+        'salario_tempo': lambda: salario_tempo(fontes, filtros, celulas),
+        'modalidades': lambda: modalidades_trabalho(fontes, filtros, celulas),
+        'salario_pais': lambda: salario_pais(fontes, filtros, cargo, celulas),
+        'describe': lambda: descrever_salario(fontes, filtros, celulas, kpis, exato=exato),
+        'distribuicao': lambda: distribuicao_categorias(fontes, filtros, celulas),
+        'insights': lambda: gerar_insights(fontes, filtros, celulas),
+    })
+
+
+def _iguais(a, b):
+    if isinstance(a, pd.DataFrame):
+        pd.testing.assert_frame_equal(a, b)
+    elif isinstance(a, dict):
+        assert a.keys() == b.keys()
+        for chave in a:
+            _iguais(a[chave], b[chave])
+    elif isinstance(a, float) and np.isnan(a):
+        assert np.isnan(b)
+    else:
+        assert a == b, (a, b)
+
+
+def main(n_linhas=10_000_000, workers=(1, 4, 8), repeticoes=3):
+    print(f"Linhas: {n_linhas:,} | núcleos: {os.cpu_count()}")
+    fontes = Fontes.de_dataframe(gerar_dados(n_linhas, tipado=True))
+    selecoes = {nome: sel for nome, sel in SELECOES.items() if fontes.indice.contar(sel) > 0}
+    referencia = {}
+
+    print(f"{'modo':>10} {'workers':>8} " + " ".join(f"{nome:>17}" for nome in selecoes))
+    for exato in (False, True):
+        for n_workers in workers:
+            executor = ExecutorAgregacoes(n_workers)
+            tempos = []
+            for nome, sel in selecoes.items():
+                filtros = Filtros.de_selecoes(sel)
+                resultado = rerun(fontes, filtros, executor, exato)
+                # Montagem determinística: igual ao sequencial em qualquer número de workers
+                if (nome, exato) in referencia:
+                    _iguais(resultado[0], referencia[nome, exato][0])
+                    _iguais(resultado[1], referencia[nome, exato][1])
+                    assert list(resultado[1]) == list(referencia[nome, exato][1])
+                else:
+                    referencia[nome, exato] = resultado
+                medidas = []
+                for _ in range(repeticoes):
+                    inicio = time.perf_counter()
+                    rerun(fontes, filtros, executor, exato)
+                    medidas.append(time.perf_counter() - inicio)
+                tempos.append(np.median(medidas) * 1000)
+            executor.encerrar()
+            print(f"{'exato' if exato else 'sketch':>10} {n_workers:>8} "
+                  + " ".join(f"{ms:>14.1f} ms" for ms in tempos))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("n_linhas", nargs="?", type=int, default=10_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+    main(args.n_linhas, args.workers, args.repeticoes)
@@ -0,0 +1,218 @@
+"""Tempo do pipeline filtro -> KPIs -> agregações do dashboard, sem servidor Streamlit.
+
+Uso: python -m benchmarks.bench_pipeline [tamanhos ...] [--repeticoes N] [--saida arquivo.json] [--comparar base.json]
+
+Os tamanhos aceitam sufixos k/m (padrão: 10k 1m; a suíte completa é 10k 1m 10m 50m).
+Para cada tamanho os dados sintéticos são gerados já tipados, as estruturas
+pré-computadas do app são construídas e cada etapa do rerun é cronometrada
+para um conjunto fixo de seleções. O resultado vai para um JSON com metadados
+do ambiente; com --comparar, cada etapa é comparada com uma execução anterior
+e a saída é 1 se alguma passar do limite de regressão.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analise import (
+    Filtros,
+    Fontes,
+    calcular_kpis,
+    cargo_mapa,
+    descrever_salario,
+    distribuicao_categorias,
+    modalidades_trabalho,
+    salario_pais,
+    salario_pais_cargos,
+    salario_tempo,
+    tendencia_anual,
+    top_cargos,
+)
+from benchmarks.cronometro import cronometrar
+from benchmarks.sintetico import ANOS, CONTRATOS, SENIORIDADES, TAMANHOS, gerar_dados
+from cubo import CuboSalarios
+from histograma import HistogramaSalarios
+from indice import IndiceFiltros
+from mapa import MapaCargos
+from paginacao import IndiceOrdenacao
+from quantis import SketchQuantis
+from serie import SerieAnual
+
+DIRETORIO_RESULTADOS = Path(__file__).resolve().parent / "resultados"
+TAMANHOS_PADRAO = ['10k', '1m']
+LIMITE_REGRESSAO = 1.25
+
+SELECOES = {
+    'todos': {'ano': ANOS, 'senioridade': SENIORIDADES, 'contrato': CONTRATOS, 'tamanho_empresa': TAMANHOS},
+    'recentes_senior': {'ano': [2024, 2025], 'senioridade': ['senior'], 'contrato': ['integral'], 'tamanho_empresa': TAMANHOS},
+    'junior_executivo': {'ano': [2021, 2022], 'senioridade': ['junior', 'executivo'], 'contrato': CONTRATOS, 'tamanho_empresa': ['grande']},
+    'estreita': {'ano': [2020], 'senioridade': ['executivo'], 'contrato': ['freelancer'], 'tamanho_empresa': ['pequena']},
+}
+
+
+def _linhas(valor):
+    """'10k' -> 10_000, '1m' -> 1_000_000; números sem sufixo passam direto."""
+    valor = str(valor).lower().replace('_', '')
+    multiplicador = {'k': 1_000, 'm': 1_000_000}.get(valor[-1], 1)
+    return int(float(valor.rstrip('km')) * multiplicador)
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=Path(__file__).resolve().parent, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _varredura(df, indice, selecoes):
+    """Caminho original do app: filtro das linhas e groupbys sobre o DataFrame filtrado."""
+    filtrado = indice.filtrar(df, selecoes)
+    usd = filtrado['usd']
+    usd.mean(), usd.median(), usd.max(), usd.describe()
+    filtrado.groupby('cargo', observed=True)['usd'].agg(['mean', 'count'])
+    filtrado.groupby(['ano', 'senioridade'], observed=True)['usd'].mean()
+    filtrado['remoto'].value_counts()
+    filtrado[filtrado['cargo'] == 'Data Scientist'].groupby('residencia_iso3', observed=True)['usd'].mean()
+
+
+def etapas_rerun(df, estruturas, selecoes):
+    """Etapas de um rerun do dashboard (funções de analise.py), na ordem em que o app as executa."""
+    fontes = Fontes(df, estruturas['indice'], estruturas['cubo'], estruturas['sketch'], mapa=estruturas['mapa'], serie=estruturas['serie'])
+    filtros = Filtros.de_selecoes(selecoes)
+    celulas = fontes.fatia(filtros)
+    kpis = calcular_kpis(fontes, filtros, celulas)
+    cargo = cargo_mapa(fontes, filtros, celulas, kpis)
+    paises_cargos = salario_pais_cargos(fontes, filtros, celulas)
+    return {
+        'filtro': lambda: fontes.indice.contar(selecoes),
+        'fatia': lambda: fontes.fatia(filtros),
+        'kpis': lambda: calcular_kpis(fontes, filtros, celulas),
+        'top_cargos': lambda: top_cargos(fontes, filtros, celulas),
+        'salario_tempo': lambda: salario_tempo(fontes, filtros, celulas),
+        'tendencia': lambda: tendencia_anual(fontes, filtros),
+        'remoto': lambda: modalidades_trabalho(fontes, filtros, celulas),
+        'mapa_cargos': lambda: salario_pais_cargos(fontes, filtros, celulas),
+        'media_pais': lambda: salario_pais(fontes, filtros, cargo, paises_cargos=paises_cargos),
+        'describe': lambda: descrever_salario(fontes, filtros, celulas, kpis),
+        'histograma': lambda: estruturas['histograma'].contar(selecoes, 25),
+        'distribuicao': lambda: distribuicao_categorias(fontes, filtros, celulas),
+        'pagina': lambda: estruturas['ordenacao'].pagina(selecoes, 'usd', 1, 25, True),
+        'varredura_linhas': lambda: _varredura(df, fontes.indice, selecoes),
+    }
+
+
+def medir(n_linhas, repeticoes=5):
+    resultados = []
+
+    def registrar(selecao, etapa, tempos):
+        resultados.append({
+            'linhas': n_linhas,
+            'selecao': selecao,
+            'etapa': etapa,
+            'mediana_ms': float(np.median(tempos)) * 1000,
+            'min_ms': float(np.min(tempos)) * 1000,
+            'repeticoes': len(tempos),
+        })
+
+    inicio = time.perf_counter()
+    df = gerar_dados(n_linhas, tipado=True)
+    registrar(None, 'geracao', [time.perf_counter() - inicio])
+
+    construtores = {
+        'indice': lambda: IndiceFiltros(df),
+        'cubo': lambda: CuboSalarios(df),
+        'sketch': lambda: SketchQuantis(df),
+        'histograma': lambda: HistogramaSalarios(df),
+    }
+    estruturas = {}
+    for nome, construir in construtores.items():
+        inicio = time.perf_counter()
+        estruturas[nome] = construir()
+        registrar(None, f'construcao_{nome}', [time.perf_counter() - inicio])
+    inicio = time.perf_counter()
+    estruturas['ordenacao'] = IndiceOrdenacao(df, estruturas['indice'])
+    registrar(None, 'construcao_ordenacao', [time.perf_counter() - inicio])
+    inicio = time.perf_counter()
+    estruturas['mapa'] = MapaCargos.de_linhas(df)
+    registrar(None, 'construcao_mapa', [time.perf_counter() - inicio])
+    inicio = time.perf_counter()
+    estruturas['serie'] = SerieAnual(estruturas['sketch'], df)
+    registrar(None, 'construcao_serie', [time.perf_counter() - inicio])
+
+    for selecao, selecoes in SELECOES.items():
+        tempos_rerun = np.zeros(repeticoes)
+        for etapa, funcao in etapas_rerun(df, estruturas, selecoes).items():
+            tempos = cronometrar(funcao, repeticoes, aquecer=True)
+            if etapa != 'varredura_linhas':
+                tempos_rerun += tempos
+            registrar(selecao, etapa, tempos)
+        registrar(selecao, 'rerun', tempos_rerun)
+    return resultados
+
+
+def comparar(atual, base, limite=LIMITE_REGRESSAO):
+    """Razão atual/base da mediana por (linhas, seleção, etapa); marca as regressões."""
+    chaves = ['linhas', 'selecao', 'etapa']
+    tabela = pd.DataFrame(atual).merge(pd.DataFrame(base), on=chaves, suffixes=('', '_base'))
+    tabela['razao'] = tabela['mediana_ms'] / tabela['mediana_ms_base']
+    # Etapas abaixo de 0,05 ms ficam no ruído do relógio
+    tabela['regressao'] = (tabela['razao'] > limite) & (tabela['mediana_ms'] > 0.05)
+    return tabela[chaves + ['mediana_ms_base', 'mediana_ms', 'razao', 'regressao']]
+
+
+def main(tamanhos=TAMANHOS_PADRAO, repeticoes=5, saida=None, base=None, limite=LIMITE_REGRESSAO):
+    resultados = []
+    for tamanho in tamanhos:
+        n_linhas = _linhas(tamanho)
+        medidos = medir(n_linhas, repeticoes)
+        resultados += medidos
+        rerun = {r['selecao']: r['mediana_ms'] for r in medidos if r['etapa'] == 'rerun'}
+        print(f"{n_linhas:>12,} linhas | rerun (mediana, ms): "
+              + " | ".join(f"{selecao}: {ms:.2f}" for selecao, ms in rerun.items()))
+
+    if saida is None:
+        DIRETORIO_RESULTADOS.mkdir(exist_ok=True)
+        saida = DIRETORIO_RESULTADOS / f"pipeline-{datetime.now():%Y%m%d-%H%M%S}.json"
+    Path(saida).write_text(json.dumps({
+        'meta': {
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'commit': _commit(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'plataforma': platform.platform(),
+            'processador': platform.processor() or platform.machine(),
+            'repeticoes': repeticoes,
+        },
+        'resultados': resultados,
+    }, indent=2))
+    print(f"Resultados em {saida}")
+
+    if base is not None:
+        tabela = comparar(resultados, json.loads(Path(base).read_text())['resultados'], limite)
+        print(tabela.to_string(index=False, float_format=lambda valor: f"{valor:.3f}"))
+        regressoes = tabela[tabela['regressao']]
+        if not regressoes.empty:
+            print(f"{len(regressoes)} etapa(s) mais de {limite:.2f}x mais lentas que {base}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("tamanhos", nargs="*", default=TAMANHOS_PADRAO)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--saida", type=Path)
+    parser.add_argument("--comparar", type=Path, help="JSON de uma execução anterior")
+    parser.add_argument("--limite", type=float, default=LIMITE_REGRESSAO)
+    args = parser.parse_args()
+    raise SystemExit(main(args.tamanhos, args.repeticoes, args.saida, args.comparar, args.limite))
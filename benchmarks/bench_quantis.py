@@ -0,0 +1,50 @@
+"""Precisão vs. latência do sketch de quantis frente a Series.median()/quantile().
+
+Uso: python -m benchmarks.bench_quantis [n_linhas ...]   (padrão: 1M e 10M)
+
+Os dados saem de `gerar_dados(tipado=True)`, já no schema compacto do app,
+o que permite chegar a dezenas de milhões de linhas em memória.
+"""
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.cronometro import mediana
+from benchmarks.sintetico import ANOS, CONTRATOS, SENIORIDADES, TAMANHOS, gerar_dados
+from indice import IndiceFiltros
+from quantis import ERRO_RELATIVO_PADRAO, SketchQuantis
+
+QS = [0.25, 0.5, 0.75]
+SELECOES = [
+    {'ano': ANOS, 'senioridade': SENIORIDADES, 'contrato': CONTRATOS, 'tamanho_empresa': TAMANHOS},
+    {'ano': [2024, 2025], 'senioridade': ['senior'], 'contrato': ['integral'], 'tamanho_empresa': TAMANHOS},
+    {'ano': [2021], 'senioridade': ['junior', 'executivo'], 'contrato': CONTRATOS, 'tamanho_empresa': ['grande']},
+]
+
+
+def main(tamanhos=(1_000_000, 10_000_000)):
+    print(f"{'linhas':>12} {'sel':>4} {'exato (ms)':>11} {'sketch (ms)':>12} {'erro máx':>9} {'construção (s)':>15}")
+    for n_linhas in tamanhos:
+        df = gerar_dados(n_linhas, tipado=True)
+        indice = IndiceFiltros(df)
+        inicio = time.perf_counter()
+        sketch = SketchQuantis(df)
+        t_construcao = time.perf_counter() - inicio
+
+        for i, selecoes in enumerate(SELECOES, 1):
+            usd = indice.filtrar(df, selecoes)['usd']
+            exato = usd.quantile(QS).to_numpy()
+            aproximado = sketch.quantis(selecoes, QS)
+            t_exato = mediana(lambda: usd.quantile(QS).to_numpy(), 3)
+            t_sketch = mediana(lambda: sketch.quantis(selecoes, QS), 3)
+            erro = np.max(np.abs(aproximado - exato) / exato)
+            # Erro relativo garantido pelo sketch, com folga para a interpolação do pandas
+            assert erro <= 2 * ERRO_RELATIVO_PADRAO, (n_linhas, selecoes, erro)
+            assert abs(sketch.mediana(selecoes) - usd.median()) / usd.median() <= 2 * ERRO_RELATIVO_PADRAO
+            print(f"{n_linhas:>12,} {i:>4} {t_exato * 1000:>11.2f} {t_sketch * 1000:>12.3f} "
+                  f"{erro:>9.4f} {t_construcao:>15.2f}")
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or (1_000_000, 10_000_000))
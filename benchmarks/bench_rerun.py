@@ -0,0 +1,133 @@
+"""Replay headless de uma sequência de filtros no app, com latência por etapa.
+
+Uso: python -m benchmarks.bench_rerun [n_linhas] [--roteiro roteiro.json] [--repeticoes N] [--saida relatorio.json]
+
+O app roda pelo AppTest do Streamlit sobre um CSV sintético. Cada passo do
+roteiro é um dicionário {chave do widget: valor} aplicado antes de um rerun;
+o perfil emitido por rerun (logger dashboard.perfil) é coletado e resumido
+em p50/p95 por etapa. Sem --roteiro, um roteiro padrão percorre os filtros
+da barra lateral e as visualizações detalhadas.
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.sintetico import ANOS, CONTRATOS, SENIORIDADES, TAMANHOS, gerar_dados
+
+APP = Path(__file__).resolve().parent.parent / "app.py"
+
+# Tipos de widget procurados, na ordem, pela chave de cada passo do roteiro
+TIPOS_WIDGET = ['multiselect', 'radio', 'toggle', 'checkbox', 'select_slider', 'selectbox', 'number_input']
+
+
+def roteiro_padrao():
+    passos = [{}]
+    passos += [{'anos': [ano]} for ano in ANOS[-3:]]
+    passos.append({'anos': ANOS})
+    passos += [{'senioridades': [senioridade]} for senioridade in SENIORIDADES]
+    passos.append({'senioridades': SENIORIDADES})
+    passos.append({'contratos': CONTRATOS[:2], 'tamanhos': TAMANHOS[1:]})
+    passos.append({'detalhe': "📊 Estatísticas"})
+    passos.append({'detalhe': "💡 Insights"})
+    passos.append({'contratos': CONTRATOS, 'tamanhos': TAMANHOS, 'detalhe': "📋 Dados Completos"})
+    passos.append({'faixas_histograma': 50})
+    passos.append({'quantis_exatos': True})
+    passos.append({'quantis_exatos': False, 'faixas_histograma': 25})
+    return passos
+
+
+class _ColetorPerfil(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.INFO)
+        self.registros = []
+
+    def emit(self, record):
+        self.registros.append(json.loads(record.getMessage()))
+
+
+def _widget(at, chave):
+    for tipo in TIPOS_WIDGET:
+        try:
+            return getattr(at, tipo)(key=chave)
+        except KeyError:
+            continue
+    raise KeyError(f"widget sem a chave {chave!r}")
+
+
+def resumir(registros):
+    """p50/p95 (ms) por etapa, com o total do rerun como etapa 'rerun'."""
+    amostras = {}
+    for registro in registros:
+        if registro['tipo'] != 'rerun':
+            continue
+        amostras.setdefault('rerun', []).append(registro['total_ms'])
+        for etapa in registro['etapas']:
+            amostras.setdefault(etapa['etapa'], []).append(etapa['ms'])
+    return pd.DataFrame(
+        [
+            (etapa, len(tempos), np.percentile(tempos, 50), np.percentile(tempos, 95), max(tempos))
+            for etapa, tempos in amostras.items()
+        ],
+        columns=['etapa', 'n', 'p50_ms', 'p95_ms', 'max_ms'],
+    ).sort_values('p95_ms', ascending=False, ignore_index=True)
+
+
+def replay(roteiro, repeticoes=1):
+    # Importado aqui: o AppTest lê o ambiente (fonte dos dados) já configurado
+    from streamlit.testing.v1 import AppTest
+
+    coletor = _ColetorPerfil()
+    logger = logging.getLogger("dashboard.perfil")
+    logger.addHandler(coletor)
+    logger.setLevel(logging.INFO)
+    try:
+        at = AppTest.from_file(str(APP), default_timeout=600)
+        at.run()
+        for _ in range(repeticoes):
+            for passo in roteiro:
+                for chave, valor in passo.items():
+                    _widget(at, chave).set_value(valor)
+                at.run()
+                if at.exception:
+                    raise RuntimeError(f"passo {passo}: {at.exception[0].message}")
+    finally:
+        logger.removeHandler(coletor)
+    return coletor.registros
+
+
+def main(n_linhas=100_000, roteiro=None, repeticoes=3, saida=None):
+    roteiro = roteiro or roteiro_padrao()
+    with tempfile.TemporaryDirectory() as diretorio:
+        csv = Path(diretorio) / "dados.csv"
+        gerar_dados(n_linhas).to_csv(csv, index=False)
+        os.environ["DASHBOARD_DADOS"] = str(csv)
+        os.environ["DASHBOARD_SNAPSHOT"] = str(Path(diretorio) / "snapshot")
+        registros = replay(roteiro, repeticoes)
+
+    relatorio = resumir(registros)
+    print(f"Linhas: {n_linhas:,} | passos: {len(roteiro)} x {repeticoes} | reruns: {len(registros)}")
+    print(relatorio.to_string(index=False, float_format=lambda valor: f"{valor:.2f}"))
+    if saida:
+        Path(saida).write_text(json.dumps({
+            'linhas': n_linhas,
+            'reruns': len(registros),
+            'etapas': relatorio.to_dict(orient='records'),
+        }, indent=2))
+    return relatorio
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("n_linhas", nargs="?", type=int, default=100_000)
+    parser.add_argument("--roteiro", type=Path, help="JSON com a lista de passos {chave do widget: valor}")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--saida", type=Path, help="grava o relatório p50/p95 em JSON")
+    args = parser.parse_args()
+    roteiro = json.loads(args.roteiro.read_text()) if args.roteiro else None
+    main(args.n_linhas, roteiro, args.repeticoes, args.saida)
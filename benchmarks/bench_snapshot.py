@@ -0,0 +1,70 @@
+"""Compara a carga a frio CSV-via-HTTP com a carga a partir do snapshot Parquet.
+
+Uso: python -m benchmarks.bench_snapshot [n_linhas]
+
+O CSV sintético é servido por um http.server local, então o benchmark roda offline.
+"""
+import functools
+import http.server
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.cronometro import cronometrar
+from benchmarks.sintetico import gerar_dados
+from dados import carregar_dados
+
+
+class _HandlerComETag(http.server.SimpleHTTPRequestHandler):
+    """Servidor estático que envia ETag, como o raw.githubusercontent.com."""
+
+    def end_headers(self):
+        caminho = Path(self.translate_path(self.path))
+        if caminho.is_file():
+            estado = caminho.stat()
+            self.send_header("ETag", f'"{estado.st_mtime_ns:x}-{estado.st_size:x}"')
+        super().end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def main(n_linhas=1_000_000):
+    with tempfile.TemporaryDirectory() as pasta:
+        pasta = Path(pasta)
+        gerar_dados(n_linhas).to_csv(pasta / "dados.csv", index=False)
+
+        handler = functools.partial(_HandlerComETag, directory=str(pasta))
+        servidor = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{servidor.server_address[1]}/dados.csv"
+
+        try:
+            t_csv_http = min(cronometrar(lambda: pd.read_csv(url), 3))
+            t_csv_local = min(cronometrar(lambda: pd.read_csv(pasta / "dados.csv"), 3))
+
+            inicio = time.perf_counter()
+            carregar_dados(url, pasta / "snap_http")
+            t_construcao = time.perf_counter() - inicio
+
+            t_snap_http = min(cronometrar(lambda: carregar_dados(url, pasta / "snap_http"), 3))
+            carregar_dados(pasta / "dados.csv", pasta / "snap_local")
+            t_snap_local = min(cronometrar(lambda: carregar_dados(pasta / "dados.csv", pasta / "snap_local"), 3))
+        finally:
+            servidor.shutdown()
+
+    print(f"Linhas: {n_linhas:,}")
+    print(f"CSV via HTTP (pd.read_csv)      : {t_csv_http * 1000:9.1f} ms")
+    print(f"CSV local (pd.read_csv)         : {t_csv_local * 1000:9.1f} ms")
+    print(f"Construção do snapshot (1ª vez) : {t_construcao * 1000:9.1f} ms")
+    print(f"Snapshot, fonte HTTP (ETag)     : {t_snap_http * 1000:9.1f} ms")
+    print(f"Snapshot, fonte local (SHA-256) : {t_snap_local * 1000:9.1f} ms")
+    print(f"Ganho vs CSV via HTTP           : {t_csv_http / t_snap_http:9.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
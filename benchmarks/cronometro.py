@@ -0,0 +1,25 @@
+"""Cronometragem comum aos benchmarks."""
+import time
+
+import numpy as np
+
+
+def cronometrar(funcao, repeticoes=5, aquecer=False):
+    """Tempos (s) de cada chamada de `funcao`.
+
+    Com `aquecer`, uma chamada inicial fica fora da medição (caches internos e
+    alocações iniciais).
+    """
+    if aquecer:
+        funcao()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def mediana(funcao, repeticoes=5, aquecer=False):
+    """Mediana dos tempos (s) de `repeticoes` chamadas."""
+    return float(np.median(cronometrar(funcao, repeticoes, aquecer)))
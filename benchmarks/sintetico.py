@@ -0,0 +1,144 @@
+"""Gerador de dados sintéticos com o mesmo schema de dados-imersao-final.csv."""
+import numpy as np
+import pandas as pd
+
+SENIORIDADES = ['junior', 'pleno', 'senior', 'executivo']
+CONTRATOS = ['integral', 'parcial', 'contrato', 'freelancer']
+TAMANHOS = ['pequena', 'media', 'grande']
+REMOTOS = ['remoto', 'presencial', 'hibrido']
+ANOS = [2020, 2021, 2022, 2023, 2024, 2025]
+
+CARGOS_BASE = [
+    'Data Scientist', 'Data Engineer', 'Data Analyst', 'Machine Learning Engineer',
+    'Analytics Engineer', 'Research Scientist', 'Data Architect', 'BI Developer',
+    'Applied Scientist', 'AI Engineer', 'MLOps Engineer', 'Data Manager',
+]
+# ~90 países de residência, como no dataset real
+PAISES = [
+    ('US', 'USA'), ('GB', 'GBR'), ('CA', 'CAN'), ('DE', 'DEU'), ('FR', 'FRA'), ('ES', 'ESP'),
+    ('IN', 'IND'), ('BR', 'BRA'), ('PT', 'PRT'), ('NL', 'NLD'), ('AU', 'AUS'), ('MX', 'MEX'),
+    ('AR', 'ARG'), ('PL', 'POL'), ('IT', 'ITA'), ('IE', 'IRL'), ('JP', 'JPN'), ('ZA', 'ZAF'),
+    ('NG', 'NGA'), ('CH', 'CHE'), ('SE', 'SWE'), ('CO', 'COL'), ('CL', 'CHL'), ('SG', 'SGP'),
+    ('PK', 'PAK'), ('TR', 'TUR'), ('GR', 'GRC'), ('AT', 'AUT'), ('BE', 'BEL'), ('DK', 'DNK'),
+    ('FI', 'FIN'), ('NO', 'NOR'), ('CZ', 'CZE'), ('HU', 'HUN'), ('RO', 'ROU'), ('UA', 'UKR'),
+    ('LT', 'LTU'), ('LV', 'LVA'), ('EE', 'EST'), ('SI', 'SVN'), ('HR', 'HRV'), ('RS', 'SRB'),
+    ('BG', 'BGR'), ('SK', 'SVK'), ('LU', 'LUX'), ('MT', 'MLT'), ('CY', 'CYP'), ('IL', 'ISR'),
+    ('AE', 'ARE'), ('SA', 'SAU'), ('QA', 'QAT'), ('EG', 'EGY'), ('KE', 'KEN'), ('GH', 'GHA'),
+    ('MA', 'MAR'), ('TN', 'TUN'), ('DZ', 'DZA'), ('UG', 'UGA'), ('CN', 'CHN'), ('HK', 'HKG'),
+    ('TW', 'TWN'), ('KR', 'KOR'), ('VN', 'VNM'), ('TH', 'THA'), ('MY', 'MYS'), ('ID', 'IDN'),
+    ('PH', 'PHL'), ('NZ', 'NZL'), ('BD', 'BGD'), ('LK', 'LKA'), ('NP', 'NPL'), ('PE', 'PER'),
+    ('EC', 'ECU'), ('UY', 'URY'), ('PY', 'PRY'), ('BO', 'BOL'), ('VE', 'VEN'), ('CR', 'CRI'),
+    ('PA', 'PAN'), ('DO', 'DOM'), ('PR', 'PRI'), ('GT', 'GTM'), ('HN', 'HND'), ('JM', 'JAM'),
+    ('RU', 'RUS'), ('BY', 'BLR'), ('KZ', 'KAZ'), ('UZ', 'UZB'), ('AM', 'ARM'), ('GE', 'GEO'),
+]
+MULTIPLICADOR_SENIORIDADE = {'junior': 0.55, 'pleno': 0.8, 'senior': 1.1, 'executivo': 1.5}
+
+
+def _cargos(n_cargos):
+    """Cargos base mais variações até atingir a cardinalidade pedida (~150 no dataset real)."""
+    variacoes = ['', 'Lead ', 'Principal ', 'Staff ', 'Head of ', 'Associate ',
+                 'Senior ', 'Junior ', 'Cloud ', 'Big ', 'Product ', 'Business ', 'Marketing ']
+    cargos = []
+    for prefixo in variacoes:
+        for base in CARGOS_BASE:
+            cargos.append(f"{prefixo}{base}")
+    return cargos[:n_cargos]
+
+
+def _pesos_zipf(n, s=1.1):
+    pesos = 1.0 / np.arange(1, n + 1) ** s
+    return pesos / pesos.sum()
+
+
+# Linhas geradas por vez no modo tipado, para limitar os temporários em 50M linhas
+LINHAS_POR_BLOCO = 5_000_000
+
+
+def _sortear_bloco(rng, n_linhas, n_cargos, n_paises):
+    """Códigos das colunas categóricas e valores numéricos de um bloco de linhas."""
+    idx_cargo = rng.choice(n_cargos, n_linhas, p=_pesos_zipf(n_cargos))
+    idx_pais = rng.choice(n_paises, n_linhas, p=_pesos_zipf(n_paises, 1.6))
+    # A empresa fica no país de residência na maior parte dos casos
+    idx_empresa = np.where(rng.random(n_linhas) < 0.9, idx_pais, rng.choice(n_paises, n_linhas))
+    idx_senioridade = rng.choice(len(SENIORIDADES), n_linhas, p=[0.15, 0.3, 0.45, 0.1])
+    ano = np.asarray(ANOS)[rng.choice(len(ANOS), n_linhas, p=[0.03, 0.05, 0.12, 0.3, 0.35, 0.15])]
+
+    multiplicador = np.array([MULTIPLICADOR_SENIORIDADE[s] for s in SENIORIDADES])[idx_senioridade]
+    # Log-normal: cauda longa à direita, como os salários reais
+    usd = rng.lognormal(mean=11.6, sigma=0.45, size=n_linhas) * multiplicador
+    usd *= 1 + (ano - 2020) * 0.03
+
+    return {
+        'ano': ano,
+        'senioridade': idx_senioridade,
+        'contrato': rng.choice(len(CONTRATOS), n_linhas, p=[0.95, 0.02, 0.02, 0.01]),
+        'cargo': idx_cargo,
+        'usd': usd.round(0),
+        'residencia': idx_pais,
+        'remoto': rng.choice(len(REMOTOS), n_linhas, p=[0.35, 0.5, 0.15]),
+        'empresa': idx_empresa,
+        'tamanho_empresa': rng.choice(len(TAMANHOS), n_linhas, p=[0.1, 0.8, 0.1]),
+    }
+
+
+def _categorica(codigos, valores):
+    """Categórico com as categorias em ordem alfabética, como em tipar_colunas."""
+    return pd.Categorical.from_codes(codigos.astype(np.int16), valores).set_categories(sorted(valores))
+
+
+def gerar_dados(n_linhas, seed=42, n_cargos=150, tipado=False):
+    """Gera um DataFrame com distribuição assimétrica de salários e categorias enviesadas.
+
+    Com `tipado=True` as colunas já saem no schema compacto de `dados.tipar_colunas`
+    (categóricos montados a partir dos códigos, sem strings intermediárias), o que
+    permite gerar 50M linhas em poucos GB.
+    """
+    rng = np.random.default_rng(seed)
+    cargos = np.array(_cargos(n_cargos))
+    iso2 = np.array([p[0] for p in PAISES])
+    iso3 = np.array([p[1] for p in PAISES])
+
+    if not tipado:
+        bloco = _sortear_bloco(rng, n_linhas, len(cargos), len(PAISES))
+        return pd.DataFrame({
+            'ano': bloco['ano'],
+            'senioridade': np.asarray(SENIORIDADES)[bloco['senioridade']],
+            'contrato': np.asarray(CONTRATOS)[bloco['contrato']],
+            'cargo': cargos[bloco['cargo']],
+            'salario': bloco['usd'],
+            'moeda': 'USD',
+            'usd': bloco['usd'],
+            'residencia': iso2[bloco['residencia']],
+            'remoto': np.asarray(REMOTOS)[bloco['remoto']],
+            'empresa': iso2[bloco['empresa']],
+            'tamanho_empresa': np.asarray(TAMANHOS)[bloco['tamanho_empresa']],
+            'residencia_iso3': iso3[bloco['residencia']],
+        })
+
+    blocos = []
+    for inicio in range(0, n_linhas, LINHAS_POR_BLOCO):
+        bloco = _sortear_bloco(rng, min(LINHAS_POR_BLOCO, n_linhas - inicio), len(cargos), len(PAISES))
+        usd = bloco['usd'].astype(np.int32)
+        blocos.append(pd.DataFrame({
+            'ano': bloco['ano'].astype(np.int16),
+            'senioridade': _categorica(bloco['senioridade'], SENIORIDADES),
+            'contrato': _categorica(bloco['contrato'], CONTRATOS),
+            'cargo': _categorica(bloco['cargo'], cargos),
+            'salario': usd,
+            'moeda': pd.Categorical.from_codes(np.zeros(len(usd), dtype=np.int8), ['USD']),
+            'usd': usd,
+            'residencia': _categorica(bloco['residencia'], iso2),
+            'remoto': _categorica(bloco['remoto'], REMOTOS),
+            'empresa': _categorica(bloco['empresa'], iso2),
+            'tamanho_empresa': _categorica(bloco['tamanho_empresa'], TAMANHOS),
+            'residencia_iso3': _categorica(bloco['residencia'], iso3),
+        }))
+        del bloco
+    df = pd.concat(blocos, ignore_index=True) if len(blocos) > 1 else blocos[0]
+    # Como em tipar_colunas: só as categorias observadas (residência e empresa dividem o dicionário)
+    for coluna in ['senioridade', 'contrato', 'cargo', 'remoto', 'tamanho_empresa', 'residencia_iso3']:
+        df[coluna] = df[coluna].cat.remove_unused_categories()
+    paises = sorted(set(df['residencia'].unique().dropna()) | set(df['empresa'].unique().dropna()))
+    df['residencia'] = df['residencia'].cat.set_categories(paises)
+    df['empresa'] = df['empresa'].cat.set_categories(paises)
+    return df
@@ -0,0 +1,101 @@
+"""Cache de resultados por estado dos filtros.
+
+A chave é a seleção canonizada (frozenset por dimensão, em ordem fixa), então
+a mesma combinação de filtros em qualquer ordem de clique reaproveita todos
+os artefatos derivados. A evicção é LRU, limitada por número de itens e por
+tamanho estimado em bytes. O cache é compartilhado entre sessões, por isso
+o acesso é protegido por lock.
+"""
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MAX_ITENS_PADRAO = 64
+MAX_BYTES_PADRAO = 128 * 1024 ** 2
+
+
+def chave_selecao(selecoes, *extras):
+    """Chave canônica e hashável para um dicionário de seleções."""
+    return tuple(
+        (dimensao, frozenset(selecoes[dimensao])) for dimensao in sorted(selecoes)
+    ) + tuple(extras)
+
+
+def tamanho_estimado(valor):
+    """Tamanho aproximado em bytes de um artefato (DataFrames, arrays, JSON, coleções)."""
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        uso = valor.memory_usage(deep=True)
+        return int(uso.sum() if isinstance(valor, pd.DataFrame) else uso)
+    if isinstance(valor, np.ndarray):
+        return int(valor.nbytes)
+    if isinstance(valor, (str, bytes)):
+        return sys.getsizeof(valor)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(tamanho_estimado(v) for v in valor.values())
+    if isinstance(valor, (list, tuple)):
+        return sys.getsizeof(valor) + sum(tamanho_estimado(v) for v in valor)
+    return sys.getsizeof(valor)
+
+
+class CacheResultados:
+    def __init__(self, max_itens=MAX_ITENS_PADRAO, max_bytes=MAX_BYTES_PADRAO):
+        self.max_itens = max_itens
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._itens)
+
+    def __contains__(self, chave):
+        with self._lock:
+            return chave in self._itens
+
+    def obter(self, chave):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                self.misses += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.hits += 1
+            return item[0]
+
+    def guardar(self, chave, valor):
+        tamanho = tamanho_estimado(valor)
+        with self._lock:
+            if chave in self._itens:
+                self.bytes -= self._itens.pop(chave)[1]
+            self._itens[chave] = (valor, tamanho)
+            self.bytes += tamanho
+            while self._itens and (len(self._itens) > self.max_itens or self.bytes > self.max_bytes):
+                _, (_, tamanho_removido) = self._itens.popitem(last=False)
+                self.bytes -= tamanho_removido
+
+    def obter_ou_calcular(self, chave, calcular):
+        valor = self.obter(chave)
+        if valor is None:
+            valor = calcular()
+            self.guardar(chave, valor)
+        return valor
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+            self.bytes = 0
+
+    def estatisticas(self):
+        total = self.hits + self.misses
+        return {
+            'itens': len(self._itens),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'taxa_acerto': self.hits / total if total else 0.0,
+        }
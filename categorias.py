@@ -0,0 +1,47 @@
+"""Distribuição por categorias em uma única passada.
+
+Os códigos de todas as dimensões pedidas são deslocados para faixas
+disjuntas e contados com um só np.bincount, ponderado pela contagem de cada
+célula quando a entrada é o cubo. Acrescentar uma dimensão não acrescenta
+varredura.
+"""
+import numpy as np
+import pandas as pd
+
+from indice import codificar
+
+DIMENSOES_DISTRIBUICAO = ['senioridade', 'contrato', 'remoto', 'tamanho_empresa', 'residencia_iso3']
+
+
+def distribuicao(df, dimensoes=DIMENSOES_DISTRIBUICAO, pesos=None):
+    """Contagem e percentual por categoria de cada dimensão.
+
+    `pesos` é o nome de uma coluna de contagens (ex.: 'count' das células do
+    cubo); sem ela cada linha conta 1. Categorias sem ocorrências são omitidas.
+    """
+    codigos, valores, deslocamentos = [], [], [0]
+    for dimensao in dimensoes:
+        codigos_dimensao, valores_dimensao = codificar(df[dimensao])
+        codigos.append(codigos_dimensao.astype(np.int64) + deslocamentos[-1])
+        valores.append(valores_dimensao)
+        deslocamentos.append(deslocamentos[-1] + len(valores_dimensao))
+
+    peso = None if pesos is None else np.tile(df[pesos].to_numpy(dtype=np.float64), len(dimensoes))
+    contagens = np.bincount(np.concatenate(codigos), weights=peso, minlength=deslocamentos[-1])
+    total = contagens[:deslocamentos[1]].sum() if dimensoes else 0
+
+    resultado = pd.DataFrame({
+        'dimensao': np.repeat(dimensoes, [len(v) for v in valores]),
+        'categoria': [valor for valores_dimensao in valores for valor in valores_dimensao],
+        'quantidade': contagens.astype(np.int64),
+    })
+    resultado['percentual'] = resultado['quantidade'] / total * 100 if total else 0.0
+    resultado = resultado[resultado['quantidade'] > 0]
+    # Mesma ordem do value_counts dentro de cada dimensão
+    ordem = {dimensao: i for i, dimensao in enumerate(dimensoes)}
+    return (
+        resultado.assign(_ordem=resultado['dimensao'].map(ordem))
+        .sort_values(['_ordem', 'quantidade'], ascending=[True, False], kind='stable')
+        .drop(columns='_ordem')
+        .reset_index(drop=True)
+    )
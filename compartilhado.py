@@ -0,0 +1,57 @@
+"""Dataset publicado uma vez em arquivo Arrow e mapeado em memória, sem cópia.
+
+O DataFrame tipado é gravado como Arrow IPC sem compressão; cada sessão,
+thread ou processo que o abre com `mapear` recebe colunas NumPy que apontam
+direto para as páginas do arquivo mapeado (somente leitura). As páginas ficam
+no page cache do sistema, então N processos com o mesmo arquivo dividem uma
+única cópia física dos dados em vez de manter N cópias privadas.
+
+A versão publicada (checksum da fonte, hash do manifesto) fica nos metadados
+do schema; `carregar_mapeado` só regrava o arquivo quando ela muda.
+"""
+import os
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+CHAVE_VERSAO = b"dashboard_versao"
+
+
+def publicar(df, caminho, versao=""):
+    """Grava `df` como Arrow IPC, com troca atômica do arquivo."""
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    tabela = tabela.replace_schema_metadata({**(tabela.schema.metadata or {}), CHAVE_VERSAO: str(versao).encode()})
+    # Nome temporário por processo: publicações concorrentes não se atropelam
+    temporario = caminho.with_suffix(f".arrow.{os.getpid()}.tmp")
+    with pa.OSFile(str(temporario), "wb") as arquivo, ipc.new_file(arquivo, tabela.schema) as escritor:
+        escritor.write_table(tabela)
+    # Quem já mapeou o arquivo anterior continua com ele até soltar a referência
+    os.replace(temporario, caminho)
+    return caminho
+
+
+def versao_publicada(caminho):
+    """Versão gravada no arquivo, ou None se ele não existe ou é ilegível."""
+    try:
+        with pa.memory_map(str(caminho), "r") as origem:
+            metadados = ipc.open_file(origem).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    return metadados.get(CHAVE_VERSAO, b"").decode()
+
+
+def mapear(caminho):
+    """DataFrame cujas colunas (e códigos dos categóricos) são vistas do arquivo mapeado."""
+    tabela = ipc.open_file(pa.memory_map(str(caminho), "r")).read_all()
+    # split_blocks evita consolidar colunas do mesmo tipo num bloco novo (que seria uma cópia)
+    return tabela.to_pandas(split_blocks=True)
+
+
+def carregar_mapeado(caminho, versao, carregar):
+    """Mapeia `caminho` se já publicado em `versao`; senão chama `carregar()`, publica e mapeia."""
+    if versao_publicada(caminho) != str(versao):
+        publicar(carregar(), caminho, versao)
+    return mapear(caminho)
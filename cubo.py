@@ -0,0 +1,167 @@
+"""Cubo pré-agregado de salários.
+
+As linhas são agrupadas uma única vez pelas dimensões dos filtros e pela
+modalidade de trabalho, guardando count/sum/sumsq/min/max de `usd` por
+célula. Médias, desvio padrão, coeficiente de variação e contagens de
+qualquer combinação de filtros saem de um rollup das células, sem varrer as
+linhas originais.
+
+Cargo (~150 valores) e país (~90) ficam fora: com eles o cubo chega perto de
+uma célula a cada duas linhas, e o rollup das células sai mais lento que a
+varredura até perto de 1M de linhas. As somas por cargo e por país vêm do
+`MapaCargos`, que guarda só os pares existentes por célula dos filtros.
+
+Sem elas o cubo fica em centenas de células e o custo das agregações é
+quase fixo (~10 ms em bench_cubo), contra uma varredura que cresce com as
+linhas: o cubo empata com ela perto de 100k linhas e ganha daí em diante
+(2.6x em 200k, 7x em 1M, 39x em 4M). Abaixo disso a diferença é de poucos
+milissegundos; seleções de cargo ou país (`Filtros.por_linhas`) já varrem
+as linhas filtradas pelo índice.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from indice import DIMENSOES_FILTRO, IndiceFiltros, codificar
+
+# Dimensões de poucos valores: as células do cubo ficam em centenas, qualquer que seja o número de linhas
+DIMENSOES_CUBO = [*DIMENSOES_FILTRO, 'remoto']
+# Células por ano mantidas pela ingestão, das quais saem o cubo e o MapaCargos
+DIMENSOES_DETALHE = ['ano', 'senioridade', 'contrato', 'tamanho_empresa', 'cargo', 'residencia_iso3', 'remoto']
+MEDIDAS = ['count', 'sum', 'sumsq', 'min', 'max']
+
+
+def _derivar(agregado):
+    """Acrescenta média, desvio padrão amostral e CV (%) às medidas somadas."""
+    n = agregado['count']
+    agregado['media'] = agregado['sum'] / n
+    variancia = (agregado['sumsq'] - agregado['sum'] ** 2 / n) / (n - 1)
+    agregado['desvio'] = np.sqrt(variancia.clip(lower=0)).where(n > 1)
+    agregado['cv'] = agregado['desvio'] / agregado['media'] * 100
+    return agregado
+
+
+def rollup(celulas, por):
+    """Agrega células do cubo pelas dimensões em `por` (str ou lista).
+
+    Mesmo resultado de um groupby(por, observed=True) das medidas, com
+    bincounts sobre os códigos das dimensões: com centenas de células, o custo
+    fixo do groupby dominaria o rollup.
+    """
+    dimensoes = [por] if isinstance(por, str) else list(por)
+    grupo = np.zeros(len(celulas), dtype=np.int64)
+    validas = np.ones(len(celulas), dtype=bool)
+    for dimensao in dimensoes:
+        codigos, valores = codificar(celulas[dimensao])
+        grupo = grupo * len(valores) + codigos
+        validas &= codigos >= 0
+    grupos, primeira, posicao = np.unique(grupo[validas], return_index=True, return_inverse=True)
+    linhas = np.flatnonzero(validas)
+
+    def somar(medida):
+        return np.bincount(posicao, weights=celulas[medida].to_numpy(np.float64)[linhas], minlength=len(grupos))
+
+    minimo = np.full(len(grupos), np.inf)
+    np.minimum.at(minimo, posicao, celulas['min'].to_numpy(np.float64)[linhas])
+    maximo = np.full(len(grupos), -np.inf)
+    np.maximum.at(maximo, posicao, celulas['max'].to_numpy(np.float64)[linhas])
+
+    # Rótulos tirados da primeira célula de cada grupo, com o tipo original da coluna
+    niveis = [celulas[dimensao].iloc[linhas[primeira]].reset_index(drop=True) for dimensao in dimensoes]
+    indice = pd.Index(niveis[0], name=por) if isinstance(por, str) else pd.MultiIndex.from_arrays(niveis, names=dimensoes)
+    agregado = pd.DataFrame(
+        {'count': somar('count').astype(np.int64), 'sum': somar('sum'), 'sumsq': somar('sumsq'), 'min': minimo, 'max': maximo},
+        index=indice,
+    )
+    return _derivar(agregado)
+
+
+def totais(celulas):
+    """Medidas da fatia inteira como uma Series (count, sum, ..., media, desvio, cv)."""
+    agregado = pd.DataFrame([{
+        'count': celulas['count'].sum(),
+        'sum': celulas['sum'].sum(),
+        'sumsq': celulas['sumsq'].sum(),
+        'min': celulas['min'].min(),
+        'max': celulas['max'].max(),
+    }])
+    return _derivar(agregado).iloc[0]
+
+
+def agregar_celulas(df, dimensoes=DIMENSOES_CUBO):
+    """Células do cubo (count/sum/sumsq/min/max de usd) a partir das linhas."""
+    usd = df['usd'].astype('float64')
+    return (
+        df[list(dimensoes)]
+        .assign(usd=usd, usd2=usd ** 2)
+        .groupby(list(dimensoes), observed=True)
+        .agg(
+            count=('usd', 'size'),
+            sum=('usd', 'sum'),
+            sumsq=('usd2', 'sum'),
+            min=('usd', 'min'),
+            max=('usd', 'max'),
+        )
+        .reset_index()
+    )
+
+
+def mesclar_celulas(lista_celulas, dimensoes=DIMENSOES_CUBO):
+    """Combina conjuntos de células, como se as linhas de origem tivessem sido agregadas juntas."""
+    celulas = pd.concat(lista_celulas, ignore_index=True)
+    for dimensao in dimensoes:
+        if dimensao != 'ano':
+            celulas[dimensao] = celulas[dimensao].astype('category')
+    return (
+        celulas.groupby(list(dimensoes), observed=True)
+        .agg(count=('count', 'sum'), sum=('sum', 'sum'), sumsq=('sumsq', 'sum'), min=('min', 'min'), max=('max', 'max'))
+        .reset_index()
+    )
+
+
+def nomes_paises(df):
+    """Nome do país por ISO3, para rótulos do mapa."""
+    if 'residencia' not in df.columns:
+        return pd.Series(dtype=str)
+    return df.drop_duplicates('residencia_iso3').set_index('residencia_iso3')['residencia'].astype(str)
+
+
+class CuboSalarios:
+    def __init__(self, df, dimensoes=DIMENSOES_CUBO):
+        inicio = time.perf_counter()
+        self._montar(agregar_celulas(df, dimensoes), nomes_paises(df), dimensoes, inicio)
+
+    @classmethod
+    def de_celulas(cls, celulas, nomes, dimensoes=DIMENSOES_CUBO):
+        """Cubo a partir de células já agregadas (ex.: mantidas pela ingestão incremental)."""
+        cubo = cls.__new__(cls)
+        cubo._montar(celulas, nomes, dimensoes, time.perf_counter())
+        return cubo
+
+    def _montar(self, celulas, nomes, dimensoes, inicio):
+        self.dimensoes = list(dimensoes)
+        self.celulas = celulas
+        self.nomes_paises = nomes
+        # O mesmo índice de bitmaps da barra lateral, agora sobre as células
+        self.indice = IndiceFiltros(self.celulas, DIMENSOES_FILTRO)
+        self.tempo_construcao = time.perf_counter() - inicio
+
+    @property
+    def n_celulas(self):
+        return len(self.celulas)
+
+    @property
+    def memoria_bytes(self):
+        return int(self.celulas.memory_usage(deep=True).sum())
+
+    def fatia(self, selecoes):
+        """Células que atendem às seleções dos filtros."""
+        return self.indice.filtrar(self.celulas, selecoes)
+
+    def relatorio(self):
+        return {
+            'celulas': self.n_celulas,
+            'memoria_mb': self.memoria_bytes / 1024 ** 2,
+            'construcao_ms': self.tempo_construcao * 1000,
+        }
@@ -0,0 +1,255 @@
+"""Camada de acesso aos dados do dashboard.
+
+Na primeira carga o CSV é lido (da URL original ou de um caminho local),
+tipado e gravado como um snapshot Parquet local. Nas cargas seguintes o
+snapshot é reaproveitado enquanto a fonte não mudar (ETag para HTTP,
+SHA-256 para arquivos locais), evitando novo download e novo parse do CSV.
+
+Com `mapeado=True` o snapshot também é publicado em Arrow IPC e devolvido
+mapeado em memória (ver compartilhado.py), compartilhado entre processos.
+"""
+import hashlib
+import io
+import json
+import os
+import shutil
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from compartilhado import carregar_mapeado
+
+URL_DADOS = "https://raw.githubusercontent.com/vqrca/dashboard_salarios_dados/refs/heads/main/dados-imersao-final.csv"
+
+# Fonte e diretório do snapshot podem ser trocados por variável de ambiente
+FONTE_DADOS = os.environ.get("DASHBOARD_DADOS", URL_DADOS)
+DIRETORIO_SNAPSHOT = Path(os.environ.get("DASHBOARD_SNAPSHOT", ".snapshot_dados"))
+
+# --- Schema compacto aplicado na carga ---
+TIPOS_NUMERICOS = {'ano': 'int16'}
+# Valores monetários viram int32 quando inteiros e cabem; senão float32
+COLUNAS_MONETARIAS = ['salario', 'usd']
+COLUNAS_CATEGORICAS = [
+    'senioridade',
+    'contrato',
+    'tamanho_empresa',
+    'remoto',
+    'cargo',
+    'moeda',
+    'residencia',
+    'empresa',
+    'residencia_iso3',
+]
+# Colunas com o mesmo domínio (códigos de país) compartilham um único dicionário
+DICIONARIOS_COMPARTILHADOS = [('residencia', 'empresa')]
+# Incrementar quando o schema mudar, para invalidar snapshots antigos
+VERSAO_SCHEMA = 2
+
+TIMEOUT_HTTP = 10
+
+
+def _eh_url(fonte):
+    return str(fonte).startswith(("http://", "https://"))
+
+
+def _nome_snapshot(fonte):
+    return hashlib.sha1(str(fonte).encode()).hexdigest()[:16]
+
+
+def sha256_arquivo(caminho):
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _etag_remoto(url):
+    """Consulta apenas o cabeçalho ETag da fonte.
+
+    Retorna None se a fonte estiver inacessível e "" se o servidor não envia ETag.
+    """
+    requisicao = urllib.request.Request(url, method="HEAD")
+    try:
+        with urllib.request.urlopen(requisicao, timeout=TIMEOUT_HTTP) as resposta:
+            return resposta.headers.get("ETag", "")
+    except (urllib.error.URLError, OSError):
+        return None
+
+
+def _tipo_monetario(coluna):
+    valores = coluna.to_numpy()
+    if np.issubdtype(valores.dtype, np.integer) or (
+        np.isfinite(valores).all() and (np.mod(valores, 1) == 0).all()
+    ):
+        info = np.iinfo(np.int32)
+        if len(valores) == 0 or (valores.min() >= info.min and valores.max() <= info.max):
+            return 'int32'
+    return 'float32'
+
+
+def tipar_colunas(df):
+    """Aplica o schema compacto usado pelo snapshot e pelo dashboard."""
+    df = df.copy()
+    for coluna, tipo in TIPOS_NUMERICOS.items():
+        df[coluna] = df[coluna].astype(tipo)
+    for coluna in COLUNAS_MONETARIAS:
+        if coluna in df.columns and df[coluna].dtype.kind in 'iuf':
+            df[coluna] = df[coluna].astype(_tipo_monetario(df[coluna]))
+
+    compartilhadas = {}
+    for grupo in DICIONARIOS_COMPARTILHADOS:
+        presentes = [coluna for coluna in grupo if coluna in df.columns]
+        categorias = sorted(set().union(*(df[coluna].dropna().astype(str).unique() for coluna in presentes)))
+        for coluna in presentes:
+            compartilhadas[coluna] = pd.CategoricalDtype(categorias)
+    for coluna in COLUNAS_CATEGORICAS:
+        if coluna in df.columns:
+            df[coluna] = df[coluna].astype(compartilhadas.get(coluna, 'category'))
+    return df
+
+
+def diagnostico_memoria(antes, depois):
+    """Tipo e memória (bytes) por coluna antes e depois do schema compacto."""
+    relatorio = pd.DataFrame({
+        'tipo_antes': antes.dtypes.astype(str),
+        'tipo_depois': depois.dtypes.astype(str),
+        'bytes_antes': antes.memory_usage(deep=True, index=False),
+        'bytes_depois': depois.memory_usage(deep=True, index=False),
+    })
+    relatorio.loc['total'] = ['', '', relatorio['bytes_antes'].sum(), relatorio['bytes_depois'].sum()]
+    relatorio['reducao'] = relatorio['bytes_antes'] / relatorio['bytes_depois']
+    return relatorio
+
+
+def _ler_meta(caminho_meta):
+    try:
+        return json.loads(caminho_meta.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _gravar_snapshot(df, caminho, caminho_meta, meta):
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    temporario = caminho.with_suffix(".parquet.tmp")
+    df.to_parquet(temporario, index=False)
+    os.replace(temporario, caminho)
+    caminho_meta.write_text(json.dumps(meta))
+
+
+def _ler_snapshot(caminho, checksum=None, mapeado=False):
+    try:
+        if mapeado:
+            # A cópia Arrow acompanha o checksum da fonte que gerou o snapshot
+            return carregar_mapeado(caminho.with_suffix(".arrow"), checksum, lambda: pd.read_parquet(caminho))
+        return pd.read_parquet(caminho)
+    except (OSError, ValueError):
+        return None
+
+
+def assinatura_fonte(fonte=None):
+    """Identificação barata do conteúdo atual da fonte: ETag (URL) ou SHA-256 (arquivo local).
+
+    None se a fonte está inacessível; "" se o servidor não envia ETag (só o download diz se mudou).
+    """
+    fonte = fonte or FONTE_DADOS
+    if _eh_url(fonte):
+        return _etag_remoto(fonte)
+    try:
+        return sha256_arquivo(fonte)
+    except OSError:
+        return None
+
+
+def versao_dados(fonte=None, diretorio=None):
+    """SHA-256 do conteúdo que gerou o snapshot atual (None se ainda não há snapshot)."""
+    fonte = fonte or FONTE_DADOS
+    caminho = caminho_snapshot(fonte, diretorio)
+    meta = _ler_meta(caminho.with_suffix(".json"))
+    return meta.get("sha256") if meta else None
+
+
+def caminho_snapshot(fonte=None, diretorio=None):
+    """Arquivo Parquet do snapshot da fonte (existe após a primeira carga)."""
+    fonte = fonte or FONTE_DADOS
+    diretorio = Path(diretorio or DIRETORIO_SNAPSHOT)
+    return diretorio / f"{_nome_snapshot(fonte)}.parquet"
+
+
+def fixar_snapshot(fonte=None, diretorio=None, manter=2):
+    """Snapshot atual com o checksum no nome, que não muda quando o snapshot é regravado.
+
+    É um hard link (cópia só se o sistema de arquivos não os suporta), então
+    não ocupa espaço enquanto o snapshot não muda. Ficam as `manter` versões
+    mais recentes, para as sessões que ainda servem a anterior.
+    """
+    fonte = fonte or FONTE_DADOS
+    caminho = caminho_snapshot(fonte, diretorio)
+    fixado = caminho.with_name(f"{caminho.stem}-{versao_dados(fonte, diretorio)[:16]}.parquet")
+    if not fixado.exists():
+        temporario = fixado.with_suffix(f".parquet.{os.getpid()}.tmp")
+        try:
+            os.link(caminho, temporario)
+        except OSError:
+            shutil.copyfile(caminho, temporario)
+        os.replace(temporario, fixado)
+    fixados = sorted(caminho.parent.glob(f"{caminho.stem}-*.parquet"), key=lambda c: c.stat().st_mtime_ns)
+    for antigo in fixados[:-manter]:
+        if antigo != fixado:
+            antigo.unlink(missing_ok=True)
+    return fixado
+
+
+def carregar_dados(fonte=None, diretorio=None, mapeado=False):
+    """Carrega o dataset a partir do snapshot local, reconstruindo-o se a fonte mudou.
+
+    Com `mapeado`, devolve o DataFrame mapeado (somente leitura) da cópia Arrow do snapshot.
+    """
+    fonte = fonte or FONTE_DADOS
+    diretorio = Path(diretorio or DIRETORIO_SNAPSHOT)
+    caminho = caminho_snapshot(fonte, diretorio)
+    caminho_meta = caminho.with_suffix(".json")
+    meta = _ler_meta(caminho_meta)
+    if meta and meta.get("versao_schema") != VERSAO_SCHEMA:
+        meta = None
+
+    if _eh_url(fonte):
+        etag = _etag_remoto(fonte)
+        snapshot_valido = meta is not None and caminho.exists()
+        # Sem rede (etag None) o snapshot existente é usado como está
+        if snapshot_valido and (etag is None or (etag and etag == meta.get("etag"))):
+            df = _ler_snapshot(caminho, meta.get("sha256"), mapeado)
+            if df is not None:
+                return df
+        with urllib.request.urlopen(fonte, timeout=TIMEOUT_HTTP) as resposta:
+            conteudo = resposta.read()
+            etag = resposta.headers.get("ETag", "")
+        checksum = hashlib.sha256(conteudo).hexdigest()
+        # Sem ETag, o checksum do conteúdo ainda evita o parse do CSV
+        if snapshot_valido and checksum == meta.get("sha256"):
+            df = _ler_snapshot(caminho, checksum, mapeado)
+            if df is not None:
+                return df
+        df = tipar_colunas(pd.read_csv(io.BytesIO(conteudo)))
+    else:
+        checksum = sha256_arquivo(fonte)
+        etag = None
+        if meta and caminho.exists() and checksum == meta.get("sha256"):
+            df = _ler_snapshot(caminho, checksum, mapeado)
+            if df is not None:
+                return df
+        df = tipar_colunas(pd.read_csv(fonte))
+
+    _gravar_snapshot(df, caminho, caminho_meta, {
+        "fonte": str(fonte),
+        "etag": etag,
+        "sha256": checksum,
+        "linhas": len(df),
+        "versao_schema": VERSAO_SCHEMA,
+    })
+    if mapeado:
+        return carregar_mapeado(caminho.with_suffix(".arrow"), checksum, lambda: df)
+    return df
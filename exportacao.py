@@ -0,0 +1,69 @@
+"""Exportação dos dados filtrados em blocos.
+
+O arquivo só é gerado quando o usuário pede, bloco a bloco, sem montar a
+string CSV inteira em memória. Formatos: CSV, CSV compactado com gzip e
+Parquet.
+"""
+import io
+import zlib
+from collections import namedtuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+LINHAS_POR_BLOCO = 100_000
+
+Formato = namedtuple('Formato', ['rotulo', 'mime', 'extensao'])
+
+FORMATOS = {
+    'csv': Formato('CSV', 'text/csv', 'csv'),
+    'csv.gz': Formato('CSV compactado (gzip)', 'application/gzip', 'csv.gz'),
+    'parquet': Formato('Parquet', 'application/vnd.apache.parquet', 'parquet'),
+}
+
+
+def _blocos_csv(df, linhas_por_bloco):
+    for inicio in range(0, max(len(df), 1), linhas_por_bloco):
+        bloco = df.iloc[inicio:inicio + linhas_por_bloco]
+        yield bloco.to_csv(index=False, header=inicio == 0).encode('utf-8')
+
+
+def _blocos_gzip(df, linhas_por_bloco):
+    compressor = zlib.compressobj(wbits=31)  # wbits=31 gera cabeçalho gzip
+    for bloco in _blocos_csv(df, linhas_por_bloco):
+        comprimido = compressor.compress(bloco)
+        if comprimido:
+            yield comprimido
+    yield compressor.flush()
+
+
+def _blocos_parquet(df, linhas_por_bloco):
+    buffer = io.BytesIO()
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(buffer, tabela.schema) as escritor:
+        for lote in tabela.to_batches(max_chunksize=linhas_por_bloco):
+            escritor.write_batch(lote)
+    yield buffer.getvalue()
+
+
+def gerar_blocos(df, formato='csv', linhas_por_bloco=LINHAS_POR_BLOCO):
+    """Itera sobre os bytes do arquivo exportado, bloco a bloco."""
+    if formato == 'csv':
+        return _blocos_csv(df, linhas_por_bloco)
+    if formato == 'csv.gz':
+        return _blocos_gzip(df, linhas_por_bloco)
+    if formato == 'parquet':
+        return _blocos_parquet(df, linhas_por_bloco)
+    raise ValueError(f"Formato de exportação desconhecido: {formato}")
+
+
+def exportar(df, formato='csv', linhas_por_bloco=LINHAS_POR_BLOCO):
+    """Arquivo exportado completo, como bytes."""
+    buffer = io.BytesIO()
+    for bloco in gerar_blocos(df, formato, linhas_por_bloco):
+        buffer.write(bloco)
+    return buffer.getvalue()
+
+
+def nome_arquivo(formato, base='dados_salarios_filtrados'):
+    return f"{base}.{FORMATOS[formato].extensao}"
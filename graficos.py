@@ -0,0 +1,224 @@
+"""Fábrica de gráficos do dashboard.
+
+Os gráficos são montados com plotly.graph_objects a partir de entradas já
+agregadas (nada de linhas brutas), com um template escuro compartilhado no
+lugar do `update_layout` repetido em cada figura. O JSON serializado fica em
+cache por (id do gráfico, hash dos dados agregados), e o tempo de montagem
+de cada gráfico é registrado.
+"""
+import hashlib
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from cache import CacheResultados
+
+CORES = ['#6366f1', '#8b5cf6', '#06b6d4', '#10b981']
+COR_MEDIA = '#10b981'
+
+TEMPLATE = go.layout.Template(layout=go.Layout(
+    plot_bgcolor='rgba(0,0,0,0)',
+    paper_bgcolor='rgba(0,0,0,0)',
+    font=dict(color='white'),
+    height=400,
+    margin=dict(t=30, b=40, l=40, r=20),
+    colorway=CORES,
+))
+
+
+def _figura(dados, **layout):
+    return go.Figure(data=dados, layout=go.Layout(template=TEMPLATE, **layout))
+
+
+def grafico_cargos(top_cargos):
+    return _figura(
+        [go.Bar(
+            x=top_cargos['mean'],
+            y=top_cargos['cargo'].astype(str),
+            orientation='h',
+            marker=dict(color=top_cargos['mean'], colorscale='Viridis',
+                        colorbar=dict(title='Salário Médio (USD)')),
+            hovertemplate='%{y}<br>Salário Médio (USD)=%{x:,.0f}<extra></extra>',
+        )],
+        xaxis_title='Salário Médio (USD)',
+        yaxis_title='Cargo',
+        showlegend=False,
+    )
+
+
+def grafico_histograma(bordas, contagens, salario_medio):
+    # Barras já contadas no servidor: o navegador recebe só len(contagens) alturas
+    figura = _figura(
+        [go.Bar(
+            x=(bordas[:-1] + bordas[1:]) / 2,
+            y=contagens,
+            width=np.diff(bordas),
+            marker_color=CORES[0],
+            customdata=np.column_stack([bordas[:-1], bordas[1:]]),
+            hovertemplate='Salário (USD)=%{customdata[0]:,.0f} - %{customdata[1]:,.0f}<br>Frequência=%{y}<extra></extra>',
+        )],
+        xaxis_title='Salário (USD)',
+        yaxis_title='Frequência',
+        showlegend=False,
+    )
+    # Linha da média
+    figura.add_vline(
+        x=salario_medio,
+        line_dash="dash",
+        line_color=COR_MEDIA,
+        annotation_text=f"Média: ${salario_medio:,.0f}"
+    )
+    return figura
+
+
+def grafico_remoto(remoto_contagem):
+    return _figura(
+        [go.Pie(
+            labels=remoto_contagem['tipo_trabalho'],
+            values=remoto_contagem['quantidade'],
+            hole=0.4,
+            marker=dict(colors=CORES[:3]),
+            textinfo='percent+label',
+            textfont_size=12,
+            sort=False,
+        )],
+        showlegend=True,
+    )
+
+
+def grafico_tempo(salario_tempo):
+    linhas = [
+        go.Scatter(
+            x=grupo['ano'],
+            y=grupo['usd'],
+            mode='lines+markers',
+            name=str(senioridade),
+            line=dict(color=CORES[i % len(CORES)]),
+        )
+        for i, (senioridade, grupo) in enumerate(salario_tempo.groupby('senioridade', observed=True, sort=True))
+    ]
+    return _figura(
+        linhas,
+        xaxis_title='Ano',
+        yaxis_title='Salário Médio (USD)',
+        legend_title_text='Senioridade',
+    )
+
+
+def grafico_tendencia(anual):
+    crescimento = anual['crescimento'].fillna(0)
+    return _figura(
+        [
+            go.Scatter(
+                x=anual['ano'],
+                y=anual['salario_medio'],
+                mode='lines+markers',
+                name='Média',
+                line=dict(color=CORES[0]),
+                customdata=np.column_stack([crescimento, anual['registros']]),
+                hovertemplate='%{x}: $%{y:,.0f}<br>Crescimento=%{customdata[0]:+.1f}%<br>Registros=%{customdata[1]:,}<extra>Média</extra>',
+            ),
+            go.Scatter(
+                x=anual['ano'],
+                y=anual['salario_mediano'],
+                mode='lines+markers',
+                name='Mediana',
+                line=dict(color=CORES[2], dash='dot'),
+            ),
+        ],
+        xaxis=dict(title='Ano', tickmode='array', tickvals=anual['ano']),
+        yaxis_title='Salário (USD)',
+        legend_title_text='',
+    )
+
+
+def grafico_senioridade(salario_senioridade):
+    return _figura(
+        [go.Bar(
+            x=salario_senioridade['senioridade'].astype(str),
+            y=salario_senioridade['usd'],
+            marker=dict(color=salario_senioridade['usd'], colorscale='Viridis',
+                        colorbar=dict(title='Salário Médio (USD)')),
+        )],
+        xaxis_title='Senioridade',
+        yaxis_title='Salário Médio (USD)',
+        showlegend=False,
+    )
+
+
+def grafico_mapa(media_pais, cargo):
+    return _figura(
+        [go.Choropleth(
+            locations=media_pais['iso3'].astype(str),
+            z=media_pais['salario_medio'],
+            text=media_pais['pais'].astype(str),
+            customdata=media_pais['quantidade'],
+            colorscale='Viridis',
+            colorbar=dict(title='Salário Médio (USD)'),
+            hovertemplate='<b>%{text}</b><br>Salário Médio (USD)=%{z:,.0f}<br>quantidade=%{customdata}<extra></extra>',
+        )],
+        title=f"Salário médio para {cargo}",
+        height=500,
+        # Contornos da topologia simplificada 1:110m embutida no plotly.js, carregada uma vez
+        # pelo navegador: a figura leva só iso3/valores dos países com dados, nunca GeoJSON
+        geo=dict(resolution=110),
+    )
+
+
+GRAFICOS = {
+    'cargos': grafico_cargos,
+    'hist': grafico_histograma,
+    'remoto': grafico_remoto,
+    'tempo': grafico_tempo,
+    'tendencia': grafico_tendencia,
+    'senioridade': grafico_senioridade,
+    'mapa': grafico_mapa,
+}
+
+
+def _hash_dados(dados, parametros):
+    h = hashlib.sha1()
+    for valor in dados:
+        if isinstance(valor, (pd.DataFrame, pd.Series)):
+            h.update(pd.util.hash_pandas_object(valor, index=False).to_numpy().tobytes())
+        elif isinstance(valor, np.ndarray):
+            h.update(np.ascontiguousarray(valor).tobytes())
+        else:
+            h.update(repr(valor).encode())
+    h.update(repr(sorted(parametros.items())).encode())
+    return h.hexdigest()
+
+
+class FabricaGraficos:
+    def __init__(self, max_itens=256):
+        self.cache = CacheResultados(max_itens=max_itens)
+        self.tempos = {}
+        # A fábrica é compartilhada entre sessões e seções montadas em paralelo
+        self._lock = threading.Lock()
+
+    def construir(self, id_grafico, *dados, **parametros):
+        """JSON da figura `id_grafico`, montada a partir de `dados` agregados."""
+        chave = (id_grafico, _hash_dados(dados, parametros))
+
+        def montar():
+            inicio = time.perf_counter()
+            figura = GRAFICOS[id_grafico](*dados, **parametros).to_json()
+            decorrido = time.perf_counter() - inicio
+            with self._lock:
+                total, vezes = self.tempos.get(id_grafico, (0.0, 0))
+                self.tempos[id_grafico] = (total + decorrido, vezes + 1)
+            return figura
+
+        return self.cache.obter_ou_calcular(chave, montar)
+
+    def tempos_construcao(self):
+        """Tempo médio de montagem (ms) e número de montagens por gráfico."""
+        with self._lock:
+            tempos = list(self.tempos.items())
+        return pd.DataFrame(
+            [(id_grafico, total / vezes * 1000, vezes) for id_grafico, (total, vezes) in tempos],
+            columns=['grafico', 'tempo_medio_ms', 'montagens'],
+        )
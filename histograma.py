@@ -0,0 +1,52 @@
+"""Histograma salarial pré-agregado por célula dos filtros.
+
+As bordas são globais, calculadas uma vez na carga sobre todo o intervalo de
+salários, numa resolução fina que é múltipla de todos os números de faixas
+oferecidos. Cada célula dos filtros guarda suas contagens por faixa fina; a
+seleção soma as células e agrega as faixas finas nas faixas pedidas, então o
+gráfico recebe só as alturas das barras, de tamanho O(faixas).
+"""
+import numpy as np
+
+from indice import DIMENSOES_FILTRO, GradeCelulas
+
+FAIXAS_DISPONIVEIS = [10, 20, 25, 30, 50, 60, 100]
+# Mínimo múltiplo comum das opções acima: toda escolha agrega faixas finas inteiras
+FAIXAS_FINAS = 300
+
+
+class HistogramaSalarios:
+    def __init__(self, df, dimensoes=DIMENSOES_FILTRO, coluna='usd', faixas_finas=FAIXAS_FINAS):
+        self.grade = GradeCelulas(df, dimensoes)
+        valores = df[coluna].to_numpy(dtype=np.float64)
+        minimo, maximo = (valores.min(), valores.max()) if len(valores) else (0.0, 1.0)
+        self.bordas_finas = np.linspace(minimo, maximo, faixas_finas + 1)
+        # Mesma regra do np.histogram: faixas semiabertas, exceto a última
+        faixa = np.searchsorted(self.bordas_finas, valores, side='right') - 1
+        faixa = np.clip(faixa, 0, faixas_finas - 1)
+        self.contagens = self.grade.contar_por_celula(faixa, faixas_finas)
+
+    @property
+    def memoria_bytes(self):
+        return int(self.contagens.nbytes)
+
+    def bordas(self, n_faixas):
+        fator = self._fator(n_faixas)
+        return self.bordas_finas[::fator]
+
+    def _fator(self, n_faixas):
+        faixas_finas = len(self.bordas_finas) - 1
+        if faixas_finas % n_faixas:
+            raise ValueError(f"{n_faixas} faixas não divide as {faixas_finas} faixas finas do histograma")
+        return faixas_finas // n_faixas
+
+    def contar(self, selecoes, n_faixas=25):
+        """Bordas (n_faixas + 1) e contagens (n_faixas) da seleção."""
+        finas = self.contagens[self.grade.mascara(selecoes)].sum(axis=0)
+        return self.bordas(n_faixas), finas.reshape(n_faixas, self._fator(n_faixas)).sum(axis=1)
+
+    def contar_valores(self, valores, n_faixas=25):
+        """Bordas e contagens de valores avulsos (ex.: linhas filtradas) nas mesmas faixas."""
+        bordas = self.bordas(n_faixas)
+        contagens, _ = np.histogram(np.asarray(valores, dtype=np.float64), bins=bordas)
+        return bordas, contagens
@@ -0,0 +1,243 @@
+"""Índice de bitmaps para os filtros da barra lateral.
+
+Para cada dimensão de filtro é pré-computado, na carga, um bitset compactado
+(np.packbits) por valor. A seleção é respondida como OU dentro da dimensão e
+E entre dimensões, operando sobre n/8 bytes em vez de refazer `isin` na
+coluna inteira a cada rerun.
+
+Cargo e país têm centenas de valores e cada um cobre poucas linhas: para
+eles o índice guarda, em vez de bitsets, a lista ordenada de linhas de cada
+valor (um argsort dos códigos, fatiado por offsets) e um dicionário ordenado
+dos rótulos para busca por prefixo. Uma seleção que restringe cargo ou país
+parte das listas dos valores escolhidos e só confere os bitsets dos outros
+filtros nessas linhas, em tempo proporcional às linhas encontradas.
+"""
+import bisect
+import re
+import threading
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+DIMENSOES_FILTRO = ['ano', 'senioridade', 'contrato', 'tamanho_empresa']
+# Filtros de alta cardinalidade, respondidos pelas listas de linhas; seleção vazia não restringe
+DIMENSOES_BUSCA = ['cargo', 'residencia_iso3']
+
+# Sugestões exibidas por busca de prefixo
+SUGESTOES_PADRAO = 20
+
+# Combinações por dimensão guardadas para reruns em que só outro filtro mudou
+MAX_COMBINACOES_CACHE = 64
+
+# Popcount por byte, para contar linhas sem descompactar o bitset
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def codificar(coluna):
+    """Códigos inteiros e valores ordenados de uma coluna (categórica ou não)."""
+    if isinstance(coluna.dtype, pd.CategoricalDtype):
+        return coluna.cat.codes.to_numpy(), list(coluna.cat.categories)
+    codigos, valores = pd.factorize(coluna, sort=True)
+    return codigos, list(valores)
+
+
+def normalizar(texto):
+    """Minúsculas e sem acentos, para comparar prefixos digitados com os rótulos."""
+    decomposto = unicodedata.normalize('NFKD', str(texto))
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).casefold().strip()
+
+
+class IndiceBusca:
+    """Valores de uma coluna com a frequência, as linhas de cada um e busca por prefixo.
+
+    `rotulos` (valor -> texto) acrescenta termos pesquisáveis, como o nome do país de um ISO3.
+    """
+
+    def __init__(self, coluna, rotulos=None):
+        codigos, self.valores = codificar(coluna)
+        self._codigo = {valor: codigo for codigo, valor in enumerate(self.valores)}
+        validos = codigos >= 0
+        self.contagens = np.bincount(codigos[validos], minlength=len(self.valores))
+        # Listas de linhas: argsort estável dos códigos (linhas crescentes em cada valor) e offsets
+        self.linhas_por_valor = np.argsort(codigos, kind='stable').astype(np.int32 if len(codigos) < 2 ** 31 else np.int64)
+        self.linhas_por_valor.flags.writeable = False
+        self.inicio = np.concatenate([[0], np.cumsum(self.contagens)]) + int((~validos).sum())
+
+        # Dicionário ordenado de termos -> código: o valor e o rótulo a partir de cada início de
+        # palavra, então "sci" e "data sci" acham "Lead Data Scientist"
+        termos = set()
+        for codigo, valor in enumerate(self.valores):
+            textos = [valor] if rotulos is None or valor not in rotulos else [valor, rotulos[valor]]
+            for texto in map(normalizar, textos):
+                termos.update((texto[inicio.start():], codigo) for inicio in re.finditer(r'\w+', texto))
+        termos = sorted(termos)
+        self._termos = [termo for termo, _ in termos]
+        self._codigos_termo = np.array([codigo for _, codigo in termos], dtype=np.int64)
+
+    def __contains__(self, valor):
+        return valor in self._codigo
+
+    def __len__(self):
+        return len(self.valores)
+
+    def contagem(self, valor):
+        codigo = self._codigo.get(valor)
+        return 0 if codigo is None else int(self.contagens[codigo])
+
+    def buscar(self, prefixo='', limite=SUGESTOES_PADRAO):
+        """Até `limite` valores com termo iniciado por `prefixo`, dos mais frequentes aos menos."""
+        prefixo = normalizar(prefixo)
+        if prefixo:
+            inicio = bisect.bisect_left(self._termos, prefixo)
+            fim = bisect.bisect_left(self._termos, prefixo + '\U0010ffff', inicio)
+            codigos = np.unique(self._codigos_termo[inicio:fim])
+        else:
+            codigos = np.arange(len(self.valores))
+        codigos = codigos[self.contagens[codigos] > 0]
+        # Mais frequentes primeiro; empates em ordem alfabética (códigos já são ordenados)
+        codigos = codigos[np.argsort(-self.contagens[codigos], kind='stable')][:limite]
+        return [self.valores[codigo] for codigo in codigos]
+
+    def linhas(self, selecionados):
+        """Posições crescentes das linhas com algum dos valores selecionados."""
+        codigos = sorted(self._codigo[v] for v in set(selecionados) if v in self._codigo)
+        partes = [self.linhas_por_valor[self.inicio[c]:self.inicio[c + 1]] for c in codigos]
+        if not partes:
+            return np.empty(0, dtype=self.linhas_por_valor.dtype)
+        return partes[0] if len(partes) == 1 else np.sort(np.concatenate(partes))
+
+    @property
+    def memoria_bytes(self):
+        return int(self.linhas_por_valor.nbytes + self.inicio.nbytes + self._codigos_termo.nbytes)
+
+
+class IndiceFiltros:
+    def __init__(self, df, dimensoes=DIMENSOES_FILTRO, dimensoes_busca=DIMENSOES_BUSCA, rotulos=None):
+        """`rotulos`: dimensão de busca -> {valor: texto pesquisável}."""
+        self.n_linhas = len(df)
+        self.dimensoes = list(dimensoes)
+        self.busca = {
+            dimensao: IndiceBusca(df[dimensao], (rotulos or {}).get(dimensao))
+            for dimensao in dimensoes_busca if dimensao in df.columns
+        }
+        self._bitsets = {}
+        self._vazio = np.zeros((self.n_linhas + 7) // 8, dtype=np.uint8)
+        self._cache = {}
+        # O índice é compartilhado entre sessões e seções calculadas em paralelo
+        self._lock = threading.Lock()
+        for dimensao in self.dimensoes:
+            codigos, valores = codificar(df[dimensao])
+            self._bitsets[dimensao] = {
+                valor: np.packbits(codigos == codigo)
+                for codigo, valor in enumerate(valores)
+            }
+
+    def valores(self, dimensao):
+        if dimensao in self.busca:
+            return list(self.busca[dimensao].valores)
+        return list(self._bitsets[dimensao])
+
+    def por_listas(self, selecoes):
+        """True se a seleção restringe uma dimensão de busca (resposta pelas listas de linhas)."""
+        return any(dimensao in self.busca for dimensao in selecoes)
+
+    def _bitset_dimensao(self, dimensao, selecionados):
+        chave = (dimensao, frozenset(selecionados))
+        bitset = self._cache.get(chave)
+        if bitset is None:
+            if dimensao in self.busca:
+                mascara = np.zeros(self.n_linhas, dtype=bool)
+                mascara[self.busca[dimensao].linhas(chave[1])] = True
+                bitset = np.packbits(mascara)
+            else:
+                bitsets = [self._bitsets[dimensao][v] for v in chave[1] if v in self._bitsets[dimensao]]
+                bitset = np.bitwise_or.reduce(bitsets) if bitsets else self._vazio
+            with self._lock:
+                if len(self._cache) >= MAX_COMBINACOES_CACHE:
+                    self._cache.pop(next(iter(self._cache)))
+                self._cache[chave] = bitset
+        return bitset
+
+    def bitset(self, selecoes):
+        """Bitset compactado das linhas que atendem a todas as seleções."""
+        resultado = None
+        for dimensao, selecionados in selecoes.items():
+            bitset = self._bitset_dimensao(dimensao, selecionados)
+            resultado = bitset.copy() if resultado is None else np.bitwise_and(resultado, bitset, out=resultado)
+        if resultado is None:
+            return np.packbits(np.ones(self.n_linhas, dtype=bool))
+        return resultado
+
+    def linhas(self, selecoes):
+        """Posições crescentes das linhas que atendem a todas as seleções."""
+        if not self.por_listas(selecoes):
+            return np.flatnonzero(self.mascara(selecoes))
+        candidatas = None
+        for dimensao, selecionados in selecoes.items():
+            if dimensao in self.busca:
+                linhas = self.busca[dimensao].linhas(selecionados)
+                candidatas = linhas if candidatas is None else np.intersect1d(candidatas, linhas, assume_unique=True)
+        # Os demais filtros são conferidos bit a bit, só nas linhas candidatas
+        for dimensao, selecionados in selecoes.items():
+            if dimensao not in self.busca and len(candidatas):
+                bitset = self._bitset_dimensao(dimensao, selecionados)
+                bits = bitset[candidatas >> 3] >> (7 - (candidatas & 7)).astype(np.uint8)
+                candidatas = candidatas[(bits & 1).astype(bool)]
+        return candidatas
+
+    def contar(self, selecoes):
+        if self.por_listas(selecoes):
+            return len(self.linhas(selecoes))
+        return int(_POPCOUNT[self.bitset(selecoes)].sum(dtype=np.int64))
+
+    def mascara(self, selecoes):
+        if self.por_listas(selecoes):
+            mascara = np.zeros(self.n_linhas, dtype=bool)
+            mascara[self.linhas(selecoes)] = True
+            return mascara
+        return np.unpackbits(self.bitset(selecoes), count=self.n_linhas).view(bool)
+
+    def filtrar(self, df, selecoes):
+        if self.por_listas(selecoes):
+            return df.iloc[self.linhas(selecoes)]
+        return df[self.mascara(selecoes)]
+
+
+class GradeCelulas:
+    """Grade densa com uma célula por combinação de valores das dimensões de filtro.
+
+    Estruturas por célula (sketches, histogramas) guardam uma linha por célula;
+    uma seleção vira uma máscara booleana sobre as células, sem tocar as linhas.
+    """
+
+    def __init__(self, df, dimensoes=DIMENSOES_FILTRO):
+        self.dimensoes = list(dimensoes)
+        self.valores = {}
+        # Id da célula em base mista sobre os códigos de cada dimensão
+        self.celula_por_linha = np.zeros(len(df), dtype=np.int64)
+        for dimensao in self.dimensoes:
+            codigos, valores = codificar(df[dimensao])
+            self.valores[dimensao] = valores
+            self.celula_por_linha = self.celula_por_linha * len(valores) + codigos
+        self.formato = tuple(len(self.valores[d]) for d in self.dimensoes)
+        self.n_celulas = int(np.prod(self.formato))
+
+    def contar_por_celula(self, colunas, n_colunas):
+        """Matriz (células x n_colunas) com a contagem de linhas por célula e coluna."""
+        return np.bincount(
+            self.celula_por_linha * n_colunas + colunas,
+            minlength=self.n_celulas * n_colunas,
+        ).reshape(self.n_celulas, n_colunas)
+
+    def mascara(self, selecoes):
+        mascara = np.ones(self.formato, dtype=bool)
+        for eixo, dimensao in enumerate(self.dimensoes):
+            if dimensao not in selecoes:
+                continue
+            selecionados = set(selecoes[dimensao])
+            eixo_ok = np.array([v in selecionados for v in self.valores[dimensao]], dtype=bool)
+            forma = [1] * len(self.formato)
+            forma[eixo] = -1
+            mascara &= eixo_ok.reshape(forma)
+        return mascara.ravel()
@@ -0,0 +1,204 @@
+"""Ingestão incremental com partições append-only por ano.
+
+Layout do diretório de dados:
+
+    ano=2024/parte-<sha>.parquet   linhas brutas, nunca reescritas
+    agregados/ano=2024.parquet     células daquele ano por todas as dimensões do dashboard
+    manifesto.json                 arquivos já ingeridos (por SHA-256)
+    dataset.arrow                  dataset completo mapeável em memória (opcional)
+
+Um novo arquivo vira uma parte nova em cada ano que ele contém; as células
+dos anos tocados são mescladas com as já existentes, sem reler as partes
+antigas. Cada agregado guarda nos metadados os arquivos já mesclados nele, e
+o manifesto só é regravado (de forma atômica) no fim: se a ingestão cai no
+meio, repetir o mesmo arquivo completa o que faltou sem mesclar duas vezes. Os agregados do dashboard saem dessas células: o cubo (médias por
+ano usadas no crescimento, KPIs) de um rollup pelas dimensões do cubo, e o
+MapaCargos (agrupamentos por cargo e país) das próprias células.
+
+Uso: python -m ingestao novo.csv [--destino DIR] [--verificar]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from compartilhado import carregar_mapeado
+from cubo import DIMENSOES_CUBO, DIMENSOES_DETALHE, CuboSalarios, agregar_celulas, mesclar_celulas, nomes_paises
+from dados import sha256_arquivo, tipar_colunas
+from mapa import MapaCargos
+
+DIRETORIO_PARTICOES = Path(os.environ.get("DASHBOARD_PARTICOES", "particoes_dados"))
+# Metadados do agregado de cada ano: checksums dos arquivos cujas linhas já estão nas células
+CHAVE_ARQUIVOS = b"dashboard_arquivos"
+
+
+def _ler_manifesto(destino):
+    try:
+        return json.loads((destino / "manifesto.json").read_text())
+    except (OSError, ValueError):
+        return {"arquivos": {}}
+
+
+def _gravar_manifesto(destino, manifesto):
+    temporario = destino / "manifesto.json.tmp"
+    temporario.write_text(json.dumps(manifesto, indent=2))
+    os.replace(temporario, destino / "manifesto.json")
+
+
+def _gravar_atomico(df, caminho, arquivos=None):
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    temporario = caminho.with_suffix(".tmp")
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    if arquivos is not None:
+        metadados = {**(tabela.schema.metadata or {}), CHAVE_ARQUIVOS: json.dumps(sorted(arquivos)).encode()}
+        tabela = tabela.replace_schema_metadata(metadados)
+    pq.write_table(tabela, temporario)
+    os.replace(temporario, caminho)
+
+
+def _arquivos_agregados(caminho):
+    """Checksums dos arquivos já mesclados no agregado de um ano."""
+    metadados = pq.read_schema(caminho).metadata or {}
+    return set(json.loads(metadados.get(CHAVE_ARQUIVOS, b"[]")))
+
+
+def partes_particoes(destino=None):
+    """Partes dos arquivos registrados no manifesto, em ordem de ano.
+
+    As partes nunca são reescritas: a lista fixa o conteúdo de uma versão,
+    mesmo que outros arquivos sejam ingeridos depois.
+    """
+    destino = Path(destino or DIRETORIO_PARTICOES)
+    return sorted(
+        destino / f"ano={ano}" / f"parte-{checksum[:16]}.parquet"
+        for checksum, registro in _ler_manifesto(destino)["arquivos"].items()
+        for ano in registro["anos"]
+    )
+
+
+def ingerir(arquivo, destino=None):
+    """Ingere um CSV; retorna os anos cujas partições foram tocadas."""
+    destino = Path(destino or DIRETORIO_PARTICOES)
+    manifesto = _ler_manifesto(destino)
+    checksum = sha256_arquivo(arquivo)
+    if checksum in manifesto["arquivos"]:
+        return []
+
+    novos = tipar_colunas(pd.read_csv(arquivo))
+    anos = sorted(int(ano) for ano in novos['ano'].unique())
+    for ano, linhas in novos.groupby('ano', observed=True):
+        _gravar_atomico(linhas, destino / f"ano={ano}" / f"parte-{checksum[:16]}.parquet")
+
+        caminho_agregado = destino / "agregados" / f"ano={ano}.parquet"
+        celulas_novas = agregar_celulas(linhas, DIMENSOES_DETALHE)
+        mesclados = set()
+        if caminho_agregado.exists():
+            mesclados = _arquivos_agregados(caminho_agregado)
+            # Repetição de uma ingestão interrompida depois de gravar este agregado
+            if checksum in mesclados:
+                continue
+            celulas_novas = mesclar_celulas([pd.read_parquet(caminho_agregado), celulas_novas], DIMENSOES_DETALHE)
+        _gravar_atomico(celulas_novas, caminho_agregado, mesclados | {checksum})
+
+    manifesto["arquivos"][checksum] = {"arquivo": str(arquivo), "anos": anos, "linhas": len(novos)}
+    _gravar_manifesto(destino, manifesto)
+    return anos
+
+
+def versao_particoes(destino=None):
+    """Hash do manifesto: muda a cada arquivo ingerido."""
+    destino = Path(destino or DIRETORIO_PARTICOES)
+    return hashlib.sha256(json.dumps(_ler_manifesto(destino), sort_keys=True).encode()).hexdigest()
+
+
+def carregar_particoes(destino=None, mapeado=False):
+    """Dataset completo a partir das partes de todos os anos.
+
+    Com `mapeado`, devolve a cópia Arrow mapeada em memória, republicada quando o manifesto muda.
+    """
+    destino = Path(destino or DIRETORIO_PARTICOES)
+
+    def carregar():
+        partes = [pd.read_parquet(caminho) for caminho in partes_particoes(destino)]
+        return tipar_colunas(pd.concat(partes, ignore_index=True))
+
+    if not mapeado:
+        return carregar()
+    return carregar_mapeado(destino / "dataset.arrow", versao_particoes(destino), carregar)
+
+
+def carregar_celulas(destino=None, dimensoes=DIMENSOES_DETALHE):
+    """Células por ano já mantidas pela ingestão, mescladas e reagrupadas por `dimensoes`."""
+    destino = Path(destino or DIRETORIO_PARTICOES)
+    return mesclar_celulas([
+        pd.read_parquet(caminho) for caminho in sorted((destino / "agregados").glob("ano=*.parquet"))
+    ], dimensoes)
+
+
+def carregar_cubo(destino=None, df=None):
+    """Cubo montado das células por ano já mantidas pela ingestão."""
+    destino = Path(destino or DIRETORIO_PARTICOES)
+    df = carregar_particoes(destino) if df is None else df
+    return CuboSalarios.de_celulas(carregar_celulas(destino, DIMENSOES_CUBO), nomes_paises(df))
+
+
+def carregar_mapa(destino=None):
+    """MapaCargos montado das células por ano já mantidas pela ingestão."""
+    return MapaCargos(carregar_celulas(destino))
+
+
+def _celulas_iguais(incremental, completo, dimensoes):
+    def normalizar(celulas):
+        celulas = celulas.copy()
+        for dimensao in dimensoes:
+            celulas[dimensao] = celulas[dimensao].astype(str)
+        return celulas.sort_values(dimensoes).reset_index(drop=True)
+
+    incremental, completo = normalizar(incremental), normalizar(completo)
+    if len(incremental) != len(completo) or not incremental[dimensoes].equals(completo[dimensoes]):
+        return False
+    medidas = ['count', 'sum', 'sumsq', 'min', 'max']
+    return bool(np.allclose(incremental[medidas].to_numpy(), completo[medidas].to_numpy(), rtol=1e-9))
+
+
+def verificar(destino=None):
+    """Confere se as células incrementais (detalhe e cubo) são iguais às de uma reconstrução completa."""
+    destino = Path(destino or DIRETORIO_PARTICOES)
+    df = carregar_particoes(destino)
+    return (
+        _celulas_iguais(carregar_celulas(destino), agregar_celulas(df, DIMENSOES_DETALHE), DIMENSOES_DETALHE)
+        and _celulas_iguais(carregar_cubo(destino, df).celulas, CuboSalarios(df).celulas, DIMENSOES_CUBO)
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingere um novo arquivo CSV nas partições por ano.")
+    parser.add_argument("arquivo", help="CSV com o mesmo schema de dados-imersao-final.csv")
+    parser.add_argument("--destino", default=None, help=f"diretório das partições (padrão: {DIRETORIO_PARTICOES})")
+    parser.add_argument("--verificar", action="store_true",
+                        help="compara os agregados incrementais com uma reconstrução completa")
+    args = parser.parse_args(argv)
+
+    anos = ingerir(args.arquivo, args.destino)
+    if anos:
+        print(f"Partições atualizadas: {', '.join(map(str, anos))}")
+    else:
+        print("Arquivo já ingerido anteriormente; nada a fazer.")
+
+    if args.verificar:
+        if not verificar(args.destino):
+            print("Agregados incrementais divergem da reconstrução completa.", file=sys.stderr)
+            return 1
+        print("Agregados incrementais conferem com a reconstrução completa.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""Insights automáticos por regras declaradas sobre momentos agregados.
+
+Métricas são funções registradas com as dimensões de que precisam; regras
+são limites sobre uma métrica com uma mensagem. Para avaliar as regras, os
+momentos de cada célula da fatia do cubo (contagem, média e M2, a soma dos
+quadrados dos desvios) são calculados uma única vez e combinados à maneira
+de Welford/Chan por bincounts sobre os códigos de cada dimensão pedida,
+formando uma tabela de momentos do total e de cada categoria. Toda métrica
+lê essa tabela; acrescentar uma regra não acrescenta varredura.
+"""
+import operator
+import string
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from indice import codificar
+
+TOTAL = ('total', 'total')
+
+# Países com ao menos este número de registros e média a esta distância (%) da seleção
+MIN_REGISTROS_PAIS = 30
+DESVIO_PAIS_PCT = 50
+MAX_PAISES_INSIGHT = 3
+
+_COMPARACOES = {'>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le}
+
+
+@dataclass(frozen=True)
+class Metrica:
+    nome: str
+    calcular: object
+    dimensoes: tuple = ()
+
+
+@dataclass(frozen=True)
+class Regra:
+    """Dispara quando `metrica` <comparacao> `limite`; `mensagem` é formatada com `valor` e as métricas citadas."""
+    nome: str
+    metrica: str
+    comparacao: str
+    limite: float
+    mensagem: str
+
+    def metricas(self):
+        """Métrica avaliada e métricas citadas na mensagem."""
+        citadas = [campo for _, campo, _, _ in string.Formatter().parse(self.mensagem) if campo and campo != 'valor']
+        return [self.metrica, *citadas]
+
+    def disparou(self, valores):
+        valor = valores[self.metrica]
+        return not pd.isna(valor) and _COMPARACOES[self.comparacao](valor, self.limite)
+
+    def formatar(self, valores):
+        return self.mensagem.format(valor=valores[self.metrica], **valores)
+
+
+METRICAS = {}
+REGRAS = []
+
+
+def metrica(nome, dimensoes=()):
+    """Decorador que registra `funcao(momentos, contexto)` como a métrica `nome`."""
+    def registrar(funcao):
+        METRICAS[nome] = Metrica(nome, funcao, tuple(dimensoes))
+        return funcao
+    return registrar
+
+
+def regra(nome, metrica, comparacao, limite, mensagem):
+    """Registra uma regra; as regras são avaliadas e exibidas na ordem de registro."""
+    if comparacao not in _COMPARACOES:
+        raise ValueError(f"comparação desconhecida: {comparacao!r}")
+    REGRAS.append(Regra(nome, metrica, comparacao, limite, mensagem))
+
+
+def _acumular(grupo, n_grupos, n_celula, soma_celula, media_celula, m2_celula):
+    """Contagem, média e M2 por grupo a partir dos momentos de cada célula."""
+    n = np.bincount(grupo, weights=n_celula, minlength=n_grupos)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = np.bincount(grupo, weights=soma_celula, minlength=n_grupos) / n
+    # Chan et al.: M2 do grupo = soma dos M2 das células + n_i * (média_i - média do grupo)^2
+    m2 = (
+        np.bincount(grupo, weights=m2_celula, minlength=n_grupos)
+        + np.bincount(grupo, weights=n_celula * (media_celula - media[grupo]) ** 2, minlength=n_grupos)
+    )
+    return n, media, m2
+
+
+def momentos(celulas, dimensoes):
+    """Contagem, média e M2 do salário do total e de cada categoria das `dimensoes`.
+
+    Índice (dimensao, categoria), com ('total', 'total') para a fatia inteira;
+    categorias sem registros são omitidas.
+    """
+    n_celula = celulas['count'].to_numpy(np.float64)
+    soma_celula = celulas['sum'].to_numpy(np.float64)
+    media_celula = soma_celula / n_celula
+    m2_celula = np.maximum(celulas['sumsq'].to_numpy(np.float64) - soma_celula * media_celula, 0)
+
+    rotulos = [TOTAL]
+    partes = [_acumular(np.zeros(len(celulas), dtype=np.intp), 1, n_celula, soma_celula, media_celula, m2_celula)]
+    # Os mesmos vetores por célula alimentam todas as dimensões, sem copiar nem reagrupar as células
+    for dimensao in dimensoes:
+        codigos, valores = codificar(celulas[dimensao])
+        rotulos += [(dimensao, valor) for valor in valores]
+        partes.append(_acumular(codigos.astype(np.intp), len(valores), n_celula, soma_celula, media_celula, m2_celula))
+    n, media, m2 = (np.concatenate(coluna) for coluna in zip(*partes))
+    tabela = pd.DataFrame({'n': n, 'media': media, 'm2': m2}, index=pd.MultiIndex.from_tuples(rotulos, names=['dimensao', 'categoria']))
+    return tabela[tabela['n'] > 0]
+
+
+def avaliar(celulas, contexto=None, regras=None, celulas_extras=None):
+    """Valores das métricas usadas e mensagens das regras que dispararam, numa única passada.
+
+    `celulas_extras` dá, por dimensão ausente de `celulas` (o país, fora do
+    cubo), células da mesma seleção agregadas por essa dimensão.
+    """
+    regras = REGRAS if regras is None else regras
+    extras = celulas_extras or {}
+    nomes = list(dict.fromkeys(nome for r in regras for nome in r.metricas()))
+    dimensoes = list(dict.fromkeys(d for nome in nomes for d in METRICAS[nome].dimensoes))
+    tabela = momentos(celulas, [d for d in dimensoes if d not in extras])
+    partes = [momentos(extras[d], [d]).drop(TOTAL) for d in dimensoes if d in extras]
+    if partes:
+        tabela = pd.concat([tabela, *partes])
+    valores = {nome: METRICAS[nome].calcular(tabela, contexto or {}) for nome in nomes}
+    return valores, [r.formatar(valores) for r in regras if r.disparou(valores)]
+
+
+def variacao_anual(media_por_ano, anos):
+    """Variação (%) da média do último ano selecionado sobre o ano selecionado anterior."""
+    anos = list(anos)
+    if len(anos) <= 1:
+        return 0
+    ano_atual = max(anos)
+    anteriores = [a for a in anos if a < ano_atual]
+    ano_anterior = max(anteriores) if anteriores else ano_atual
+
+    salario_atual = media_por_ano.get(ano_atual, np.nan)
+    salario_anterior = media_por_ano.get(ano_anterior, np.nan)
+    if not pd.isna(salario_anterior) and salario_anterior > 0:
+        return ((salario_atual - salario_anterior) / salario_anterior) * 100
+    return 0
+
+
+def _participacao(tabela, dimensao, categoria):
+    n = tabela['n'].get((dimensao, categoria), 0)
+    return n / tabela.loc[TOTAL, 'n'] * 100
+
+
+# --- Métricas ---
+
+@metrica('salario_medio')
+def _salario_medio(tabela, contexto):
+    return tabela.loc[TOTAL, 'media']
+
+
+@metrica('cv')
+def _cv(tabela, contexto):
+    n, media, m2 = tabela.loc[TOTAL, ['n', 'media', 'm2']]
+    return np.sqrt(m2 / (n - 1)) / media * 100 if n > 1 else np.nan
+
+
+@metrica('crescimento', dimensoes=['ano'])
+def _crescimento(tabela, contexto):
+    media_por_ano = tabela.xs('ano', level='dimensao')['media']
+    return variacao_anual(media_por_ano, contexto.get('anos', ()))
+
+
+@metrica('reducao', dimensoes=['ano'])
+def _reducao(tabela, contexto):
+    return -_crescimento(tabela, contexto)
+
+
+@metrica('remoto_pct', dimensoes=['remoto'])
+def _remoto_pct(tabela, contexto):
+    return _participacao(tabela, 'remoto', 'remoto')
+
+
+@metrica('senior_pct', dimensoes=['senioridade'])
+def _senior_pct(tabela, contexto):
+    return _participacao(tabela, 'senioridade', 'senior')
+
+
+def _paises_distantes(tabela):
+    """Diferença (%) da média de cada país com registros suficientes para a média da seleção."""
+    if 'residencia_iso3' not in tabela.index.get_level_values('dimensao'):
+        return pd.Series(dtype=float)
+    paises = tabela.xs('residencia_iso3', level='dimensao')
+    paises = paises[paises['n'] >= MIN_REGISTROS_PAIS]
+    diferenca = (paises['media'] / tabela.loc[TOTAL, 'media'] - 1) * 100
+    diferenca = diferenca[diferenca.abs() >= DESVIO_PAIS_PCT]
+    return diferenca.reindex(diferenca.abs().sort_values(ascending=False, kind='stable').index)
+
+
+@metrica('n_paises_atipicos', dimensoes=['residencia_iso3'])
+def _n_paises_atipicos(tabela, contexto):
+    return len(_paises_distantes(tabela))
+
+
+@metrica('paises_atipicos', dimensoes=['residencia_iso3'])
+def _paises_atipicos(tabela, contexto):
+    nomes = contexto.get('nomes_paises', {})
+    return ", ".join(
+        f"{nomes.get(iso3, iso3)} ({diferenca:+.0f}%)"
+        for iso3, diferenca in _paises_distantes(tabela).head(MAX_PAISES_INSIGHT).items()
+    )
+
+
+# --- Regras ---
+
+regra('salario_alto', 'salario_medio', '>', 100000,
+      "💰 O salário médio de ${valor:,.0f} está acima de $100k, indicando um mercado bem remunerado.")
+regra('crescimento', 'crescimento', '>', 5,
+      "📈 Houve um crescimento salarial de {valor:.1f}% em relação ao período anterior.")
+regra('reducao', 'reducao', '>', 5,
+      "📉 Houve uma redução salarial de {valor:.1f}% em relação ao período anterior.")
+regra('remoto', 'remoto_pct', '>', 50,
+      "🏠 {valor:.1f}% dos profissionais trabalham remotamente, mostrando a tendência do trabalho à distância.")
+regra('senioridade', 'senior_pct', '>', 40,
+      "👔 {valor:.1f}% dos profissionais são seniores, indicando um mercado maduro.")
+regra('variabilidade', 'cv', '>', 50,
+      "📊 Alta variabilidade salarial (CV: {valor:.1f}%), indicando grande dispersão nos salários.")
+regra('paises_atipicos', 'n_paises_atipicos', '>', 0,
+      "🌍 Países com salário médio muito distante da média da seleção: {paises_atipicos}.")
@@ -0,0 +1,83 @@
+"""Salário por (cargo, país) pré-agregado para o mapa mundial.
+
+Na carga, as linhas (ou as células por ano mantidas pela ingestão) são
+reduzidas a entradas (célula dos filtros, par cargo x país) com contagem,
+soma e soma dos quadrados de `usd`, guardando só os pares que existem. Uma
+seleção vira uma máscara sobre as células dos filtros e um bincount por
+medida soma as entradas mantidas na matriz cargos x países: o mapa de
+qualquer cargo, e as somas por cargo ou por país (top cargos, cargo mais
+frequente, distribuição e insights por país), saem dessa matriz sem tocar as
+linhas, em tempo que depende do número de entradas e não do de registros.
+"""
+import time
+
+import numpy as np
+
+from indice import DIMENSOES_FILTRO, GradeCelulas, codificar
+
+
+class MapaCargos:
+    def __init__(self, celulas, dimensoes=DIMENSOES_FILTRO):
+        """`celulas`: colunas das dimensões, cargo, residencia_iso3, count, sum e sumsq."""
+        inicio = time.perf_counter()
+        self.grade = GradeCelulas(celulas, dimensoes)
+        codigos_cargo, self.cargos = codificar(celulas['cargo'])
+        codigos_pais, self.paises = codificar(celulas['residencia_iso3'])
+        n_pares = len(self.cargos) * len(self.paises)
+        par = codigos_cargo.astype(np.int64) * len(self.paises) + codigos_pais
+        # Células que diferem só em outras dimensões (ex.: remoto) viram uma entrada
+        entradas, posicao = np.unique(self.grade.celula_por_linha * n_pares + par, return_inverse=True)
+        self.celula = entradas // n_pares
+        self.par = entradas % n_pares
+        self.contagem = np.bincount(posicao, weights=celulas['count'].to_numpy(np.float64), minlength=len(entradas))
+        self.soma = np.bincount(posicao, weights=celulas['sum'].to_numpy(np.float64), minlength=len(entradas))
+        self.soma_quadrados = np.bincount(
+            posicao, weights=celulas['sumsq'].to_numpy(np.float64), minlength=len(entradas)
+        )
+        self.tempo_construcao = time.perf_counter() - inicio
+
+    @classmethod
+    def de_linhas(cls, df, dimensoes=DIMENSOES_FILTRO):
+        """Mapa direto das linhas do dataset, cada uma como uma célula de contagem 1."""
+        usd = df['usd'].to_numpy(np.float64)
+        celulas = df[[*dimensoes, 'cargo', 'residencia_iso3']].assign(count=1, sum=usd, sumsq=usd ** 2)
+        return cls(celulas, dimensoes)
+
+    @property
+    def n_entradas(self):
+        return len(self.par)
+
+    @property
+    def memoria_bytes(self):
+        return int(
+            self.celula.nbytes + self.par.nbytes + self.contagem.nbytes + self.soma.nbytes + self.soma_quadrados.nbytes
+        )
+
+    def _eixo(self, valores, selecoes, dimensao):
+        """Valores do eixo mantidos pela seleção de `dimensao` (todos, se ela não restringe)."""
+        if dimensao not in selecoes:
+            return np.ones(len(valores), dtype=bool)
+        selecionados = set(selecoes[dimensao])
+        return np.array([v in selecionados for v in valores], dtype=bool)
+
+    def agregar(self, selecoes):
+        """Matrizes (cargos x países) de contagem, soma e soma dos quadrados dos salários da seleção."""
+        mantidas = self.grade.mascara(selecoes)[self.celula]
+        forma = (len(self.cargos), len(self.paises))
+        # Cargo e país são os próprios eixos da matriz: filtrá-los é descartar pares
+        if 'cargo' in selecoes or 'residencia_iso3' in selecoes:
+            pares = np.outer(self._eixo(self.cargos, selecoes, 'cargo'), self._eixo(self.paises, selecoes, 'residencia_iso3'))
+            mantidas &= pares.ravel()[self.par]
+        par = self.par[mantidas]
+        contagem, soma, soma_quadrados = (
+            np.bincount(par, weights=medida[mantidas], minlength=forma[0] * forma[1]).reshape(forma)
+            for medida in (self.contagem, self.soma, self.soma_quadrados)
+        )
+        return contagem.astype(np.int64), soma, soma_quadrados
+
+    def relatorio(self):
+        return {
+            'entradas': self.n_entradas,
+            'memoria_mb': self.memoria_bytes / 1024 ** 2,
+            'construcao_ms': self.tempo_construcao * 1000,
+        }
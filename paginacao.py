@@ -0,0 +1,90 @@
+"""Paginação da tabela de Dados Completos.
+
+Para cada coluna de ordenação guarda-se, na carga, a permutação que ordena o
+dataset inteiro. A primeira página de uma seleção sai de uma varredura
+parcial dessa permutação, parando assim que a página está completa; as demais
+páginas usam a permutação já filtrada, calculada uma vez por seleção e
+coluna, de modo que trocar de página é só fatiar um array. Com cargo ou país
+selecionados, as poucas linhas da seleção vêm das listas do índice e são
+ordenadas diretamente pela chave da coluna.
+"""
+import numpy as np
+import pandas as pd
+
+from cache import CacheResultados, chave_selecao
+
+COLUNAS_ORDENACAO = ['usd', 'ano', 'cargo', 'senioridade']
+TAMANHOS_PAGINA = [10, 25, 50, 100]
+
+# Tamanho inicial do bloco da varredura parcial; dobra enquanto a página não enche
+BLOCO_INICIAL = 4096
+
+
+def _chave_ordenacao(coluna):
+    if isinstance(coluna.dtype, pd.CategoricalDtype):
+        return coluna.cat.codes.to_numpy()
+    return coluna.to_numpy()
+
+
+def formatar_moeda(valores):
+    """Formata uma Series numérica como "$1,234" sem laço Python por valor."""
+    texto = valores.round(0).astype('int64').astype(str)
+    return '$' + texto.str.replace(r'(\d)(?=(\d{3})+$)', r'\1,', regex=True)
+
+
+class IndiceOrdenacao:
+    def __init__(self, df, indice, colunas=COLUNAS_ORDENACAO, max_permutacoes=16):
+        self.indice = indice
+        self.n_linhas = len(df)
+        self._chaves = {coluna: _chave_ordenacao(df[coluna]) for coluna in colunas}
+        self._permutacoes = {
+            coluna: np.argsort(chave, kind='stable').astype(np.int32)
+            for coluna, chave in self._chaves.items()
+        }
+        self._filtradas = CacheResultados(max_itens=max_permutacoes)
+
+    def _varredura_parcial(self, mascara, permutacao, quantidade):
+        """Primeiras `quantidade` linhas de `permutacao` que passam na máscara."""
+        encontradas = []
+        total = 0
+        inicio, bloco = 0, BLOCO_INICIAL
+        while total < quantidade and inicio < len(permutacao):
+            trecho = permutacao[inicio:inicio + bloco]
+            achadas = trecho[mascara[trecho]]
+            encontradas.append(achadas)
+            total += len(achadas)
+            inicio += bloco
+            bloco *= 2
+        if not encontradas:
+            return np.empty(0, dtype=np.int32)
+        return np.concatenate(encontradas)[:quantidade]
+
+    def _permutacao_filtrada(self, selecoes, coluna):
+        chave = chave_selecao(selecoes, coluna)
+
+        def calcular():
+            if self.indice.por_listas(selecoes):
+                # Linhas crescentes + ordenação estável: a mesma ordem da permutação global
+                linhas = self.indice.linhas(selecoes)
+                return linhas[np.argsort(self._chaves[coluna][linhas], kind='stable')].astype(np.int32)
+            permutacao = self._permutacoes[coluna]
+            return permutacao[self.indice.mascara(selecoes)[permutacao]]
+
+        return self._filtradas.obter_ou_calcular(chave, calcular)
+
+    def pagina(self, selecoes, coluna, numero, tamanho, decrescente=False):
+        """Posições (iloc) das linhas da página `numero` (a partir de 1)."""
+        inicio = (numero - 1) * tamanho
+        fim = inicio + tamanho
+        chave = chave_selecao(selecoes, coluna)
+        if numero == 1 and chave not in self._filtradas and not self.indice.por_listas(selecoes):
+            permutacao = self._permutacoes[coluna]
+            if decrescente:
+                permutacao = permutacao[::-1]
+            return self._varredura_parcial(self.indice.mascara(selecoes), permutacao, tamanho)
+
+        filtrada = self._permutacao_filtrada(selecoes, coluna)
+        if decrescente:
+            n = len(filtrada)
+            return filtrada[max(n - fim, 0):max(n - inicio, 0)][::-1]
+        return filtrada[inicio:fim]
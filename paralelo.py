@@ -0,0 +1,37 @@
+"""Execução concorrente das agregações independentes de um rerun.
+
+Depois da fatia do cubo e dos KPIs, top cargos, evolução por ano, modalidades,
+mapa, describe e distribuição não dependem uns dos outros. O executor os
+despacha num pool de threads (os kernels de NumPy e pandas liberam o GIL em
+boa parte do tempo) e monta o resultado na ordem em que as tarefas foram
+declaradas, independente da ordem de término; uma exceção é relançada pela
+primeira tarefa que falhou, nessa mesma ordem.
+
+O número de workers vem de DASHBOARD_WORKERS (padrão: núcleos disponíveis,
+até 4). Com 1 worker as tarefas rodam em sequência na própria thread.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+WORKERS_PADRAO = min(4, os.cpu_count() or 1)
+WORKERS = int(os.environ.get("DASHBOARD_WORKERS", WORKERS_PADRAO))
+
+
+class ExecutorAgregacoes:
+    def __init__(self, workers=WORKERS):
+        self.workers = max(1, int(workers))
+        self._pool = (
+            ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="agregacoes")
+            if self.workers > 1 else None
+        )
+
+    def executar(self, tarefas):
+        """Executa {nome: função sem argumentos} e devolve {nome: resultado} na ordem declarada."""
+        if self._pool is None or len(tarefas) <= 1:
+            return {nome: tarefa() for nome, tarefa in tarefas.items()}
+        futuros = {nome: self._pool.submit(tarefa) for nome, tarefa in tarefas.items()}
+        return {nome: futuro.result() for nome, futuro in futuros.items()}
+
+    def encerrar(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
@@ -0,0 +1,140 @@
+"""Instrumentação por rerun do dashboard.
+
+Cada rerun cria um `PerfilRerun` e abre etapas (carga, filtro, seções,
+montagem de gráficos, exportação) com `perfil.etapa(nome)`. Para cada etapa
+ficam registrados o tempo e a variação do RSS do processo; etapas abertas
+dentro de outras recebem o nome composto ("graficos_linha1/grafico_cargos").
+No fim do rerun `emitir()` grava uma linha JSON no logger `dashboard.perfil`
+e, se DASHBOARD_PERFIL_LOG apontar para um arquivo, também nele.
+
+Os caches do Streamlit não expõem acertos e faltas, então a função
+cacheada chama `registrar_falta(nome)` no próprio corpo (que só executa na
+falta) e a chamada é feita por `perfil.chamar_cacheado(nome, funcao)`.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("dashboard.perfil")
+
+ARQUIVO_LOG = os.environ.get("DASHBOARD_PERFIL_LOG")
+
+# Acertos e faltas dos caches do Streamlit, acumulados por processo (todas as sessões)
+_CONTADORES_CACHE = {}
+_lock = threading.Lock()
+
+
+def rss_bytes():
+    """Memória residente atual do processo (0 se indisponível na plataforma)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    # Fora do Linux só há o pico; ru_maxrss é em bytes no macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def contadores_cache():
+    """Acertos, faltas e taxa de acerto dos caches do Streamlit instrumentados."""
+    with _lock:
+        return {
+            nome: {
+                'hits': hits,
+                'misses': misses,
+                'taxa_acerto': hits / (hits + misses) if hits + misses else 0.0,
+            }
+            for nome, (hits, misses) in _CONTADORES_CACHE.items()
+        }
+
+
+class PerfilRerun:
+    def __init__(self):
+        self.etapas = []
+        self.caches = {}
+        self.emitido = False
+        # Pilha de etapas abertas por thread (seções podem rodar em paralelo)
+        self._local = threading.local()
+        self._faltas = {}
+        self._inicio = time.perf_counter()
+        self._rss_inicio = rss_bytes()
+        self._emitidas = 0
+
+    @contextmanager
+    def etapa(self, nome):
+        """Cronometra o bloco e mede a variação de RSS."""
+        if self._inicio is None:
+            self._inicio = time.perf_counter()
+            self._rss_inicio = rss_bytes()
+        pilha = self._pilha()
+        pilha.append(nome)
+        nome_completo = "/".join(pilha)
+        rss_antes = rss_bytes()
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            pilha.pop()
+            self.etapas.append({
+                'etapa': nome_completo,
+                'ms': (time.perf_counter() - inicio) * 1000,
+                'delta_rss_bytes': rss_bytes() - rss_antes,
+            })
+
+    def _pilha(self):
+        if not hasattr(self._local, 'pilha'):
+            self._local.pilha = []
+        return self._local.pilha
+
+    def registrar_falta(self, nome):
+        """Chamado no corpo de uma função @st.cache_*: o corpo só executa na falta."""
+        self._faltas[nome] = self._faltas.get(nome, 0) + 1
+
+    def chamar_cacheado(self, nome, funcao, *args, **kwargs):
+        """Chama `funcao` dentro da etapa `nome`, contando acerto ou falta do cache."""
+        faltas_antes = self._faltas.get(nome, 0)
+        with self.etapa(nome):
+            resultado = funcao(*args, **kwargs)
+        acerto = self._faltas.get(nome, 0) == faltas_antes
+        with _lock:
+            hits, misses = _CONTADORES_CACHE.get(nome, (0, 0))
+            _CONTADORES_CACHE[nome] = (hits + acerto, misses + (not acerto))
+        return resultado
+
+    def registrar_cache(self, nome, estatisticas):
+        """Anexa as estatísticas de um CacheResultados ao relatório."""
+        self.caches[nome] = {
+            chave: estatisticas[chave] for chave in ('hits', 'misses', 'taxa_acerto') if chave in estatisticas
+        }
+
+    def relatorio(self):
+        """Relatório do rerun; após `emitir()`, só as etapas novas (reexecução de fragmento)."""
+        rss = rss_bytes()
+        return {
+            'tipo': 'fragmento' if self.emitido else 'rerun',
+            'timestamp': time.time(),
+            'total_ms': (time.perf_counter() - self._inicio) * 1000 if self._inicio is not None else 0.0,
+            'rss_bytes': rss,
+            'delta_rss_bytes': rss - self._rss_inicio if self._inicio is not None else 0,
+            'etapas': self.etapas[self._emitidas:],
+            'caches': {**contadores_cache(), **self.caches},
+        }
+
+    def emitir(self):
+        """Grava o relatório como uma linha JSON (logger e, se configurado, arquivo)."""
+        linha = json.dumps(self.relatorio(), default=float)
+        logger.info(linha)
+        if ARQUIVO_LOG:
+            with _lock, open(ARQUIVO_LOG, "a") as f:
+                f.write(linha + "\n")
+        self.emitido = True
+        self._emitidas = len(self.etapas)
+        self._inicio = None
+        return linha
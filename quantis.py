@@ -0,0 +1,63 @@
+"""Sketches de quantis mescláveis para a mediana e os percentis do describe().
+
+Cada célula dos filtros da barra lateral guarda um histograma em buckets
+logarítmicos (o esquema do DDSketch): todo valor cai num bucket cujo
+representante está a no máximo `erro_relativo` de distância relativa dele.
+Mesclar células é somar contagens, então a seleção atual é atendida somando
+as linhas das células selecionadas e percorrendo a soma acumulada, sem
+ordenar a coluna filtrada.
+"""
+import numpy as np
+
+from indice import DIMENSOES_FILTRO, GradeCelulas
+
+ERRO_RELATIVO_PADRAO = 0.01
+
+
+class SketchQuantis:
+    def __init__(self, df, dimensoes=DIMENSOES_FILTRO, coluna='usd', erro_relativo=ERRO_RELATIVO_PADRAO):
+        self.dimensoes = list(dimensoes)
+        self.erro_relativo = erro_relativo
+        self._gamma = (1 + erro_relativo) / (1 - erro_relativo)
+        self._log_gamma = np.log(self._gamma)
+
+        self.grade = GradeCelulas(df, self.dimensoes)
+
+        valores = df[coluna].to_numpy(dtype=np.float64)
+        positivos = valores > 0
+        buckets = np.zeros(len(valores), dtype=np.int64)
+        buckets[positivos] = np.ceil(np.log(valores[positivos]) / self._log_gamma).astype(np.int64)
+        self._bucket_min = int(buckets[positivos].min()) if positivos.any() else 0
+        n_buckets = int(buckets[positivos].max()) - self._bucket_min + 1 if positivos.any() else 1
+        # Coluna 0 guarda valores <= 0; os buckets positivos começam na coluna 1
+        coluna_bucket = np.where(positivos, buckets - self._bucket_min + 1, 0)
+
+        self.contagens = self.grade.contar_por_celula(coluna_bucket, n_buckets + 1)
+        self._representantes = np.concatenate([
+            [0.0],
+            2 * self._gamma ** np.arange(self._bucket_min, self._bucket_min + n_buckets) / (self._gamma + 1),
+        ])
+
+    @property
+    def memoria_bytes(self):
+        return int(self.contagens.nbytes)
+
+    def histograma(self, selecoes):
+        """Sketch mesclado das células selecionadas."""
+        return self.contagens[self.grade.mascara(selecoes)].sum(axis=0)
+
+    def quantis(self, selecoes, qs):
+        """Quantis aproximados (mesma convenção de posição de Series.quantile)."""
+        return self.quantis_histograma(self.histograma(selecoes), qs)
+
+    def quantis_histograma(self, histograma, qs):
+        """Quantis de um sketch já mesclado (ex.: as células de um único ano)."""
+        acumulado = np.cumsum(histograma)
+        total = acumulado[-1]
+        if total == 0:
+            return np.full(len(qs), np.nan)
+        posicoes = np.asarray(qs, dtype=np.float64) * (total - 1)
+        return self._representantes[np.searchsorted(acumulado, posicoes, side='right')]
+
+    def mediana(self, selecoes):
+        return float(self.quantis(selecoes, [0.5])[0])
@@ -0,0 +1,92 @@
+"""Seções do dashboard calculadas sob demanda.
+
+Cada bloco da página registra uma função de cálculo e as seções de que ela
+depende. Uma seção só é calculada quando a página pede seu resultado, isto
+é, quando o bloco está visível; o resultado fica no cache por estado dos
+filtros e o tempo de cálculo de cada seção é registrado por rerun.
+"""
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class Secoes:
+    def __init__(self, cache, *extras_chave, perfil=None):
+        self.cache = cache
+        self.extras_chave = extras_chave
+        # PerfilRerun opcional: cada seção vira uma etapa do perfil do rerun
+        self.perfil = perfil
+        self._secoes = {}
+        # Resultados já pedidos neste rerun (dependências compartilhadas não repassam pelo cache)
+        self._resultados = {}
+        # (seção, milissegundos, veio do cache) na ordem em que foram pedidas
+        self.tempos = []
+
+    def secao(self, nome, depende_de=()):
+        """Decorador que registra `funcao(filtros, dependencias)` como a seção `nome`."""
+        def registrar(funcao):
+            self._secoes[nome] = (funcao, tuple(depende_de))
+            return funcao
+        return registrar
+
+    def calcular(self, nome, filtros):
+        """Resultado da seção para `filtros` (analise.Filtros), calculando as dependências antes."""
+        funcao, depende_de = self._secoes[nome]
+        dependencias = {dependencia: self.calcular(dependencia, filtros) for dependencia in depende_de}
+        chave = filtros.chave(nome, *self.extras_chave)
+        if chave in self._resultados:
+            return self._resultados[chave]
+
+        inicio = time.perf_counter()
+        with self._etapa(nome):
+            resultado = self.cache.obter(chave)
+            acerto = resultado is not None
+            if not acerto:
+                resultado = funcao(filtros, dependencias)
+                self.cache.guardar(chave, resultado)
+        self._registrar(nome, time.perf_counter() - inicio, acerto)
+        self._resultados[chave] = resultado
+        return resultado
+
+    def _dependencias(self, nome):
+        """Dependências diretas e indiretas de `nome`, das mais internas para fora."""
+        ordem = []
+        for dependencia in self._secoes[nome][1]:
+            for indireta in self._dependencias(dependencia) + [dependencia]:
+                if indireta not in ordem:
+                    ordem.append(indireta)
+        return ordem
+
+    def calcular_varias(self, nomes, filtros, executor=None):
+        """Calcula várias seções de uma vez, as independentes entre si em paralelo.
+
+        As dependências são resolvidas antes, em sequência, para que nenhuma
+        seção compartilhada seja calculada por duas threads.
+        """
+        anteriores = []
+        for nome in nomes:
+            anteriores += [d for d in self._dependencias(nome) if d not in anteriores]
+        for dependencia in anteriores:
+            self.calcular(dependencia, filtros)
+        tarefas = {
+            nome: (lambda nome=nome: self.calcular(nome, filtros))
+            for nome in nomes if nome not in anteriores
+        }
+        resultados = executor.executar(tarefas) if executor is not None else {
+            nome: tarefa() for nome, tarefa in tarefas.items()
+        }
+        return {nome: resultados[nome] if nome in resultados else self.calcular(nome, filtros) for nome in nomes}
+
+    @contextmanager
+    def medir(self, nome):
+        """Cronometra um bloco que não passa pelo cache (ex.: a página da tabela)."""
+        inicio = time.perf_counter()
+        with self._etapa(nome):
+            yield
+        self._registrar(nome, time.perf_counter() - inicio, False)
+
+    def _etapa(self, nome):
+        return self.perfil.etapa(nome) if self.perfil is not None else nullcontext()
+
+    def _registrar(self, nome, segundos, acerto):
+        if not any(registro[0] == nome for registro in self.tempos):
+            self.tempos.append((nome, segundos * 1000, acerto))